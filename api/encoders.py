@@ -0,0 +1,31 @@
+import json
+from datetime import date, time
+from decimal import Decimal
+from uuid import UUID
+
+from django.utils.functional import Promise
+
+try:
+    import orjson
+except ImportError:  # ใช้ json มาตรฐานแทน (ช้ากว่า แต่ผลลัพธ์เหมือนกัน)
+    orjson = None
+
+
+def _default(value):
+    """
+    ชนิดที่ orjson ไม่รู้จัก: Decimal / lazy string ➜ str
+    datetime / date / time / UUID orjson แปลงเอง — json มาตรฐานแปลงที่นี่ให้ได้แบบเดียวกัน
+    (isoformat เต็ม ไม่ตัด microsecond และ +00:00 ไม่ใช่ Z แบบ DjangoJSONEncoder)
+    """
+    if isinstance(value, (Decimal, Promise, UUID)):
+        return str(value)
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def dumps(data) -> bytes:
+    """JSON เป็น bytes ด้วย orjson ถ้าติดตั้งไว้ ไม่งั้นใช้ json มาตรฐาน"""
+    if orjson is not None:
+        return orjson.dumps(data, default=_default)
+    return json.dumps(data, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
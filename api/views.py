@@ -0,0 +1,260 @@
+import base64
+import binascii
+import hashlib
+import json
+
+from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.http import HttpResponse, HttpResponseNotModified
+from django.urls import path
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
+from django.views import View
+
+from core.api.encoders import dumps
+from core.mixins.instrumentation import InstrumentationMixin
+from core.mixins.permissions import PermissionCacheMixin, get_user_permissions
+from core.serviecs.versioning import model_version, track_models
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _cursor_value(value):
+    # isoformat เต็ม (ไม่ตัด microsecond แบบ DjangoJSONEncoder) ไม่งั้น keyset ข้าม / ซ้ำแถว
+    return value.isoformat() if hasattr(value, "isoformat") else str(value)
+
+
+class ApiViewMixin(InstrumentationMixin, LoginRequiredMixin, PermissionCacheMixin, PermissionRequiredMixin):
+    """
+    JSON endpoint ที่สร้างจาก list view (source_view = คลาสที่สืบทอด BaseListMixin)
+      • queryset = source_view.get_queryset() เดียวกับหน้า HTML (ค้นหา ?q=, filter_fields, ช่วงวันที่, ordering)
+        แล้วอ่านเฉพาะคอลัมน์ที่ขอด้วย values() ไม่สร้าง model instance / ไม่ render template
+      • ?fields=pk,number,customer__name เลือกได้เฉพาะใน api_fields
+        (ค่าเริ่มต้น = pk + คอลัมน์ใน list_display ที่เป็นฟิลด์จริง)
+      • ETag จาก querystring + user + version ของโมเดล (core.serviecs.versioning)
+        If-None-Match ตรงกัน ➜ 304 โดยไม่ query ตารางเลย
+      • สิทธิ์: <app_label>.view_<model> ไม่มีสิทธิ์ / ไม่ login ➜ 403
+    """
+    source_view = None
+    api_fields = None
+    fields_param = "fields"
+    raise_exception = True
+    _source = None
+
+    @classmethod
+    def for_view(cls, source_view, **attrs):
+        """สร้างคลาส endpoint ของ source_view (attrs = override เช่น api_fields, page_size)"""
+        attrs.setdefault("__module__", source_view.__module__)
+        track_models(*source_view.get_versioned_models())     # ETag ใช้ version ของโมเดลเหล่านี้
+        return type(f"{source_view.__name__}{cls.__name__}", (cls,), {"source_view": source_view, **attrs})
+
+    @property
+    def model(self):
+        return self.source_view.model
+
+    def get_permission_required(self):
+        opts = self.model._meta
+        return [f"{opts.app_label}.view_{opts.model_name}"]
+
+    def get_source_view(self):
+        """instance ของ source_view สำหรับ request นี้ (ใช้ get_queryset / get_cache_models)"""
+        if self._source is None:
+            self._source = self.source_view()
+            self._source.setup(self.request)
+        return self._source
+
+    # ---------- fields ----------
+    def get_api_fields(self):
+        if self.api_fields is not None:
+            return tuple(self.api_fields)
+        source = self.source_view
+        if source.list_display:
+            plan = source.get_list_query_plan()
+            names = [name for name, field in plan["fields"].items()
+                     if field is not None and not (field.many_to_many or field.one_to_many)]
+        else:
+            names = [f.name for f in self.model._meta.concrete_fields if not f.primary_key]
+        return ("pk", *names)
+
+    def get_fields(self):
+        allowed = self.get_api_fields()
+        requested = [f for f in self.request.GET.get(self.fields_param, "").split(",") if f]
+        unknown = [f for f in requested if f not in allowed]
+        if unknown:
+            raise ApiError(f"ไม่มีฟิลด์ {', '.join(unknown)} (ใช้ได้: {', '.join(allowed)})")
+        return tuple(requested) or allowed
+
+    def get_queryset(self):
+        # select_related / only ถูก values() ล้างเอง แต่ prefetch ใช้กับ dict ไม่ได้
+        return self.get_source_view().get_queryset().prefetch_related(None)
+
+    # ---------- ETag ----------
+    def get_etag(self):
+        request = self.request
+        source = self.get_source_view()
+        query = sorted((k, v) for k in request.GET for v in request.GET.getlist(k))
+        versions = [
+            f"{m._meta.label_lower}={model_version(m)}"
+            for m in sorted(set(source.get_cache_models()), key=lambda m: m._meta.label_lower)
+        ]
+        raw = repr((
+            f"{type(self).__module__}.{type(self).__qualname__}",
+            request.path, query, request.user.pk,
+            sorted(get_user_permissions(request.user)), versions,
+        ))
+        return quote_etag(hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest())
+
+    def etag_matches(self, etag):
+        header = self.request.headers.get("If-None-Match")
+        if not header:
+            return False
+        etags = [e.removeprefix("W/") for e in parse_etags(header)]
+        return "*" in etags or etag in etags
+
+    # ---------- response ----------
+    def json_response(self, data, status=200):
+        return HttpResponse(dumps(data), status=status, content_type="application/json")
+
+    def get(self, request, *args, **kwargs):
+        etag = self.get_etag()
+        if self.etag_matches(etag):
+            response = HttpResponseNotModified()
+        else:
+            try:
+                response = self.json_response(self.get_payload())
+            except ApiError as exc:
+                return self.json_response({"detail": str(exc)}, status=exc.status)
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "private, no-cache"
+        patch_vary_headers(response, ("Cookie",))
+        return response
+
+    def get_payload(self):
+        raise NotImplementedError
+
+
+class ApiListView(ApiViewMixin, View):
+    """
+    GET ➜ {"results": [...], "next": url | null}
+    cursor pagination (keyset) ตาม ordering ของ queryset + pk ไม่มี OFFSET / COUNT(*)
+    คอลัมน์ใน ordering ต้องไม่เป็น NULL
+    """
+    page_size = None            # None ➜ source_view.paginate_by หรือ 50
+    max_page_size = 500
+    limit_param = "limit"
+    cursor_param = "cursor"
+
+    def get_limit(self):
+        default = self.page_size or self.source_view.paginate_by or 50
+        try:
+            limit = int(self.request.GET.get(self.limit_param) or default)
+        except ValueError:
+            raise ApiError("limit ต้องเป็นตัวเลข")
+        return max(1, min(limit, self.max_page_size))
+
+    def get_ordering(self, queryset):
+        """ordering ของ queryset (หรือ Meta.ordering) ต่อท้ายด้วย pk ให้ลำดับไม่ซ้ำ"""
+        ordering = list(queryset.query.order_by) or list(self.model._meta.ordering)
+        if not all(isinstance(item, str) and item != "?" for item in ordering):
+            ordering = [f"-{self.get_source_view().keyset_field}"]
+        pk_names = {"pk", self.model._meta.pk.name}
+        if not pk_names & {item.lstrip("-") for item in ordering}:
+            ordering.append("-pk" if ordering and ordering[-1].startswith("-") else "pk")
+        return ordering
+
+    def encode_cursor(self, values):
+        raw = json.dumps(values, default=_cursor_value)
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    def get_order_field(self, name):
+        """ฟิลด์ของคอลัมน์ใน ordering (pk / fk / fk__field) ใช้แปลงค่าใน cursor กลับเป็นชนิดเดิม"""
+        model, field = self.model, None
+        for part in name.split("__"):
+            field = model._meta.pk if part == "pk" else model._meta.get_field(part)
+            model = field.related_model or model
+        return field
+
+    def decode_cursor(self, cursor, ordering):
+        fields = [self.get_order_field(item.lstrip("-")) for item in ordering]
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+            if not isinstance(values, list) or len(values) != len(fields):
+                raise ValueError(cursor)
+            values = [field.to_python(value) for field, value in zip(fields, values)]
+        except (ValueError, TypeError, ValidationError, binascii.Error):
+            raise ApiError("cursor ไม่ถูกต้อง")
+        if any(value is None for value in values):
+            raise ApiError("cursor ไม่ถูกต้อง")
+        return values
+
+    def cursor_filter(self, ordering, values):
+        """(a, b, pk) > (va, vb, vpk) ตามทิศทางของแต่ละคอลัมน์ ➜ OR ของ (เท่ากันทุกตัวก่อนหน้า AND ตัวนี้มากกว่า/น้อยกว่า)"""
+        condition = Q()
+        for position, item in enumerate(ordering):
+            lookup = "lt" if item.startswith("-") else "gt"
+            branch = Q(**{f"{item.lstrip('-')}__{lookup}": values[position]})
+            for previous, value in zip(ordering[:position], values[:position]):
+                branch &= Q(**{previous.lstrip("-"): value})
+            condition |= branch
+        return condition
+
+    def get_payload(self):
+        fields = self.get_fields()
+        limit = self.get_limit()
+        queryset = self.get_queryset()
+        ordering = self.get_ordering(queryset)
+        order_names = [item.lstrip("-") for item in ordering]
+        extra = [name for name in order_names if name not in fields]
+
+        queryset = queryset.order_by(*ordering)
+        cursor = self.request.GET.get(self.cursor_param)
+        if cursor:
+            queryset = queryset.filter(self.cursor_filter(ordering, self.decode_cursor(cursor, ordering)))
+
+        rows = list(queryset.values(*fields, *extra)[:limit + 1])
+        next_url = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            params = self.request.GET.copy()
+            params[self.cursor_param] = self.encode_cursor([rows[-1][name] for name in order_names])
+            next_url = f"{self.request.path}?{params.urlencode()}"
+        for row in rows:
+            for name in extra:
+                del row[name]
+        return {"results": rows, "next": next_url}
+
+
+class ApiDetailView(ApiViewMixin, View):
+    """GET <pk>/ ➜ แถวเดียว (ฟิลด์ชุดเดียวกับ list) ไม่พบ ➜ 404"""
+
+    def get_payload(self):
+        try:
+            pk = self.model._meta.pk.to_python(self.kwargs["pk"])
+        except (ValueError, ValidationError):
+            raise ApiError("ไม่พบข้อมูล", status=404)
+        row = self.get_queryset().filter(pk=pk).values(*self.get_fields()).first()
+        if row is None:
+            raise ApiError("ไม่พบข้อมูล", status=404)
+        return row
+
+
+def api_urlpatterns(*list_views, **attrs):
+    """
+    URL ของ list view แต่ละตัว: <app_label>/<model_name>/ และ <app_label>/<model_name>/<pk>/
+    ชื่อ url: "<app_label>-<model_name>-list" / "-detail"
+        path("api/", include(api_urlpatterns(InvoiceListView, OrderListView)))
+    """
+    patterns = []
+    for view in list_views:
+        opts = view.model._meta
+        base, name = f"{opts.app_label}/{opts.model_name}/", f"{opts.app_label}-{opts.model_name}"
+        patterns += [
+            path(base, ApiListView.for_view(view, **attrs).as_view(), name=f"{name}-list"),
+            path(f"{base}<pk>/", ApiDetailView.for_view(view, **attrs).as_view(), name=f"{name}-detail"),
+        ]
+    return patterns
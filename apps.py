@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from core import signals
+        from core.serviecs import search
+
+        signals.connect_user_permission_signals()
+        signals.connect_model_version_signals()
+        search.connect_signals()
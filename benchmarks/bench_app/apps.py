@@ -0,0 +1,7 @@
+from django.apps import AppConfig
+
+
+class BenchConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'core.benchmarks.bench_app'
+    label = 'core_bench'
@@ -0,0 +1,20 @@
+import os
+
+from django.db import models
+
+from core.fields import RunningNumberField
+from core.models import BaseTime
+
+# mode ของ RunningNumberField ที่จะวัด (ตั้งผ่าน env เพื่อให้ process ลูกเห็นค่าเดียวกัน)
+BENCH_MODE = os.environ.get("CORE_BENCH_MODE", "lock")
+
+
+class BenchDocument(BaseTime):
+    number = RunningNumberField(pattern="BD{YYYY}{MM}{SEQ:06}", mode=BENCH_MODE)
+    status = models.CharField(max_length=20, default="draft")
+
+
+class BenchLine(BaseTime):
+    document = models.ForeignKey(BenchDocument, related_name="lines", on_delete=models.CASCADE)
+    code = RunningNumberField(pattern="BL{YYYY}{MM}{SEQ:07}", mode=BENCH_MODE)
+    qty = models.IntegerField(default=0)
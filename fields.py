@@ -1,10 +1,27 @@
 from django.db.models import CharField
 
+from core.serviecs.runningPattern import RunningNumberPattern
+
 
 class RunningNumberField(CharField):
-    def __init__(self, *args, pattern: str = "{YYYY}{SEQ:06}", **kwargs):
+    """
+    mode:
+      - "lock"    (ค่าเริ่มต้น) ล็อกแถวล่าสุดในตารางธุรกิจแล้วอ่านเลขถัดไป
+      - "counter" ใช้ตาราง RunningNumberCounter ล็อกเพียงแถวเดียวต่อ prefix
+      - "sequence" ใช้ CREATE SEQUENCE / nextval() ของ PostgreSQL ไม่ล็อกแถว (เลขอาจเว้นช่องได้)
+                   backend อื่นจะกลับไปใช้ "lock"
+    """
+    MODES = ("lock", "counter", "sequence")
+
+    def __init__(self, *args, pattern: str = "{YYYY}{SEQ:06}", mode: str = "lock", **kwargs):
+        if mode not in self.MODES:
+            raise ValueError(f"RunningNumberField mode ต้องเป็นหนึ่งใน {self.MODES} (ได้ {mode!r})")
         self.pattern = pattern
-        kwargs.setdefault("max_length", len(pattern.replace("{SEQ:06}", "0"*6)))
+        self.mode = mode
+        # compile ครั้งเดียวตอนประกาศโมเดล (formatter + parser)
+        self.compiled = RunningNumberPattern.compile(pattern)
+        # ไม่ต่ำกว่าค่าเดิม (migration เดิมไม่เปลี่ยน) แต่พอสำหรับ {SEQ:n} ทุกขนาด
+        kwargs.setdefault("max_length", max(len(pattern.replace("{SEQ:06}", "0"*6)), self.compiled.length))
         kwargs.setdefault("blank", True)
         kwargs.setdefault("unique", True)
         super().__init__(*args, **kwargs)
@@ -12,6 +29,8 @@ class RunningNumberField(CharField):
     def deconstruct(self):
         name, path, args, kwargs = super().deconstruct()
         kwargs["pattern"] = self.pattern 
+        if self.mode != "lock":
+            kwargs["mode"] = self.mode
         return name, path, args, kwargs
 
 """
@@ -19,6 +38,15 @@ class RunningNumberField(CharField):
 """
 # class Invoice(models.Model):
 #     invoice_number = RunningNumberField(
-#         pattern="INV{YYYY}{SEQ:04}",   # ➜ 20250001, 20250002, …
+#         pattern="INV{YYYY}{SEQ:04}",   # ➜ INV20250001, INV20250002, …
 #         verbose_name="เลขใบจ่ายเงิน",
-#     )
\ No newline at end of file
+#     )
+#
+#     # ออกเลขผ่านตารางตัวนับ (ไม่ล็อกตาราง Invoice)
+#     receipt_number = RunningNumberField(pattern="RC{YY}{MM}{SEQ:05}", mode="counter")
+#
+#     # PostgreSQL: nextval() ต่องวด ยอมให้เลขเว้นช่อง (ดู core.operations.RunningNumberSequence)
+#     ticket_number = RunningNumberField(pattern="TK{YY}{MM}{SEQ:06}", mode="sequence")
+#
+#     # token: {YYYY} {YY} {THYYYY} {THYY} {MM} {DD} {SEQ:n}  ข้อความอื่นเป็น literal
+#     memo_number = RunningNumberField(pattern="MEMO-{THYYYY}/{MM}{DD}-{SEQ:03}")  # ➜ MEMO-2568/0815-001
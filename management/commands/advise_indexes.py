@@ -0,0 +1,48 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, router
+
+from core.serviecs.indexAdvisor import IndexAdvisor
+
+
+class Command(BaseCommand):
+    help = "แนะนำ index จาก filter_fields / ช่วงวันที่ / ordering ของ list view ทุกตัวใน URLconf (--write = สร้าง migration)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("models", nargs="*", help="app_label.ModelName (เว้นว่าง = ทุกโมเดลที่มี list view)")
+        parser.add_argument("--urlconf", default=None, help="URLconf ที่จะอ่าน (ค่าเริ่มต้น = ROOT_URLCONF)")
+        parser.add_argument("--explain", action="store_true",
+                            help="สร้าง index ชั่วคราวใน transaction แล้ว EXPLAIN ว่า planner เลือกใช้หรือไม่")
+        parser.add_argument("--write", action="store_true", help="สร้าง migration ของ index ที่แนะนำ (กับ --explain = เฉพาะที่ถูกเลือกใช้)")
+        parser.add_argument("--concurrently", action="store_true", help="PostgreSQL: migration ใช้ CREATE INDEX CONCURRENTLY")
+        parser.add_argument("--name", default="list_indexes", help="ชื่อท้าย migration")
+
+    def handle(self, *args, **options):
+        try:
+            only = {apps.get_model(label) for label in options["models"]}
+        except (LookupError, ValueError) as exc:
+            raise CommandError(str(exc))
+
+        proposals = IndexAdvisor.advise(only, urlconf=options["urlconf"])
+        if not proposals:
+            self.stdout.write("ไม่มี index ที่ต้องเพิ่ม")
+            return
+
+        for proposal in proposals:
+            if options["explain"]:
+                IndexAdvisor.explain(proposal)
+            status = {True: " ✔ planner ใช้", False: " ✘ planner ไม่ใช้", None: ""}[proposal.used]
+            self.stdout.write(f"{proposal}  [{proposal.index().name}]{status}")
+            for reason in proposal.reasons:
+                self.stdout.write(f"    ← {reason}")
+            if proposal.plan and options["verbosity"] > 1:
+                self.stdout.write("    " + proposal.plan.replace("\n", "\n    "))
+
+        if options["write"]:
+            chosen = [p for p in proposals if p.used is not False] if options["explain"] else proposals
+            if options["concurrently"] and any(
+                connections[router.db_for_write(p.model)].vendor != "postgresql" for p in chosen
+            ):
+                raise CommandError("--concurrently ใช้ได้กับ PostgreSQL เท่านั้น")
+            for path in IndexAdvisor.write_migrations(chosen, options["concurrently"], options["name"]):
+                self.stdout.write(f"เขียน {path}")
@@ -0,0 +1,35 @@
+from datetime import date
+
+from django.apps import apps
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from core.serviecs.partition import PartitionService
+
+
+class Command(BaseCommand):
+    help = "ย้ายข้อมูลเก่าของโมเดล PartitionedBaseTime ไปตาราง <table>_archive (PostgreSQL ที่ convert แล้วย้ายทั้ง partition)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("models", nargs="*", help="app_label.ModelName (เว้นว่าง = ทุกโมเดลที่กำหนด archive_after_days)")
+        parser.add_argument("--before", default=None, help="ย้ายข้อมูลที่สร้างก่อนวันที่ YYYY-MM-DD (ค่าเริ่มต้น = archive_after_days)")
+        parser.add_argument("--batch-size", type=int, default=1000, help="จำนวนแถวต่อ transaction (backend ที่ไม่ใช่ partition)")
+
+    def handle(self, *args, **options):
+        labels = options["models"]
+        try:
+            models = [apps.get_model(label) for label in labels] or [
+                m for m in PartitionService.models() if m.archive_after_days is not None
+            ]
+            before = date.fromisoformat(options["before"]) if options["before"] else None
+        except (LookupError, ValueError) as exc:
+            raise CommandError(str(exc))
+
+        if not models:
+            self.stdout.write("ไม่มีโมเดลที่กำหนด archive_after_days")
+        for model in models:
+            try:
+                moved, unit = PartitionService.archive(model, before=before, batch_size=options["batch_size"])
+            except ImproperlyConfigured as exc:
+                raise CommandError(str(exc))
+            self.stdout.write(f"{model._meta.label} ➜ ย้าย {moved} {unit}")
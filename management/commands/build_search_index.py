@@ -0,0 +1,57 @@
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+
+from core.serviecs import search
+
+
+class Command(BaseCommand):
+    help = "สร้าง / rebuild search index ของโมเดลที่ประกาศ search_fields (ใน list view หรือบนโมเดล)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("models", nargs="*", help="app_label.ModelName (เว้นว่าง = ทุกโมเดลที่ลงทะเบียน)")
+        parser.add_argument("--rebuild", action="store_true", help="ลบ index เดิมแล้วสร้างใหม่")
+        parser.add_argument("--backend", default=None, help="alias / dotted path ของ backend (ค่าเริ่มต้นตาม settings)")
+
+    def handle(self, *args, **options):
+        labels = options["models"]
+        try:
+            only = {apps.get_model(label) for label in labels}
+        except (LookupError, ValueError) as exc:
+            raise CommandError(str(exc))
+
+        self.load_declarations(options["backend"])
+        entries = search.registered_models()
+        if options["backend"]:
+            chosen = search.get_search_backend(options["backend"])
+            entries = [e for e in entries if e[0] is chosen]
+
+        done = 0
+        for backend, model, fields in entries:
+            if only and model not in only:
+                continue
+            names = backend.build_index(model, fields, rebuild=options["rebuild"])
+            label = f"{model._meta.label} ({backend.__class__.__name__})"
+            if names:
+                done += 1
+                self.stdout.write(f"{label} ➜ {', '.join(names)}")
+            else:
+                self.stdout.write(f"{label}: backend นี้ไม่ต้องใช้ index บนฐานข้อมูลปัจจุบัน")
+        if not done:
+            self.stdout.write("ไม่มี index ที่ต้องสร้าง")
+
+    def load_declarations(self, backend_name):
+        # import urlconf ➜ view ที่มี search_fields ลงทะเบียนตัวเองผ่าน BaseListMixin
+        urlconf = getattr(settings, "ROOT_URLCONF", None)
+        if urlconf:
+            try:
+                import_string(f"{urlconf}.urlpatterns")
+            except ImportError as exc:
+                self.stderr.write(f"โหลด {urlconf} ไม่ได้: {exc}")
+        # โมเดลที่ประกาศ search_fields ไว้บนคลาสโดยตรง
+        backend = search.get_search_backend(backend_name)
+        for model in apps.get_models():
+            fields = getattr(model, "search_fields", None)
+            if fields:
+                search.register(model, fields, backend)
@@ -0,0 +1,33 @@
+from django.apps import apps
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from core.serviecs.partition import PartitionService
+
+
+class Command(BaseCommand):
+    help = "PostgreSQL: สร้าง partition ล่วงหน้าของโมเดล PartitionedBaseTime (--convert = เปลี่ยนตารางเดิมเป็น partitioned)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("models", nargs="*", help="app_label.ModelName (เว้นว่าง = ทุกโมเดล PartitionedBaseTime)")
+        parser.add_argument("--ahead", type=int, default=3, help="จำนวนช่วง (เดือน / ปี) ที่สร้างล่วงหน้า")
+        parser.add_argument("--convert", action="store_true", help="เปลี่ยนตารางที่ยังไม่เป็น partitioned (ล็อกตารางระหว่างย้ายข้อมูล)")
+
+    def handle(self, *args, **options):
+        labels = options["models"]
+        try:
+            models = [apps.get_model(label) for label in labels] or PartitionService.models()
+        except LookupError as exc:
+            raise CommandError(str(exc))
+
+        for model in models:
+            try:
+                if not PartitionService.is_postgres(model):
+                    self.stdout.write(f"{model._meta.label} ➜ ไม่ใช่ PostgreSQL ข้าม (ใช้ archive_rows)")
+                    continue
+                if options["convert"] and PartitionService.convert(model, ahead=options["ahead"]):
+                    self.stdout.write(f"{model._meta.label} ➜ convert เป็น partitioned แล้ว")
+                created = PartitionService.ensure_partitions(model, ahead=options["ahead"])
+            except ImproperlyConfigured as exc:
+                raise CommandError(str(exc))
+            self.stdout.write(f"{model._meta.label} ➜ สร้าง partition ใหม่ {created}")
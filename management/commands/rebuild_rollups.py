@@ -0,0 +1,30 @@
+from datetime import date
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from core.serviecs.rollup import RollupService
+
+
+class Command(BaseCommand):
+    help = "คำนวณตาราง DailyRollup ใหม่จากข้อมูลจริง (backfill / แก้ยอดเพี้ยน) ตาม settings.CORE_ROLLUPS"
+
+    def add_arguments(self, parser):
+        parser.add_argument("models", nargs="*", help="app_label.ModelName (เว้นว่าง = ทุกโมเดลใน CORE_ROLLUPS)")
+        parser.add_argument("--since", default=None, help="คำนวณใหม่ตั้งแต่วันที่ YYYY-MM-DD (ค่าเริ่มต้น = ทั้งหมด)")
+
+    def handle(self, *args, **options):
+        labels = options["models"]
+        try:
+            models = [apps.get_model(label) for label in labels] or list(RollupService.config())
+            since = date.fromisoformat(options["since"]) if options["since"] else None
+        except (LookupError, ValueError) as exc:
+            raise CommandError(str(exc))
+
+        if not models:
+            self.stdout.write("ไม่มีโมเดลใน CORE_ROLLUPS")
+        for model in models:
+            if RollupService.options(model) is None:
+                raise CommandError(f"{model._meta.label} ไม่ได้อยู่ใน CORE_ROLLUPS")
+            rows = RollupService.rebuild(model, since=since)
+            self.stdout.write(f"{model._meta.label} ➜ {rows} แถว")
@@ -0,0 +1,54 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from core.fields import RunningNumberField
+from core.models import RunningNumberCounter
+from core.serviecs.runningNumber import RunningNumberService
+
+
+class Command(BaseCommand):
+    help = "Seed ตาราง RunningNumberCounter จากเลขที่มีอยู่แล้วในตารางธุรกิจ"
+
+    def add_arguments(self, parser):
+        parser.add_argument("models", nargs="*", help="app_label.ModelName (เว้นว่าง = ทุกโมเดล)")
+        parser.add_argument("--all", action="store_true", help="seed ทุก RunningNumberField ไม่ใช่เฉพาะ mode=counter")
+        parser.add_argument("--dry-run", action="store_true", help="แสดงผลอย่างเดียว ไม่บันทึก")
+
+    def handle(self, *args, **options):
+        labels = options["models"]
+        try:
+            models = [apps.get_model(label) for label in labels] or apps.get_models()
+        except (LookupError, ValueError) as exc:
+            raise CommandError(str(exc))
+
+        for model in models:
+            for field in model._meta.concrete_fields:
+                if not isinstance(field, RunningNumberField):
+                    continue
+                if field.mode != "counter" and not options["all"]:
+                    continue
+                self.seed_field(model, field, dry_run=options["dry_run"])
+
+    def seed_field(self, model, field, *, dry_run=False):
+        latest = {}
+        values = (model._base_manager.exclude(**{field.name: ""})
+                  .exclude(**{f"{field.name}__isnull": True})
+                  .values_list(field.name, flat=True)
+                  .iterator(chunk_size=2000))
+        for value in values:
+            parsed = field.compiled.parse_period_key(value)
+            if parsed is None:
+                continue
+            period_key, seq = parsed
+            latest[period_key] = max(latest.get(period_key, 0), seq)
+
+        label = f"{model._meta.label}.{field.name}"
+        for prefix, seq in sorted(latest.items()):
+            key = RunningNumberService.counter_key(model, field.name, prefix)
+            if not dry_run:
+                RunningNumberCounter.objects.get_or_create(**key)
+                RunningNumberCounter.objects.filter(**key, last_value__lt=seq).update(last_value=seq)
+            self.stdout.write(f"{label} [{prefix}] ➜ {seq}")
+
+        if not latest:
+            self.stdout.write(f"{label}: ไม่พบข้อมูล")
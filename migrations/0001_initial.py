@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RunningNumberCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_label', models.CharField(max_length=100, verbose_name='โมเดล')),
+                ('field', models.CharField(max_length=100, verbose_name='ฟิลด์')),
+                ('prefix', models.CharField(blank=True, max_length=100, verbose_name='prefix')),
+                ('last_value', models.PositiveBigIntegerField(default=0, verbose_name='เลขล่าสุด')),
+            ],
+            options={
+                'verbose_name': 'ตัวนับเลขรัน',
+                'constraints': [models.UniqueConstraint(fields=('model_label', 'field', 'prefix'), name='core_running_counter_key')],
+            },
+        ),
+    ]
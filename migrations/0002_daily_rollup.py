@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_label', models.CharField(max_length=100, verbose_name='โมเดล')),
+                ('day', models.DateField(verbose_name='วันที่')),
+                ('status', models.CharField(blank=True, max_length=100, verbose_name='สถานะ')),
+                ('count', models.BigIntegerField(default=0, verbose_name='จำนวน')),
+                ('amount', models.DecimalField(decimal_places=4, default=0, max_digits=20, verbose_name='ยอดรวม')),
+            ],
+            options={
+                'verbose_name': 'ยอดสรุปรายวัน',
+                'indexes': [models.Index(fields=['model_label', '-day'], name='core_dailyr_model_l_6b5180_idx')],
+                'constraints': [models.UniqueConstraint(fields=('model_label', 'day', 'status'), name='core_daily_rollup_key')],
+            },
+        ),
+    ]
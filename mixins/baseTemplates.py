@@ -1,10 +1,89 @@
-from django.db.models import Q
+from datetime import timedelta
 
-class BaseListMixin:
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.utils.cache import patch_vary_headers
+from django.utils.formats import localize, number_format
+from django.utils import timezone
+from django.utils.safestring import mark_safe
+from django.utils.timezone import template_localtime
+
+from core.mixins.cache import VersionedCacheMixin
+from core.mixins.export import ListExportMixin
+from core.mixins.pagination import KeysetPaginationMixin
+from core.models import TimePartitionQuerySet
+from core.serviecs import search
+
+
+class ListRow:
+    """one precomputed table row: cells are already formatted strings"""
+    __slots__ = ("obj", "pk", "label", "cells")
+
+    def __init__(self, obj, cells):
+        self.obj = obj
+        self.pk = obj.pk
+        self.label = str(obj)
+        self.cells = cells
+
+
+def _column_getter(path):
+    parts = path.split("__")
+
+    def get(obj):
+        for part in parts:
+            if obj is None:
+                return None
+            obj = getattr(obj, part, None)
+        return obj() if callable(obj) and not isinstance(obj, models.Manager) else obj
+    return get
+
+
+def _format_default(value):
+    # same conversion the template engine applies to {{ value }}
+    if value is None:
+        return ""
+    return localize(template_localtime(value))
+
+
+def _column_formatter(field):
+    """pick the display formatter once per column (choices / money / relations / default)"""
+    if field is None:
+        return _format_default
+    if field.many_to_many or field.one_to_many:
+        return lambda manager: ", ".join(str(o) for o in manager.all()) if manager is not None else ""
+    if getattr(field, "choices", None):
+        choices = {k: str(v) for k, v in field.flatchoices}
+        return lambda value: choices.get(value, _format_default(value))
+    if isinstance(field, models.DecimalField):
+        places = field.decimal_places
+        return lambda value: "" if value is None else number_format(value, places, force_grouping=True)
+    return _format_default
+
+
+class BaseListMixin(ListExportMixin, VersionedCacheMixin, KeysetPaginationMixin):
     """
     Generic ListView helper:
       • list_display, field_labels, search_fields, filter_fields
       • optional date-range filter: ?start_date=YYYY-MM-DD & ?end_date=YYYY-MM-DD
+        (PartitionedBaseTime with date fields = "created_at": whole-day created_at bounds that
+        prune partitions; date_default_days limits an unfiltered list to recent data)
+      • ?q= goes through a pluggable search backend (core.serviecs.search):
+        search_backend = "icontains" | "postgres" | "trigram" | "sqlite_fts" | "auto"
+        (default: settings.CORE_SEARCH_BACKEND, else plain icontains)
+      • pagination = "keyset" ➜ cursor pagination on (created_at, pk), no OFFSET / COUNT(*)
+      • list_display (incl. "fk" and "fk__field" paths) is inspected once per class and the
+        queryset gets select_related / prefetch_related / only() automatically.
+        Override with list_select_related / list_prefetch_related / list_only
+        (None = auto, () = off) or override shape_queryset().
+      • rows are precomputed for the template (context "rows" / "columns"): a getter and a
+        formatter (choices, money, dates, M2M) is resolved once per column, not per cell.
+      • ?export=csv | xlsx streams every matching row (see core.mixins.export)
+      • cache_mode = "fragment" caches the rendered table (partials/list_table.html) keyed by
+        querystring + permission set + model versions (see core.mixins.cache)
+      • HTMX requests (HX-Request, not boosted / history restore) get only the table +
+        pagination fragment; base_list.html wires the filter form and pager with hx-get
     """
 
     # table / search config
@@ -13,12 +92,85 @@ class BaseListMixin:
     ordering       = ()
     search_fields  = ()
     filter_fields  = ()
+    search_backend = None
+
+    # query shaping (None = derive from list_display)
+    list_select_related   = None
+    list_prefetch_related = None
+    list_only             = None
+
+    fragment_template_name = "partials/list_table.html"
+    _cached_fragment = None
 
     # 🔹 date-range config (override per-view if field names differ)
     date_start_param = "start_date"
     date_end_param   = "end_date"
     date_start_field = "start"       # model field ≥
     date_end_field   = "end"         # model field ≤
+    date_default_days = None         # partitioned models: no start_date ➜ only the last N days
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # register (model, search_fields) so the backend can keep / build its index
+        model = cls.__dict__.get("model") or getattr(cls, "model", None)
+        if model is not None and cls.search_fields:
+            search.register(model, cls.search_fields, search.get_search_backend(cls.search_backend))
+        if model is not None and cls.list_display:
+            cls.get_list_query_plan()
+
+    @classmethod
+    def get_list_query_plan(cls):
+        """select_related / prefetch_related / only / labels derived from list_display, cached per class"""
+        plan = cls.__dict__.get("_list_query_plan")
+        if plan is None:
+            plan = cls._build_list_query_plan()
+            cls._list_query_plan = plan
+        return plan
+
+    @classmethod
+    def _build_list_query_plan(cls):
+        select, prefetch, only, labels, columns, fields = set(), set(), {"pk"}, {}, [], {}
+        related = set()
+        # a custom __str__ (used for the delete modal) may read any column ➜ no only()
+        can_defer = cls.model.__str__ is models.Model.__str__
+
+        for name in cls.list_display:
+            model, path, field = cls.model, [], None
+            for part in name.split("__"):
+                try:
+                    field = model._meta.get_field(part)
+                except FieldDoesNotExist:
+                    field = None    # property / method ➜ we can't tell what it reads
+                    break
+                path.append(part)
+                if field.is_relation:
+                    related.add(field.related_model)
+                if field.many_to_many or field.one_to_many:
+                    prefetch.add("__".join(path))
+                    break
+                if field.is_relation:
+                    select.add("__".join(path))
+                    model = field.related_model
+            if field is None:
+                can_defer = False
+            else:
+                labels[name] = str(field.verbose_name if hasattr(field, "verbose_name") else field.name).title()
+                if not (field.many_to_many or field.one_to_many):
+                    only.add(name)
+            columns.append((name, _column_getter(name), _column_formatter(field)))
+            fields[name] = field
+
+        return {
+            "select_related": tuple(sorted(select)),
+            "prefetch_related": tuple(sorted(prefetch)),
+            "only": tuple(sorted(only)) if can_defer else (),
+            "labels": labels,
+            "columns": tuple(columns),
+            "fields": fields,
+            # every column is a plain value ➜ exports can use values_list()
+            "flat": all(f is not None and not f.is_relation for f in fields.values()),
+            "models": tuple(related),
+        }
 
     # ------------------------------------------------------------------ queryset
     def get_queryset(self):
@@ -27,10 +179,7 @@ class BaseListMixin:
         # keyword search
         q = self.request.GET.get("q")
         if q and self.search_fields:
-            queries = Q()
-            for f in self.search_fields:
-                queries |= Q(**{f"{f}__icontains": q})
-            qs = qs.filter(queries)
+            qs = self.get_search_backend().filter(qs, self.search_fields, q)
 
         # exact-match filters
         for f in self.filter_fields:
@@ -41,23 +190,59 @@ class BaseListMixin:
         # date-range filter
         start_val = self.request.GET.get(self.date_start_param)
         end_val   = self.request.GET.get(self.date_end_param)
-        if start_val:
-            qs = qs.filter(**{f"{self.date_start_field}__gte": start_val})
-        if end_val:
-            qs = qs.filter(**{f"{self.date_end_field}__lte": end_val})
+        if self.date_prunes_partitions(qs):
+            # PartitionedBaseTime: plain created_at bounds so PostgreSQL skips other partitions
+            if not start_val and self.date_default_days:
+                start_val = timezone.localdate() - timedelta(days=self.date_default_days - 1)
+            qs = qs.created_between(start_val, end_val)
+        else:
+            if start_val:
+                qs = qs.filter(**{f"{self.date_start_field}__gte": start_val})
+            if end_val:
+                qs = qs.filter(**{f"{self.date_end_field}__lte": end_val})
 
         # ordering
         if self.ordering:
             qs = qs.order_by(*self.ordering)
+        return self.shape_queryset(qs)
+
+    def date_prunes_partitions(self, qs):
+        """date range is on created_at of a TimePartitionQuerySet (PartitionedBaseTime.objects)"""
+        return (isinstance(qs, TimePartitionQuerySet)
+                and self.date_start_field == self.date_end_field == "created_at")
+
+    def shape_queryset(self, qs):
+        """apply select_related / prefetch_related / only() for the columns in list_display"""
+        if not self.list_display:
+            return qs
+        plan = self.get_list_query_plan()
+        select = plan["select_related"] if self.list_select_related is None else self.list_select_related
+        prefetch = plan["prefetch_related"] if self.list_prefetch_related is None else self.list_prefetch_related
+        only = plan["only"] if self.list_only is None else self.list_only
+        if select:
+            qs = qs.select_related(*select)
+        if prefetch:
+            qs = qs.prefetch_related(*prefetch)
+        if only:
+            # keyset cursor reads keyset_field from each row
+            extra = (self.keyset_field,) if self.pagination == "keyset" else ()
+            qs = qs.only(*only, *extra)
         return qs
 
     # ------------------------------------------------------------------ context
     def get_context_data(self, **kwargs):
+        fragment = self.get_cached_fragment()
+        if fragment is not None:
+            # the table comes from cache ➜ skip the page query and COUNT(*)
+            kwargs["object_list"] = []
         ctx = super().get_context_data(**kwargs)
+        field_labels = self.get_field_labels()
         ctx.update(
             {
                 "list_display": self.list_display,
-                "field_labels": self.get_field_labels(),
+                "field_labels": field_labels,
+                "columns": [(f, field_labels.get(f, f)) for f in self.list_display],
+                "rows": self.build_rows(ctx["object_list"]),
                 "create_url_name": getattr(self, "create_url_name", None),
                 "update_url_name": getattr(self, "update_url_name", None),
                 "delete_url_name": getattr(self, "delete_url_name", None),
@@ -67,13 +252,81 @@ class BaseListMixin:
                 "end_date": self.request.GET.get(self.date_end_param, ""),
             }
         )
+        if self.cache_mode == "fragment":
+            if fragment is None:
+                fragment = render_to_string(self.fragment_template_name, ctx, request=self.request)
+                if self.cache_usable():
+                    self.view_cache.set(self.get_view_cache_key("fragment"), str(fragment), self.cache_timeout)
+            ctx["table_html"] = mark_safe(fragment)
         return ctx
 
+    # ------------------------------------------------------------------ htmx
+    def is_htmx_partial(self):
+        meta = self.request.META
+        return (
+            bool(getattr(self.request, "htmx", False) or meta.get("HTTP_HX_REQUEST"))
+            and not meta.get("HTTP_HX_BOOSTED")
+            and not meta.get("HTTP_HX_HISTORY_RESTORE_REQUEST")
+        )
+
+    def get_template_names(self):
+        if self.is_htmx_partial():
+            return [self.fragment_template_name]
+        return super().get_template_names()
+
+    def render_to_response(self, context, **response_kwargs):
+        if self.is_htmx_partial() and context.get("table_html"):
+            response = HttpResponse(context["table_html"])
+        else:
+            response = super().render_to_response(context, **response_kwargs)
+        patch_vary_headers(response, ("HX-Request",))
+        return response
+
+    # ------------------------------------------------------------------ fragment cache
+    def get_cached_fragment(self):
+        if self.cache_mode != "fragment" or not self.cache_usable():
+            return None
+        if self._cached_fragment is None:
+            self._cached_fragment = self.view_cache.get(self.get_view_cache_key("fragment"))
+        return self._cached_fragment
+
+    def get_paginate_by(self, queryset):
+        if self._cached_fragment is not None:
+            return None
+        return super().get_paginate_by(queryset)
+
+    def get_cache_models(self):
+        models = super().get_cache_models()
+        if self.list_display:
+            models.extend(self.get_list_query_plan()["models"])
+        return models
+
+    @classmethod
+    def uses_model_versions(cls):
+        return super().uses_model_versions() or cls.count_strategy != "exact"
+
+    @classmethod
+    def get_versioned_models(cls):
+        models = super().get_versioned_models()
+        if cls.list_display:
+            models.extend(cls.get_list_query_plan()["models"])
+        return models
+
     # ------------------------------------------------------------------ helpers
+    def build_rows(self, object_list):
+        if not self.list_display:
+            return [ListRow(obj, []) for obj in object_list]
+        columns = self.get_list_query_plan()["columns"]
+        return [
+            ListRow(obj, [fmt(get(obj)) for _, get, fmt in columns])
+            for obj in object_list
+        ]
+
+    def get_search_backend(self):
+        return search.get_search_backend(self.search_backend)
+
     def get_field_labels(self):
         if self.field_labels:
             return self.field_labels
-        return {
-            f: self.model._meta.get_field(f).verbose_name.title()
-            for f in self.list_display
-        }
\ No newline at end of file
+        labels = self.get_list_query_plan()["labels"]
+        return {f: labels.get(f, f.replace("__", " ").replace("_", " ").title()) for f in self.list_display}
\ No newline at end of file
@@ -0,0 +1,94 @@
+import hashlib
+
+from django.contrib.messages import get_messages
+from django.core.cache import caches
+from django.http import HttpResponse
+
+from core.mixins.permissions import get_user_permissions
+from core.serviecs.versioning import model_version, track_models
+
+
+class VersionedCacheMixin:
+    """
+    cache ผลลัพธ์ของ view แบบ opt-in โดย key ประกอบด้วย
+      querystring ที่ normalize แล้ว + ชุดสิทธิ์ของ user + version ของทุกโมเดลที่เกี่ยวข้อง
+    โมเดลถูก save / delete (หรือ bulk update ผ่าน bump_model_version) ➜ version เปลี่ยน
+    ➜ key เดิมไม่ถูกใช้อีก ไม่ต้องไล่ลบ key (O(1)) ใช้ได้กับ LocMemCache / FileBasedCache
+
+    cache_mode
+      None        ปิด (ค่าเริ่มต้น)
+      "response"  cache ทั้ง response (แยกต่อ user) ไม่เก็บถ้าหน้านั้นใช้ csrf token
+      "fragment"  cache เฉพาะส่วนตาราง (BaseListMixin) หน้าเต็ม/csrf render ใหม่ทุกครั้ง
+                  ใช้ร่วมกันระหว่าง user ที่มีสิทธิ์ชุดเดียวกัน
+    ไม่อ่าน / ไม่เก็บ cache เมื่อมี flash message ค้างอยู่
+    """
+    cache_mode = None               # None | "response" | "fragment"
+    cache_timeout = 300
+    cache_alias = "default"
+    cache_models = ()               # โมเดลอื่นที่มีผลกับหน้านี้ (นอกจาก self.model)
+    cache_per_user = None           # None ➜ response: แยกต่อ user, fragment: แยกตามชุดสิทธิ์
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # save / delete ของโมเดลที่หน้านี้ใช้ ➜ เพิ่ม version (โมเดลอื่นไม่ต้อง)
+        if getattr(cls, "model", None) is not None and cls.uses_model_versions():
+            track_models(*cls.get_versioned_models())
+
+    @classmethod
+    def uses_model_versions(cls):
+        return cls.cache_mode is not None
+
+    @classmethod
+    def get_versioned_models(cls):
+        return [cls.model, *cls.cache_models]
+
+    @property
+    def view_cache(self):
+        return caches[self.cache_alias]
+
+    def get_cache_models(self):
+        return [self.model, *self.cache_models]
+
+    def cache_usable(self):
+        request = self.request
+        if request.method not in ("GET", "HEAD"):
+            return False
+        return not len(get_messages(request))
+
+    def get_view_cache_key(self, kind):
+        request = self.request
+        query = sorted((k, v) for k in request.GET for v in request.GET.getlist(k))
+        perms = sorted(get_user_permissions(request.user))
+        per_user = self.cache_per_user if self.cache_per_user is not None else kind == "response"
+        versions = [
+            f"{m._meta.label_lower}={model_version(m)}"
+            for m in sorted(set(self.get_cache_models()), key=lambda m: m._meta.label_lower)
+        ]
+        raw = repr((
+            f"{type(self).__module__}.{type(self).__qualname__}",
+            request.path, query, perms,
+            request.user.pk if per_user else None,
+            versions,
+        ))
+        return f"core:view:{kind}:{hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()}"
+
+    def get(self, request, *args, **kwargs):
+        if self.cache_mode != "response" or not self.cache_usable():
+            return super().get(request, *args, **kwargs)
+
+        key = self.get_view_cache_key("response")
+        hit = self.view_cache.get(key)
+        if hit is not None:
+            content, content_type = hit
+            response = HttpResponse(content, content_type=content_type)
+            response["X-View-Cache"] = "hit"
+            return response
+
+        response = super().get(request, *args, **kwargs)
+        if hasattr(response, "render") and not response.is_rendered:
+            response.render()
+        # get_token() ถูกเรียก (หน้ามี csrf token) ➜ Django 4.1+ ตั้ง CSRF_COOKIE_NEEDS_UPDATE
+        csrf_used = request.META.get("CSRF_COOKIE_NEEDS_UPDATE") or request.META.get("CSRF_COOKIE_USED")
+        if response.status_code == 200 and not response.streaming and not csrf_used:
+            self.view_cache.set(key, (response.content, response["Content-Type"]), self.cache_timeout)
+        return response
@@ -1,12 +1,18 @@
-from django.core.exceptions import ImproperlyConfigured
+import random
+import time
+
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
 from django.contrib import messages
 from django.shortcuts import redirect
-from django.db import transaction
+from django.db import DatabaseError, IntegrityError, transaction
 from django.http import HttpResponse
 from django.utils.safestring import mark_safe
 
 from core.serviecs.runningNumber import RunningNumberService
 from core.fields import RunningNumberField
+from core.serviecs.rollup import RollupService
+from core.serviecs.search import SQLiteFTSSearchBackend
+from core.serviecs.versioning import bump_model_version
 
 
 class FormsetMixin:
@@ -26,6 +32,16 @@ class FormsetMixin:
     formset_names = None
     formset_classes = {}
 
+    # ลองบันทึกใหม่เมื่อเลขรันชนกัน (เช่น SQLite หลาย worker)
+    running_number_retries = 3
+    running_number_backoff = 0.05  # วินาที (x2 ทุกครั้ง + jitter)
+
+    # บันทึก inline formset ด้วย bulk_create / bulk_update แทน save() ทีละแถว
+    bulk_save = False
+    bulk_batch_size = 500
+
+    _formsets = None  # registry ต่อ request ดู get_formsets()
+
     # ---------- helpers (เพิ่มเฉพาะส่วน error ของ formset) ----------
     def _flatten_formset_errors(self, formset, *, label=""):
         """
@@ -95,26 +111,37 @@ class FormsetMixin:
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        for name in self.get_formset_names():
-            if name in context:
-                continue
-            formset_class = self.get_formset_class(name)
-            if not formset_class:
-                continue
-            if self.request.method == "POST":
-                context[name] = formset_class(
-                    self.request.POST,
-                    self.request.FILES,
-                    instance=getattr(self, "object", None),
-                    prefix=name,
-                )
-            else:
-                context[name] = formset_class(
-                    instance=getattr(self, "object", None),
-                    prefix=name,
-                )
+        for name, formset in self.get_formsets().items():
+            context.setdefault(name, formset)
         return context
 
+    def get_formsets(self):
+        """
+        คืน {name: formset} ที่สร้างครั้งเดียวต่อ request (view instance)
+        get_context_data / form_valid / form_invalid ใช้ object ชุดเดียวกัน
+        จึง parse POST, query instance และ validate เพียงรอบเดียว
+        """
+        if self._formsets is None:
+            self._formsets = {}
+            for name in self.get_formset_names():
+                formset = self.build_formset(name)
+                if formset is not None:
+                    self._formsets[name] = formset
+        return self._formsets
+
+    def build_formset(self, name):
+        """สร้าง formset ตามชื่อ — ถ้ามี get_<name>_formset() จะใช้เมธอดนั้นแทน"""
+        method = getattr(self, f"get_{name}_formset", None)
+        if method:
+            return method()
+        formset_class = self.get_formset_class(name)
+        if not formset_class:
+            return None
+        kwargs = {"instance": getattr(self, "object", None), "prefix": name}
+        if self.request.method == "POST":
+            return formset_class(self.request.POST, self.request.FILES, **kwargs)
+        return formset_class(**kwargs)
+
     def get_formset_class(self, name):
         names = self.get_formset_names()
         if not names:
@@ -137,14 +164,14 @@ class FormsetMixin:
 
     def get_permission_required(self):
         model = getattr(self, "model", None)
+        obj = self.get_object_if_exists()
         if not model:
-            obj = self.get_object_if_exists()
             if obj:
                 model = obj.__class__
             else:
                 raise ImproperlyConfigured("Permission system requires model or get_object()")
         mode = (
-            "add" if self.request.method.lower() == "post" and not self.get_object_if_exists()
+            "add" if self.request.method.lower() == "post" and not obj
             else "change"
         )
         return [f"{model._meta.app_label}.{mode}_{model._meta.model_name}"]
@@ -153,32 +180,38 @@ class FormsetMixin:
         return self.status or self.request.POST.get("status") or self.request.GET.get("status")
 
     def _assign_running_numbers(self, obj):
-        for field in obj._meta.get_fields(include_hidden=False):
-            if isinstance(field, RunningNumberField) and not getattr(obj, field.name):
-                number = RunningNumberService.next(
-                    model=obj.__class__,
-                    field=field.name,
-                    pattern=field.pattern,
-                )
+        self._assign_running_numbers_many([obj])
+
+    def _assign_running_numbers_many(self, objs):
+        """
+        เติมเลขรันให้หลาย instance พร้อมกัน: จองเป็นบล็อกครั้งเดียวต่อ (model, field)
+        แทนการเรียก RunningNumberService.next ทีละแถว
+        """
+        assigned = getattr(self, "_assigned_running_numbers", None)
+        pending = {}
+        for obj in objs:
+            for field in obj._meta.get_fields(include_hidden=False):
+                if isinstance(field, RunningNumberField) and not getattr(obj, field.name):
+                    pending.setdefault((obj.__class__, field), []).append(obj)
+
+        for (model, field), targets in pending.items():
+            numbers = RunningNumberService.next_many(
+                model=model,
+                field=field.name,
+                pattern=field.compiled,
+                n=len(targets),
+            )
+            for obj, number in zip(targets, numbers):
                 setattr(obj, field.name, number)
+                if assigned is not None:
+                    assigned.append((obj, field.name))
 
     def _assign_status(self, obj):
         value = self.get_status_value()
         if value and hasattr(obj, "status"):
             obj.status = value
 
-    def form_valid(self, form):
-        context = self.get_context_data(form=form)
-        names = self.get_formset_names()
-        formsets = [context[name] for name in names if name in context]
-
-        # validate formset
-        invalid = [fs for fs in formsets if not fs.is_valid()]
-        if invalid:
-            formsets_by_name = {name: context.get(name) for name in names}
-            self._add_formset_errors_to_messages(formsets_by_name)
-            return self.render_to_response(context)  
-
+    def _save_all(self, form, formsets):
         with transaction.atomic():
             self.object = form.save(commit=False)
             if hasattr(self.model, "created_by") and not self.object.pk:
@@ -188,13 +221,111 @@ class FormsetMixin:
             self.object.save()
             form.save_m2m()
 
+            # จองเลขรันของทุกแถวในทุก formset ครั้งเดียวต่อ (model, field)
+            self._assign_running_numbers_many(
+                f.instance for fs in formsets for f in fs.forms
+                if f.has_changed() and not f.cleaned_data.get("DELETE")
+            )
             for fs in formsets:
-                for f in fs.forms:
-                    if f.cleaned_data.get("DELETE"):
-                        continue
-                    self._assign_running_numbers(f.instance)
                 fs.instance = self.object
-                fs.save()
+                if self.bulk_save:
+                    self._bulk_save_formset(fs)
+                else:
+                    fs.save()
+
+    def _bulk_save_formset(self, fs):
+        """
+        บันทึก formset แบบ bulk (bulk_save = True):
+          แถวใหม่ ➜ bulk_create, แถวที่แก้ ➜ bulk_update เฉพาะฟิลด์ที่เปลี่ยน,
+          แถวที่ลบ ➜ filter(pk__in=...).delete() ครั้งเดียว
+        ยังผ่าน save_new/save_existing(commit=False) ของ formset และเรียก save_m2m ตามปกติ
+        หมายเหตุ: ไม่ยิง pre_save/post_save รายแถว (sync rollup / ตาราง FTS เอง) และ save_m2m ต้องการ backend ที่คืน pk
+        จาก bulk_create ได้ (PostgreSQL, SQLite 3.35+, MariaDB 10.5+)
+        """
+        fs.save(commit=False)
+        manager = fs.model._default_manager
+
+        if fs.new_objects:
+            manager.bulk_create(fs.new_objects, batch_size=self.bulk_batch_size)
+            RollupService.record_created(fs.new_objects, using=manager.db)
+            SQLiteFTSSearchBackend.sync(fs.model, fs.new_objects, using=manager.db)
+
+        by_fields = {}
+        for obj, changed_data in fs.changed_objects:
+            fields = self._bulk_update_fields(obj, changed_data)
+            if fields:
+                by_fields.setdefault(fields, []).append(obj)
+        for fields, objs in by_fields.items():
+            RollupService.prepare_many(fs.model, objs, using=manager.db)
+            manager.bulk_update(objs, fields, batch_size=self.bulk_batch_size)
+            RollupService.record_changed(objs, using=manager.db)
+            SQLiteFTSSearchBackend.sync(fs.model, objs, fields=fields, using=manager.db)
+
+        deleted = [obj.pk for obj in fs.deleted_objects if obj.pk is not None]
+        if deleted:
+            manager.filter(pk__in=deleted).delete()
+
+        fs.save_m2m()
+        # bulk_create / bulk_update ไม่ยิง post_save ➜ แจ้ง cache ที่ผูกกับ version ของตารางเอง
+        if fs.new_objects or by_fields:
+            bump_model_version(fs.model)
+
+    def _bulk_update_fields(self, obj, changed_data):
+        """แปลงชื่อฟิลด์ในฟอร์มที่เปลี่ยน เป็นฟิลด์ของโมเดลที่ bulk_update ได้ (+ auto_now)"""
+        fields = set()
+        for name in changed_data:
+            try:
+                field = obj._meta.get_field(name)
+            except FieldDoesNotExist:
+                continue
+            if field.concrete and not field.primary_key and not field.many_to_many:
+                fields.add(field.name)
+        if not fields:
+            return ()
+        for field in obj._meta.concrete_fields:
+            if getattr(field, "auto_now", False):
+                field.pre_save(obj, add=False)
+                fields.add(field.name)
+        return tuple(sorted(fields))
+
+    def _save_with_retry(self, form, formsets):
+        """
+        บันทึกทั้งหมดใน transaction เดียว ถ้าเลขรันชน unique (หรือ SQLite database is locked)
+        จะคืนสถานะ instance ออกเลขใหม่แล้วลองอีก ไม่เกิน running_number_retries ครั้ง (backoff แบบทวีคูณ)
+        """
+        instances = [form.instance] + [f.instance for fs in formsets for f in fs.forms]
+        adding = [(obj, obj._state.adding) for obj in instances]
+
+        for attempt in range(self.running_number_retries + 1):
+            self._assigned_running_numbers = []
+            try:
+                return self._save_all(form, formsets)
+            except DatabaseError as exc:
+                # IntegrityError จะลองใหม่เฉพาะเมื่อรอบนี้ออกเลขรันให้จริง
+                retry = RunningNumberService.is_retryable_error(exc) and (
+                    self._assigned_running_numbers or not isinstance(exc, IntegrityError)
+                )
+                if attempt >= self.running_number_retries or not retry:
+                    raise
+            for obj, name in self._assigned_running_numbers:
+                setattr(obj, name, "")
+            for obj, was_adding in adding:
+                if was_adding:
+                    obj.pk = None
+                    obj._state.adding = True
+            time.sleep(self.running_number_backoff * (2 ** attempt) * (1 + random.random()))
+
+    def form_valid(self, form):
+        formsets_by_name = self.get_formsets()
+        formsets = list(formsets_by_name.values())
+
+        # validate formset
+        invalid = [fs for fs in formsets if not fs.is_valid()]
+        if invalid:
+            self._add_formset_errors_to_messages(formsets_by_name)
+            return self.render_to_response(self.get_context_data(form=form))
+
+        self._save_with_retry(form, formsets)
 
         messages.success(self.request, self.success_message)
 
@@ -206,16 +337,12 @@ class FormsetMixin:
         return redirect(self.get_success_url())
 
     def form_invalid(self, form):
-        context = self.get_context_data(form=form)
+        formsets_by_name = self.get_formsets()
         # debug print เดิม
         print("Main form errors ➜", form.errors, flush=True)
-        for name in self.get_formset_names():
-            fs = context.get(name)
-            if fs:
-                print(f"{name} errors ➜", fs.errors, flush=True)
+        for name, fs in formsets_by_name.items():
+            print(f"{name} errors ➜", fs.errors, flush=True)
 
-        names = self.get_formset_names()
-        formsets_by_name = {name: context.get(name) for name in names}
         self._add_formset_errors_to_messages(formsets_by_name)
 
-        return self.render_to_response(context) 
+        return self.render_to_response(self.get_context_data(form=form))
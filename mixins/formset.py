@@ -1,10 +1,28 @@
+import hashlib
+
+from django.core.cache import cache
+from django.forms import ModelChoiceField
 from django.views import View
 from django.http import HttpResponse
 from django.template.loader import render_to_string
+from django.utils import translation
+
+from core.serviecs.versioning import model_version, track_models
 
 
 class DynamicFormSetView(View):
-    """Parent Add Formset """
+    """
+    Parent Add Formset
+    HTML ของ empty_form ถูก render ครั้งเดียวแล้ว cache ไว้ต่อ
+    (formset class, prefix, ภาษา, version ของโมเดลที่เป็นตัวเลือกใน select)
+    แต่ละแถวใหม่แค่แทนที่ "__prefix__" ด้วยเลขลำดับ
+
+    ?add-form=1&form_count=N   ➜ HTML ของแถวที่ N
+    ?add-form=1&template=1     ➜ HTML ต้นแบบ (ยังมี __prefix__) ให้ฝั่ง client เก็บไว้ใช้เอง
+                                 ดู templates/button/add_form_client_button.html
+    ฟิลด์ที่ initial เป็น callable (เช่น default=timezone.now) หรือ cache_empty_form = False
+    ➜ render ใหม่ทุกครั้ง ไม่ cache ทั้งฝั่ง server และ client
+    """
     form_class = None
     formset_class = None
     template_name = None
@@ -12,6 +30,16 @@ class DynamicFormSetView(View):
     success_url = None
     formset_prefix = 'formset'
 
+    cache_empty_form = True
+    empty_form_cache_timeout = 60 * 60
+    empty_form_client_max_age = 300
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # save / delete ของโมเดลใน select ➜ เพิ่ม version (ทุก process ที่ประกาศ view นี้)
+        if cls.formset_class is not None:
+            track_models(*cls.get_choice_models())
+
     def get_formset_prefix(self):
         """
         ใช้ใน subclass หรือ query param เพื่อควบคุม prefix
@@ -20,13 +48,58 @@ class DynamicFormSetView(View):
 
     def get(self, request, *args, **kwargs):
         if request.htmx and request.GET.get("add-form"):
+            if request.GET.get("template"):
+                response = HttpResponse(self.get_empty_form_html())
+                if self.empty_form_cacheable():
+                    response["Cache-Control"] = f"private, max-age={self.empty_form_client_max_age}"
+                else:
+                    response["Cache-Control"] = "no-cache"
+                return response
             return self.render_new_form()
-    
+
     def render_new_form(self):
-        print("Render New Form")
-        prefix = self.get_formset_prefix()
-        formset = self.formset_class(prefix=prefix) 
-        form = formset.empty_form                   
-        form.prefix = f"{prefix}-{self.request.GET.get('form_count', 0)}"
-        html = render_to_string(self.partial_template, {'form': form})
-        return HttpResponse(html)
\ No newline at end of file
+        try:
+            index = int(self.request.GET.get('form_count', 0))
+        except (TypeError, ValueError):
+            index = 0
+        html = self.get_empty_form_html().replace("__prefix__", str(index))
+        return HttpResponse(html)
+
+    # ---------- empty form cache ----------
+    @classmethod
+    def get_choice_models(cls):
+        """โมเดลที่อยู่ใน select ของฟอร์ม (ModelChoiceField) — เปลี่ยนเมื่อไรต้อง render ใหม่"""
+        fields = cls.formset_class.form.base_fields.values()
+        return sorted(
+            {f.queryset.model for f in fields if isinstance(f, ModelChoiceField) and f.queryset is not None},
+            key=lambda m: m._meta.label_lower,
+        )
+
+    def empty_form_cacheable(self):
+        """initial ที่เป็น callable ได้ค่าใหม่ทุกครั้ง (เวลา / ค่าตาม request) ➜ cache แล้วจะได้ค่าเก่า"""
+        if not self.cache_empty_form:
+            return False
+        return not any(callable(f.initial) for f in self.formset_class.form.base_fields.values())
+
+    def get_empty_form_cache_key(self):
+        cls = self.formset_class
+        versions = [f"{m._meta.label_lower}={model_version(m)}" for m in self.get_choice_models()]
+        raw = repr((
+            f"{cls.__module__}.{cls.__qualname__}", self.partial_template,
+            self.get_formset_prefix(), translation.get_language(), versions,
+        ))
+        return f"core:emptyform:{hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()}"
+
+    def render_empty_form(self):
+        formset = self.formset_class(prefix=self.get_formset_prefix())
+        return str(render_to_string(self.partial_template, {'form': formset.empty_form}))
+
+    def get_empty_form_html(self):
+        if not self.empty_form_cacheable():
+            return self.render_empty_form()
+        key = self.get_empty_form_cache_key()
+        html = cache.get(key)
+        if html is None:
+            html = self.render_empty_form()
+            cache.set(key, html, self.empty_form_cache_timeout)
+        return html
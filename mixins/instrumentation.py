@@ -0,0 +1,187 @@
+import json
+import logging
+import re
+import threading
+from collections import Counter
+from contextlib import ExitStack
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger("core.instrumentation")
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+class QueryRecorder:
+    """execute_wrapper: นับ query, เวลา SQL และ query ที่ซ้ำกัน (signature = SQL ที่ตัดค่าคงที่ออก)"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.signatures = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += perf_counter() - start
+            self.count += 1
+            self.signatures[_LITERALS.sub("?", sql)] += 1
+
+    def duplicates(self, threshold):
+        """[(จำนวนครั้ง, signature)] ที่ซ้ำตั้งแต่ threshold ครั้ง (N+1) มากไปน้อย"""
+        return [(n, sql) for sql, n in self.signatures.most_common() if n >= threshold]
+
+
+class ViewStats:
+    """
+    สถิติสะสมต่อ view class ใน process นี้ (หายเมื่อ restart / แยกกันในแต่ละ worker)
+    อ่านผ่าน snapshot() — หน้า core:instrumentation
+    """
+    _lock = threading.Lock()
+    _stats = {}
+    MAX_SIGNATURES = 5
+
+    @classmethod
+    def record(cls, record):
+        with cls._lock:
+            stats = cls._stats.setdefault(record["view"], {
+                "view": record["view"], "requests": 0, "total_ms": 0.0, "max_ms": 0.0,
+                "sql_ms": 0.0, "template_ms": 0.0, "queries": 0, "max_queries": 0,
+                "over_budget": 0, "n_plus_one": 0, "signatures": {},
+            })
+            stats["requests"] += 1
+            stats["total_ms"] += record["total_ms"]
+            stats["max_ms"] = max(stats["max_ms"], record["total_ms"])
+            stats["sql_ms"] += record["sql_ms"]
+            stats["template_ms"] += record["template_ms"]
+            stats["queries"] += record["queries"]
+            stats["max_queries"] = max(stats["max_queries"], record["queries"])
+            stats["over_budget"] += record["over_budget"]
+            if record["duplicates"]:
+                stats["n_plus_one"] += 1
+                signatures = stats["signatures"]
+                for n, sql in record["duplicates"]:
+                    signatures[sql] = max(signatures.get(sql, 0), n)
+                if len(signatures) > cls.MAX_SIGNATURES:
+                    keep = sorted(signatures.items(), key=lambda item: -item[1])[:cls.MAX_SIGNATURES]
+                    stats["signatures"] = dict(keep)
+
+    @classmethod
+    def snapshot(cls):
+        """list ของ dict ต่อ view (เพิ่มค่าเฉลี่ย avg_ms / avg_queries) เรียงตามเวลารวมมากไปน้อย"""
+        with cls._lock:
+            rows = [dict(stats, signatures=dict(stats["signatures"])) for stats in cls._stats.values()]
+        for row in rows:
+            row["avg_ms"] = row["total_ms"] / row["requests"]
+            row["avg_queries"] = row["queries"] / row["requests"]
+        return sorted(rows, key=lambda row: -row["total_ms"])
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._stats.clear()
+
+
+class InstrumentationMixin:
+    """
+    วัดผลทุก request ของ view (ใส่ไว้หน้าสุดของ MRO ให้ครอบ dispatch ทั้งหมด):
+      • จำนวน query / เวลา SQL รวม / query ที่ซ้ำกัน ≥ n_plus_one_threshold ครั้ง (สงสัย N+1)
+      • เวลา render template (วัดใน post-render callback ไม่ render เองใน dispatch
+        middleware process_template_response ยังแก้ response ได้ตามปกติ) / จำนวนฟอร์มในแต่ละ formset
+      • ส่งออกเป็น header Server-Timing, log บรรทัดเดียวแบบ JSON (logger "core.instrumentation")
+        และสถิติสะสมต่อ view (ViewStats ➜ หน้า core:instrumentation)
+      • query_budget: query เกินจำนวนนี้ ➜ log ระดับ WARNING
+    เปิดใช้ (opt-in): settings.CORE_INSTRUMENTATION = True หรือ instrument = True ใน view
+    CORE_QUERY_BUDGET (None = ไม่จำกัด)
+    """
+    instrument = None              # None ➜ settings.CORE_INSTRUMENTATION
+    query_budget = None            # None ➜ settings.CORE_QUERY_BUDGET
+    n_plus_one_threshold = 3
+
+    def instrumentation_enabled(self):
+        if self.instrument is not None:
+            return self.instrument
+        return getattr(settings, "CORE_INSTRUMENTATION", False)
+
+    def get_query_budget(self):
+        if self.query_budget is not None:
+            return self.query_budget
+        return getattr(settings, "CORE_QUERY_BUDGET", None)
+
+    def dispatch(self, request, *args, **kwargs):
+        if not self.instrumentation_enabled():
+            return super().dispatch(request, *args, **kwargs)
+
+        recorder = QueryRecorder()
+        start = perf_counter()
+        stack = ExitStack()
+        try:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = super().dispatch(request, *args, **kwargs)
+        except BaseException:
+            stack.close()
+            raise
+
+        if not hasattr(response, "add_post_render_callback") or response.is_rendered:
+            stack.close()
+            self.finish_instrumentation(request, response, recorder, perf_counter() - start, 0.0)
+            return response
+
+        # TemplateResponse: handler render ทีหลัง ➜ นับ query ระหว่าง render ต่อ แล้วสรุปใน callback
+        render_start = perf_counter()
+
+        def finish(rendered):
+            stack.close()
+            now = perf_counter()
+            self.finish_instrumentation(request, rendered, recorder, now - start, now - render_start)
+
+        response.add_post_render_callback(finish)
+        # ไม่ถูก render (middleware เปลี่ยน response) ➜ ถอด wrapper ตอนปิด response
+        response._resource_closers.append(stack.close)
+        return response
+
+    def finish_instrumentation(self, request, response, recorder, total, template_seconds):
+        record = self.build_instrumentation_record(request, response, recorder, total, template_seconds)
+        self.report_instrumentation(response, record)
+
+    def get_formset_sizes(self):
+        """{ชื่อ formset: จำนวนฟอร์ม} ของ formset ที่สร้างใน request นี้ (FormsetMixin)"""
+        formsets = getattr(self, "_formsets", None) or {}
+        return {name: formset.total_form_count() for name, formset in formsets.items()}
+
+    def build_instrumentation_record(self, request, response, recorder, total, template_seconds):
+        budget = self.get_query_budget()
+        return {
+            "view": f"{type(self).__module__}.{type(self).__qualname__}",
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "total_ms": round(total * 1000, 2),
+            "sql_ms": round(recorder.seconds * 1000, 2),
+            "template_ms": round(template_seconds * 1000, 2),
+            "queries": recorder.count,
+            "duplicates": recorder.duplicates(self.n_plus_one_threshold),
+            "formsets": self.get_formset_sizes(),
+            "budget": budget,
+            "over_budget": budget is not None and recorder.count > budget,
+        }
+
+    def report_instrumentation(self, response, record):
+        timing = (
+            f'db;dur={record["sql_ms"]};desc="{record["queries"]} queries", '
+            f'tpl;dur={record["template_ms"]}, '
+            f'view;dur={record["total_ms"]}'
+        )
+        existing = response.headers.get("Server-Timing")
+        response.headers["Server-Timing"] = f"{existing}, {timing}" if existing else timing
+
+        ViewStats.record(record)
+        level = logging.WARNING if record["over_budget"] else logging.INFO
+        if logger.isEnabledFor(level):
+            logger.log(level, json.dumps(record, ensure_ascii=False, default=str),
+                       extra={"instrumentation": record})
@@ -0,0 +1,209 @@
+import base64
+import binascii
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.http import Http404
+from django.utils.functional import cached_property
+
+from core.serviecs.versioning import model_version
+
+
+def _query_digest(queryset):
+    sql, params = queryset.query.get_compiler(queryset.db).as_sql()
+    return hashlib.md5(repr((sql, params)).encode(), usedforsecurity=False).hexdigest()
+
+
+def cached_count(queryset, timeout=60):
+    """
+    COUNT(*) ที่ cache ตาม (ตาราง, version ของตาราง, SQL ที่ถูก normalize แล้ว)
+    save / delete ใด ๆ ในตาราง ➜ version เปลี่ยน ➜ นับใหม่; ตารางอื่นที่ join อยู่ใช้ TTL
+    """
+    model = queryset.model
+    key = f"core:count:{model._meta.label_lower}:{model_version(model)}:{_query_digest(queryset)}"
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, timeout)
+    return count
+
+
+def estimated_count(queryset):
+    """
+    จำนวนแถวโดยประมาณจาก planner ของ PostgreSQL (ไม่สแกนตาราง)
+      ไม่มีเงื่อนไข ➜ pg_class.reltuples, มีเงื่อนไข ➜ EXPLAIN "Plan Rows"
+    backend อื่น / ยังไม่เคย ANALYZE ➜ None
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        if not queryset.query.where:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)",
+                [connection.ops.quote_name(queryset.model._meta.db_table)],
+            )
+            row = cursor.fetchone()
+            return row[0] if row and row[0] >= 0 else None
+        sql, params = queryset.order_by().query.get_compiler(queryset.db).as_sql()
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class CountStrategyPaginator(Paginator):
+    """Paginator ที่ให้ view เป็นคนนับ (count_func คืน (count, is_estimate))"""
+    count_is_estimate = False
+
+    def __init__(self, object_list, per_page, *, count_func, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_func = count_func
+
+    @cached_property
+    def count(self):
+        count, self.count_is_estimate = self.count_func(self.object_list)
+        return count
+
+
+class KeysetPage:
+    """
+    หน้าแบบ keyset — หน้าตาเหมือน Page ของ Django พอให้ template ใช้ได้
+    (has_next / has_previous / object_list) แต่ไม่มี paginator และไม่นับ COUNT(*)
+    """
+    is_keyset = True
+    paginator = None
+
+    def __init__(self, object_list, *, has_next, has_previous, next_url="", previous_url="", first_url=""):
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.next_url = next_url
+        self.previous_url = previous_url
+        self.first_url = first_url
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+
+class KeysetPaginationMixin:
+    """
+    pagination = "keyset" ➜ แบ่งหน้าด้วย cursor (created_at, pk) แทน OFFSET
+      • ใช้ index (-created_at) ของ BaseTime, pk เป็นตัวตัดสินเมื่อเวลาเท่ากัน
+      • cursor อยู่ใน querystring (?cursor=...) เวลาต่อหน้าคงที่ไม่ว่าจะลึกแค่ไหน
+      • ไม่มี COUNT(*) และไม่มีเลขหน้า มีแค่ ก่อนหน้า / ถัดไป
+    pagination = "offset" (ค่าเริ่มต้น) ➜ Paginator ของ Django แบบเดิม
+
+    count_strategy (เฉพาะ offset) ว่าจะนับจำนวนทั้งหมดอย่างไร
+      "exact"     COUNT(*) ทุก request (เดิม)
+      "cached"    COUNT(*) แล้ว cache ตามเงื่อนไขค้นหา + version ของตาราง (count_cache_timeout วินาที)
+      "estimate"  PostgreSQL: ใช้ค่าประมาณจาก planner ถ้าเกิน count_estimate_threshold
+                  (template แสดง "ประมาณ N รายการ") ต่ำกว่านั้นหรือ backend อื่น ➜ "cached"
+    """
+    pagination = "offset"           # "offset" | "keyset"
+    keyset_field = "created_at"
+    cursor_param = "cursor"
+
+    count_strategy = "exact"        # "exact" | "cached" | "estimate"
+    count_cache_timeout = 60
+    count_estimate_threshold = 10000
+
+    def get_paginator(self, queryset, per_page, orphans=0, allow_empty_first_page=True, **kwargs):
+        if self.count_strategy == "exact":
+            return super().get_paginator(queryset, per_page, orphans, allow_empty_first_page, **kwargs)
+        return CountStrategyPaginator(
+            queryset, per_page, orphans=orphans, allow_empty_first_page=allow_empty_first_page,
+            count_func=self.get_result_count, **kwargs,
+        )
+
+    def get_result_count(self, queryset):
+        """คืน (จำนวน, เป็นค่าประมาณหรือไม่) ตาม count_strategy"""
+        if self.count_strategy == "estimate":
+            estimate = estimated_count(queryset)
+            if estimate is not None and estimate >= self.count_estimate_threshold:
+                return estimate, True
+        return cached_count(queryset, self.count_cache_timeout), False
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.pagination != "keyset":
+            return super().paginate_queryset(queryset, page_size)
+
+        direction, value, pk = self.decode_cursor(self.request.GET.get(self.cursor_param), queryset.model)
+        field = self.keyset_field
+        if direction == "p":
+            # ย้อนหลัง: อ่านแบบเรียงขึ้นแล้วกลับลำดับ
+            if value is not None:
+                queryset = queryset.filter(Q(**{f"{field}__gt": value}) | Q(**{field: value, "pk__gt": pk}))
+            rows = list(queryset.order_by(field, "pk")[:page_size + 1])
+            has_more = len(rows) > page_size
+            rows = rows[:page_size][::-1]
+            has_next, has_previous = True, has_more
+        else:
+            if value is not None:
+                queryset = queryset.filter(Q(**{f"{field}__lt": value}) | Q(**{field: value, "pk__lt": pk}))
+            rows = list(queryset.order_by(f"-{field}", "-pk")[:page_size + 1])
+            has_next = len(rows) > page_size
+            rows = rows[:page_size]
+            has_previous = value is not None
+
+        page = KeysetPage(
+            rows,
+            has_next=has_next and bool(rows),
+            has_previous=has_previous and bool(rows),
+            next_url=self.cursor_url("n", rows[-1]) if rows else "",
+            previous_url=self.cursor_url("p", rows[0]) if rows else "",
+            first_url=self.cursor_url(None, None),
+        )
+        return None, page, rows, page.has_other_pages()
+
+    # ---------- cursor ----------
+    def encode_cursor(self, direction, obj):
+        # แปลงผ่าน field ของโมเดล ➜ keyset_field / pk เป็นชนิดใดก็ได้ (datetime, date, int, str, uuid)
+        field = obj._meta.get_field(self.keyset_field)
+        raw = json.dumps([direction, field.value_to_string(obj), obj._meta.pk.value_to_string(obj)])
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, cursor, model):
+        """คืน (direction, value, pk) — ไม่มี cursor ➜ ("n", None, None) = หน้าแรก"""
+        if not cursor:
+            return "n", None, None
+        try:
+            direction, value, pk = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+            if direction not in ("n", "p"):
+                raise ValueError(direction)
+            value = model._meta.get_field(self.keyset_field).to_python(value)
+            pk = model._meta.pk.to_python(pk)
+        except (ValueError, TypeError, ValidationError, binascii.Error):
+            raise Http404("cursor ไม่ถูกต้อง")
+        if value is None or pk is None:
+            raise Http404("cursor ไม่ถูกต้อง")
+        return direction, value, pk
+
+    def cursor_url(self, direction, obj):
+        params = self.request.GET.copy()
+        params.pop("page", None)
+        params.pop(self.cursor_param, None)
+        if obj is not None:
+            params[self.cursor_param] = self.encode_cursor(direction, obj)
+        return f"?{params.urlencode()}"
@@ -0,0 +1,82 @@
+from django.conf import settings
+from django.core.cache import cache
+
+PERMISSION_CACHE_VERSION_KEY = "core:perms:version"
+
+
+def get_permission_cache_timeout():
+    return getattr(settings, "CORE_PERMISSION_CACHE_TIMEOUT", 300)
+
+
+def permission_cache_enabled():
+    """
+    settings.CORE_CACHE_PERMISSIONS (ค่าเริ่มต้น False)
+    เปิดเฉพาะเมื่อ cache "default" ใช้ร่วมกันทุก process (Redis / Memcached / DatabaseCache)
+    LocMemCache แยกต่อ process ➜ สิทธิ์ที่ถูกถอดใน process หนึ่งยังใช้ได้ใน process อื่นจนครบ timeout
+    """
+    return getattr(settings, "CORE_CACHE_PERMISSIONS", False)
+
+
+def _permission_cache_version():
+    version = cache.get(PERMISSION_CACHE_VERSION_KEY)
+    if version is None:
+        cache.add(PERMISSION_CACHE_VERSION_KEY, 1, None)
+        version = cache.get(PERMISSION_CACHE_VERSION_KEY, 1)
+    return version
+
+
+def invalidate_permission_cache():
+    """เรียกเมื่อสิทธิ์ของ user / group เปลี่ยน ➜ key เดิมทั้งหมดหมดอายุทันที (O(1))"""
+    try:
+        cache.incr(PERMISSION_CACHE_VERSION_KEY)
+    except ValueError:
+        cache.set(PERMISSION_CACHE_VERSION_KEY, 2, None)
+
+
+def get_user_permissions(user, shared=None) -> frozenset:
+    """
+    ชุดสิทธิ์ทั้งหมดของ user ("app_label.codename") จาก cache
+    ถ้าไม่มีจึงเรียก user.get_all_permissions() (ผ่านทุก auth backend) แล้วเก็บไว้
+    shared=False (ค่าเริ่มต้นตาม CORE_CACHE_PERMISSIONS) ➜ อ่านใหม่ทุก request เก็บไว้บน user instance เท่านั้น
+    """
+    if not user.is_authenticated:
+        return frozenset()
+    cached = getattr(user, "_core_perm_set", None)
+    if cached is not None:
+        return cached
+    if not (permission_cache_enabled() if shared is None else shared):
+        user._core_perm_set = frozenset(user.get_all_permissions())
+        return user._core_perm_set
+
+    key = f"core:perms:{_permission_cache_version()}:{user.pk}"
+    perms = cache.get(key)
+    if perms is None:
+        perms = frozenset(user.get_all_permissions())
+        cache.set(key, perms, get_permission_cache_timeout())
+    user._core_perm_set = perms
+    return perms
+
+
+class PermissionCacheMixin:
+    """
+    ใช้คู่กับ PermissionRequiredMixin (วางไว้ก่อน) ตรวจสิทธิ์จากชุดสิทธิ์ที่ cache ไว้ต่อ user
+    แทน user.has_perms() ที่ query ตาราง auth_permission ทุก request
+    cache หมดอายุเมื่อสิทธิ์ / group เปลี่ยน (ดู core.signals) หรือครบ CORE_PERMISSION_CACHE_TIMEOUT
+    ปิดเป็นค่าเริ่มต้น — เปิดด้วย settings.CORE_CACHE_PERMISSIONS = True (ต้องใช้ cache ที่แชร์กันทุก process)
+    """
+    cache_permissions = None        # None ➜ settings.CORE_CACHE_PERMISSIONS
+
+    def permission_cache_enabled(self):
+        if self.cache_permissions is not None:
+            return self.cache_permissions
+        return permission_cache_enabled()
+
+    def has_permission(self):
+        if not self.permission_cache_enabled():
+            return super().has_permission()
+        user = self.request.user
+        if not user.is_active:
+            return False
+        if user.is_superuser:
+            return True
+        return set(self.get_permission_required()) <= get_user_permissions(user, shared=True)
@@ -1,5 +1,15 @@
 # core/mixins/status_auto.py
+import copy
+import uuid
+from functools import lru_cache
+
 from django.db import models, transaction
+from django.utils import timezone
+
+from core.serviecs.rollup import RollupService
+from core.serviecs.search import SQLiteFTSSearchBackend
+from core.serviecs.taskQueue import get_task_backend, set_task_status
+from core.serviecs.versioning import bump_model_version
 
 
 class AutoStatusMixin:
@@ -8,61 +18,214 @@ class AutoStatusMixin:
         status_fields = ['Done', 'Paid']        # self = Done, relation#1 = Paid
         status_fields = ['Done', None]          # อัปเดตแค่ self
         status_fields = [None, 'Done']          # ข้าม self, ไปอัปเดต relation#1
+
+    ลำดับ relation เป็นไปตาม self.object._meta.get_fields() (0 = self)
+    แผนการอัปเดตถูกคำนวณครั้งเดียวต่อ (model, status_fields) แล้ว cache ไว้
+
+    self / FK (forward) ➜ instance.save(update_fields=...) ยิง pre_save / post_save และ save() ที่ override ไว้
+    relation แบบ many (manager / through) ➜ UPDATE ระดับ queryset ครั้งเดียว ไม่ยิง signal (เหมือนเดิม)
+    cascade_bulk_update = True ➜ self / FK ใช้ UPDATE ระดับ queryset ด้วย (ไม่โหลด instance)
+      save() / pre_save / post_save ของโมเดลนั้นไม่ถูกเรียก — DailyRollup, version ของ cache
+      และตาราง FTS ยังถูก sync ให้โดย mixin
+
+    cascade_mode = "deferred" ➜ ส่ง cascade ไปทำหลัง commit ผ่าน task backend
+    (core.serviecs.taskQueue) เรียงลำดับต่อ object, retry ได้ และดูสถานะได้จาก
+    task_status(self.cascade_task_id) / header X-Cascade-Task ของ response
     """
     status_fields: list[str | None] = []
-    status_attr: str = "status"     
+    status_attr: str = "status"
+    cascade_mode: str = "sync"      # "sync" | "deferred"
+    cascade_bulk_update: bool = False
+    cascade_task_id = None
+
+    # (model, status_fields, status_attr) ➜ plan
+    _cascade_plans: dict = {}
 
     # ---------- hook ----------
     def form_valid(self, form):
-        response = super().form_valid(form) 
-        self._cascade_status()
+        response = super().form_valid(form)
+        if self.cascade_mode == "deferred":
+            self._schedule_cascade()
+            if self.cascade_task_id:
+                response["X-Cascade-Task"] = self.cascade_task_id
+        else:
+            self._cascade_status()
         return response
 
+    # ---------- plan ----------
+    def get_cascade_plan(self, model):
+        key = (model, tuple(self.status_fields), self.status_attr)
+        plan = self._cascade_plans.get(key)
+        if plan is None:
+            plan = AutoStatusMixin._cascade_plans[key] = self._build_cascade_plan(model)
+        return plan
+
+    def _cascade_relations(self, model):
+        """รายการ relation ตามลำดับเดิม (index 0 = self) ไม่แตะฐานข้อมูล"""
+        relations = [("self", None)]
+        for field in model._meta.get_fields():
+            # OneToMany / ManyToMany accessors  (invoice_set / invoices ฯลฯ)
+            if field.auto_created and (field.one_to_many or field.many_to_many):
+                relations.append(("manager", field))
+            # FK / OneToOne / M2M ที่ประกาศตรง ๆ
+            elif field.is_relation and not field.auto_created:
+                to_many = field.many_to_many or field.one_to_many
+                relations.append(("manager" if to_many else "forward", field))
+        return relations
+
+    def _has_status(self, model):
+        return hasattr(model, self.status_attr)
+
+    def _build_cascade_plan(self, model):
+        """
+        คืน list ของขั้นตอน (kind, status, ...) เฉพาะ relation ที่ status_fields อ้างถึง
+          ("self", status, model)
+          ("forward", status, related_model, fk_attname, target_attname, field_name)
+          ("manager", status, accessor_name)          ปลายทางมี status ➜ update bulk
+          ("through", status, through, source_fk)     M2M ที่ through มี status
+          ("instance", status, field_name)            relation อื่น ๆ (เช่น GenericForeignKey)
+        """
+        relations = self._cascade_relations(model)
+        plan = []
+        for idx, status in enumerate(self.status_fields):
+            if status is None or idx >= len(relations):
+                continue
+            kind, field = relations[idx]
+
+            if kind == "self":
+                if self._has_status(model):
+                    plan.append(("self", status, model))
+
+            elif kind == "forward" and not field.concrete:
+                # เช่น GenericForeignKey ไม่มีคอลัมน์ fk ตรง ๆ ➜ ใช้ instance
+                plan.append(("instance", status, field.name))
+
+            elif kind == "forward":
+                if self._has_status(field.related_model):
+                    plan.append((
+                        "forward", status, field.related_model,
+                        field.attname, field.target_field.attname, field.name,
+                    ))
+
+            elif self._has_status(field.related_model):
+                accessor = field.get_accessor_name() if field.auto_created else field.name
+                plan.append(("manager", status, accessor))
+
+            elif field.many_to_many and field.related_model is not None:
+                # M2M มี through modelกำหนดเอง ➜ หา through ที่มี status
+                if field.auto_created:
+                    m2m_field = field.field
+                    through = m2m_field.remote_field.through
+                    source_fk = m2m_field.m2m_reverse_field_name()
+                else:
+                    through = field.remote_field.through
+                    source_fk = field.m2m_field_name()
+                if self._has_status(through):
+                    plan.append(("through", status, through, source_fk))
+                # ถ้าไม่เจอ status เลยก็ข้าม
+        return plan
+
     # ---------- core ----------
     def _cascade_status(self):
         if not self.status_fields:
             return
+        plan = self.get_cascade_plan(self.object.__class__)
+        if plan:
+            self._apply_cascade_plan(self.object, plan)
 
-        rel_objects: list[models.Model | models.Manager] = []
+    def _apply_cascade_plan(self, obj, plan):
+        with transaction.atomic():
+            for step in plan:
+                self._run_cascade_step(obj, step)
 
-        # self.object เป็นลำดับที่ 0 เสมอ
-        rel_objects.append(self.object)
+    def _schedule_cascade(self):
+        """ส่ง cascade เข้าคิวหลัง transaction commit (key = object เดียวกันทำตามลำดับ)"""
+        if not self.status_fields:
+            return
+        plan = self.get_cascade_plan(self.object.__class__)
+        if not plan:
+            return
+        obj = copy.copy(self.object)
+        key = f"cascade:{obj._meta.label_lower}:{obj.pk}"
+        task_id = self.cascade_task_id = uuid.uuid4().hex
+        set_task_status(task_id, "scheduled", key=key)
+        transaction.on_commit(
+            lambda: get_task_backend().submit(
+                self._apply_cascade_plan, obj, plan, key=key, task_id=task_id,
+            )
+        )
 
-        # ลำดับต่อ ๆ ไปจาก relation fields
-        for field in self.object._meta.get_fields():
-            # OneToMany / ManyToMany accessors  (invoice_set / invoices ฯลฯ)
-            if field.auto_created and (field.one_to_many or field.many_to_many):
-                rel_objects.append(getattr(self.object, field.get_accessor_name()))
-            # FK / OneToOne ที่ประกาศตรง ๆ
-            elif field.is_relation and not field.auto_created:
-                rel_objects.append(getattr(self.object, field.name, None))
+    def _status_values(self, model, status):
+        """ค่าที่จะ update: status + ฟิลด์ auto_now (queryset.update ไม่เติมให้เอง)"""
+        values = {self.status_attr: status}
+        auto_now = _auto_now_fields(model)
+        if auto_now:
+            now = timezone.now()
+            values.update(dict.fromkeys(auto_now, now))
+        return values
 
-        # 2) จับคู่ status_fields ↔ rel_objects แล้วอัปเดต
-        with transaction.atomic():
-            for idx, status in enumerate(self.status_fields):
-                if status is None or idx >= len(rel_objects):
-                    continue
-
-                target = rel_objects[idx]
-
-                # ----- A) relation manager -----
-                if isinstance(target, models.Manager):
-                    model_cls = target.model
-                    if hasattr(model_cls, self.status_attr):
-                        # M2M ปลายทางมี field status ➜ อัปเดต bulk ได้เลย
-                        target.update(**{self.status_attr: status})
-                    else:
-                        # M2M มี through modelกำหนดเอง ➜ หา through ที่มี status
-                        rel_field = target.field
-                        through   = rel_field.remote_field.through
-                        if hasattr(through, self.status_attr):
-                            from_fk = rel_field.m2m_field_name()
-                            through.objects.filter(**{from_fk: self.object})\
-                                            .update(**{self.status_attr: status})
-                        # ถ้าไม่เจอ status เลยก็ข้าม
-                    continue
-
-                # ----- B) instance (FK / O2O) -----
-                if target is not None and hasattr(target, self.status_attr):
-                    setattr(target, self.status_attr, status)
-                    target.save(update_fields=[self.status_attr])
+    def _update_status(self, queryset, status):
+        """UPDATE ระดับ queryset + ย้ายยอด DailyRollup + sync ตาราง FTS + แจ้ง cache ว่าตารางเปลี่ยน"""
+        model = queryset.model
+        values = self._status_values(model, status)
+        RollupService.move_status(queryset, status, field=self.status_attr)
+        queryset.update(**values)
+        SQLiteFTSSearchBackend.sync(model, queryset=queryset, fields=values)
+        bump_model_version(model)
+        return values
+
+    def _run_cascade_step(self, obj, step):
+        kind, status = step[0], step[1]
+
+        if kind == "self":
+            if not self.cascade_bulk_update:
+                self._save_status(obj, status)
+                return
+            model = step[2]
+            values = self._update_status(model._base_manager.filter(pk=obj.pk), status)
+            for name, value in values.items():
+                setattr(obj, name, value)
+            RollupService.snapshot(obj)
+
+        elif kind == "forward":
+            _, _, related_model, fk_attname, target_attname, field_name = step
+            fk_value = getattr(obj, fk_attname)
+            if fk_value is None:
+                return
+            if not self.cascade_bulk_update:
+                # ใช้ instance ที่โหลดไว้แล้วถ้ามี ไม่งั้น SELECT 1 แถว
+                self._save_status(getattr(obj, field_name), status)
+                return
+            values = self._update_status(
+                related_model._base_manager.filter(**{target_attname: fk_value}), status,
+            )
+            # ถ้า instance ปลายทางถูกโหลดไว้แล้ว ให้ค่าตรงกับฐานข้อมูล
+            cached = obj._state.fields_cache.get(field_name)
+            if cached is not None:
+                for name, value in values.items():
+                    setattr(cached, name, value)
+                RollupService.snapshot(cached)
+
+        elif kind == "manager":
+            self._update_status(getattr(obj, step[2]).all(), status)
+
+        elif kind == "through":
+            _, _, through, source_fk = step
+            self._update_status(through._base_manager.filter(**{source_fk: obj}), status)
+
+        elif kind == "instance":
+            target = getattr(obj, step[2], None)
+            if isinstance(target, models.Model) and hasattr(target, self.status_attr):
+                self._save_status(target, status)
+
+    def _save_status(self, target, status):
+        """save() ปกติ (signal / rollup / version / FTS ทำงานเอง) เฉพาะ status + ฟิลด์ auto_now"""
+        setattr(target, self.status_attr, status)
+        target.save(update_fields=[self.status_attr, *_auto_now_fields(type(target))])
+
+
+@lru_cache(maxsize=None)
+def _auto_now_fields(model):
+    return tuple(
+        f.name for f in model._meta.concrete_fields if getattr(f, "auto_now", False)
+    )
@@ -2,56 +2,83 @@ from django.views.generic import CreateView, UpdateView, ListView, View, DetailV
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
 from core.mixins.form import FormsetMixin
+from core.mixins.cache import VersionedCacheMixin
+from core.mixins.instrumentation import InstrumentationMixin
+from core.mixins.pagination import KeysetPaginationMixin
+from core.mixins.permissions import PermissionCacheMixin
 from django.shortcuts import redirect
 
-class BaseCreateView(FormsetMixin, LoginRequiredMixin, PermissionRequiredMixin, CreateView):
+_MISSING = object()
+
+
+class ObjectCacheMixin:
+    """
+    เก็บผล get_object() ไว้ต่อ request (view instance)
+    การตรวจสิทธิ์, get()/post() และ get_object_if_exists() ใช้ object เดียวกัน ไม่ query ซ้ำ
+    view ที่ไม่ได้สืบทอด SingleObjectMixin ให้ override load_object() แทน
+    """
+    _object_cache = _MISSING
+
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return self.load_object(queryset)
+        if self._object_cache is _MISSING:
+            try:
+                self._object_cache = (self.load_object(), None)
+            except Exception as exc:
+                self._object_cache = (None, exc)
+        obj, exc = self._object_cache
+        if exc is not None:
+            raise exc
+        return obj
+
+    def load_object(self, queryset=None):
+        return super().get_object(queryset)
+
+
+class BaseCreateView(InstrumentationMixin, ObjectCacheMixin, FormsetMixin, LoginRequiredMixin, PermissionCacheMixin, PermissionRequiredMixin, CreateView):
     success_url = None
     success_message = "สร้างข้อมูลสำเร็จแล้ว"
     error_message = "กรุณาตรวจสอบข้อมูล"
     template_name = None
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        for name in self.formset_names:
-            method = getattr(self, f"get_{name}_formset", None)
-            if method:
-                context[name] = method()
-        return context
-    
-class BaseUpdateView(FormsetMixin, LoginRequiredMixin, PermissionRequiredMixin, UpdateView):
+
+class BaseUpdateView(InstrumentationMixin, ObjectCacheMixin, FormsetMixin, LoginRequiredMixin, PermissionCacheMixin, PermissionRequiredMixin, UpdateView):
     success_message = "แก้ไขข้อมูลสำเร็จแล้ว"
     error_message = "กรุณาตรวจสอบข้อมูล"
 
     template_name = None
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        for name in self.formset_names:
-            method = getattr(self, f"get_{name}_formset", None)
-            if method:
-                context[name] = method()
-        return context
-
-class BaseListView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
+
+
+class BaseListView(InstrumentationMixin, LoginRequiredMixin, PermissionCacheMixin, PermissionRequiredMixin, KeysetPaginationMixin, ListView):
+    """
+    ใช้คู่กับ BaseListMixin แบบเดิม: class XList(BaseListMixin, BaseListView)
+    pagination = "keyset" ➜ ใช้ cursor (created_at, pk) แทนเลขหน้า ดู core.mixins.pagination
+    ไม่ได้กำหนด ordering ➜ เรียง -created_at
+    """
     paginate_by = 10
     template_name = 'base_list.html'
     def get_queryset(self):
-        queryset = super().get_queryset().order_by('-created_at')
+        queryset = super().get_queryset()
+        if not self.get_ordering():
+            queryset = queryset.order_by('-created_at')
         return queryset
 
     def get_permission_required(self):
         model = self.model
         return [f"{model._meta.app_label}.view_{model._meta.model_name}"]
 
-class BaseDetailView(LoginRequiredMixin, PermissionRequiredMixin, DetailView):
+class BaseDetailView(InstrumentationMixin, ObjectCacheMixin, LoginRequiredMixin, PermissionCacheMixin, PermissionRequiredMixin, VersionedCacheMixin, DetailView):
     """
     CBV สำหรับดูรายละเอียด object รายการเดียว
+    cache_mode = "response" ➜ cache ทั้งหน้าต่อ user จนกว่าโมเดลจะเปลี่ยน (ดู core.mixins.cache)
     """
     def get_permission_required(self):
         model = self.model
         return [f"{model._meta.app_label}.view_{model._meta.model_name}"]
 
     
-class BaseDeleteView(LoginRequiredMixin, PermissionRequiredMixin, View):
+class BaseDeleteView(InstrumentationMixin, ObjectCacheMixin, LoginRequiredMixin, PermissionCacheMixin, PermissionRequiredMixin, View):
     model = None
     success_url = None
     success_message = "ลบข้อมูลสำเร็จแล้ว"
@@ -66,8 +93,9 @@ class BaseDeleteView(LoginRequiredMixin, PermissionRequiredMixin, View):
             messages.error(self.request, self.error_message)
         return redirect(self.get_success_url())
 
-    def get_object(self):
-        return self.model.objects.get(pk=self.kwargs["pk"])
+    def load_object(self, queryset=None):
+        queryset = self.model.objects.all() if queryset is None else queryset
+        return queryset.get(pk=self.kwargs["pk"])
 
     def get_success_url(self):
         return self.success_url or "/"
@@ -1,4 +1,10 @@
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
 
 class BaseTime(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='วันที่สร้าง')
@@ -10,3 +16,115 @@ class BaseTime(models.Model):
         indexes = [
             models.Index(fields=['-created_at']),
         ]
+
+
+def _as_datetime(value):
+    """date / datetime / "YYYY-MM-DD[ HH:MM]" ➜ (datetime, is_date) หรือ (None, False) ถ้าอ่านไม่ได้"""
+    if isinstance(value, str):
+        try:
+            value = parse_date(value) or parse_datetime(value)
+        except ValueError:
+            return None, False
+    if value is None:
+        return None, False
+    is_date = not isinstance(value, datetime)
+    if is_date:
+        value = datetime.combine(value, time.min)
+    if settings.USE_TZ and timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value, is_date
+
+
+class TimePartitionQuerySet(models.QuerySet):
+    """
+    ช่วงเวลาบน created_at เป็นเงื่อนไขตรง ๆ (>= / <) ไม่ใช้ __date
+    ➜ PostgreSQL ตัด partition ที่อยู่นอกช่วงทิ้ง (partition pruning) และใช้ index created_at ได้
+    """
+
+    def created_between(self, start=None, end=None):
+        """start / end รวมทั้งวัน (end เป็นวันที่ ➜ ถึงก่อนเที่ยงคืนของวันถัดไป) ค่าที่อ่านไม่ได้จะถูกข้าม"""
+        qs = self
+        start, _ = _as_datetime(start) if start else (None, False)
+        end, end_is_date = _as_datetime(end) if end else (None, False)
+        if start is not None:
+            qs = qs.filter(created_at__gte=start)
+        if end is not None:
+            qs = qs.filter(created_at__lt=end + timedelta(days=1)) if end_is_date else qs.filter(created_at__lte=end)
+        return qs
+
+    def recent(self, days):
+        """เฉพาะ days วันล่าสุด (รวมวันนี้)"""
+        return self.created_between(start=timezone.localdate() - timedelta(days=days - 1))
+
+
+TimePartitionManager = models.Manager.from_queryset(TimePartitionQuerySet)
+
+
+class PartitionedBaseTime(BaseTime):
+    """
+    BaseTime แบบแบ่งเก็บตามช่วงเวลา (opt-in)
+      • PostgreSQL: ตารางเป็น declarative range partition บน created_at ทีละ partition_interval
+        (python manage.py ensure_partitions --convert) ➜ ข้อมูลเก่าย้ายไป <table>_archive ทั้ง partition
+      • backend อื่น: ย้ายแถวที่เก่ากว่า archive_after_days ไปตาราง <table>_archive เป็นชุด ๆ
+        (python manage.py archive_rows)
+      • objects.created_between() / BaseListMixin (start_date / end_date) อ่านเฉพาะช่วงที่ต้องการ
+    อ่านข้อมูลที่ย้ายไปแล้ว: PartitionService.archive_model(Model).objects ...
+    """
+    partition_interval = "month"     # "month" | "year"
+    archive_after_days = None        # None = ไม่ย้ายอัตโนมัติ
+
+    objects = TimePartitionManager()
+
+    class Meta(BaseTime.Meta):
+        abstract = True
+
+
+class RunningNumberCounter(models.Model):
+    """
+    เก็บเลขรันล่าสุดต่อ (model, field, prefix) สำหรับ RunningNumberField(mode="counter")
+    การออกเลขใหม่ล็อกเพียงแถวเดียวในตารางนี้ แทนการล็อก/สแกนตารางธุรกิจ
+    """
+    model_label = models.CharField(max_length=100, verbose_name='โมเดล')
+    field = models.CharField(max_length=100, verbose_name='ฟิลด์')
+    prefix = models.CharField(max_length=100, blank=True, verbose_name='prefix')
+    last_value = models.PositiveBigIntegerField(default=0, verbose_name='เลขล่าสุด')
+
+    class Meta:
+        verbose_name = 'ตัวนับเลขรัน'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['model_label', 'field', 'prefix'],
+                name='core_running_counter_key',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.model_label}.{self.field} [{self.prefix}] = {self.last_value}"
+
+
+class DailyRollup(models.Model):
+    """
+    ยอดสรุปรายวันต่อ (model, วันที่สร้าง, status) ของโมเดลที่สืบทอด BaseTime
+    อัปเดตแบบเพิ่ม/ลดทีละแถวจาก save / delete / cascade status (core.serviecs.rollup)
+    dashboard อ่านจากตารางนี้แทนการ COUNT / SUM ทั้งตาราง
+    """
+    model_label = models.CharField(max_length=100, verbose_name='โมเดล')
+    day = models.DateField(verbose_name='วันที่')
+    status = models.CharField(max_length=100, blank=True, verbose_name='สถานะ')
+    count = models.BigIntegerField(default=0, verbose_name='จำนวน')
+    amount = models.DecimalField(max_digits=20, decimal_places=4, default=0, verbose_name='ยอดรวม')
+
+    class Meta:
+        verbose_name = 'ยอดสรุปรายวัน'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['model_label', 'day', 'status'],
+                name='core_daily_rollup_key',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['model_label', '-day']),
+        ]
+
+    def __str__(self):
+        return f"{self.model_label} {self.day} [{self.status}] = {self.count}"
@@ -0,0 +1,55 @@
+from django.db.migrations.operations.base import Operation
+
+from core.serviecs.runningNumber import RunningNumberService
+
+
+class RunningNumberSequence(Operation):
+    """
+    Migration operation สำหรับ RunningNumberField(mode="sequence") บน PostgreSQL
+      - forwards: สร้าง sequence ของงวดปัจจุบัน และเลื่อนให้ไม่ต่ำกว่าข้อมูลเดิม
+      - backwards: ลบ sequence ทุกงวดของฟิลด์นั้น
+    backend อื่นไม่ทำอะไร (ฟิลด์จะใช้ mode "lock" แทน)
+
+    ตัวอย่าง ↓
+        operations = [
+            RunningNumberSequence("invoice", "number"),
+        ]
+    """
+    reversible = True
+    reduces_to_sql = False
+
+    def __init__(self, model_name, name):
+        self.model_name = model_name
+        self.name = name
+
+    def deconstruct(self):
+        return self.__class__.__name__, [self.model_name, self.name], {}
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+        field = model._meta.get_field(self.name)
+        RunningNumberService.ensure_sequence(
+            model, self.name, field.compiled, RunningNumberService.now(), sync=True,
+        )
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+        RunningNumberService.drop_sequences(model, self.name)
+
+    def describe(self):
+        return f"Create running-number sequence for {self.model_name}.{self.name}"
+
+    @property
+    def migration_name_fragment(self):
+        return f"{self.model_name.lower()}_{self.name.lower()}_sequence"
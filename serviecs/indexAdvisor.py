@@ -0,0 +1,318 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connections, migrations, models, router, transaction
+from django.db.backends.utils import names_digest
+from django.db.migrations.autodetector import MigrationAutodetector
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.writer import MigrationWriter
+from django.db.models.lookups import Exact
+from django.urls import URLPattern, URLResolver, get_resolver
+
+from core.mixins.baseTemplates import BaseListMixin
+from core.mixins.viewMixins import BaseListView
+
+
+class IndexProposal:
+    """index ที่แนะนำ 1 ตัว: fields แบบ Meta.indexes ("-created_at") + condition (partial index)"""
+    __slots__ = ("model", "fields", "condition", "reasons", "plan", "used")
+
+    def __init__(self, model, fields, condition=None, reason=""):
+        self.model = model
+        self.fields = tuple(fields)
+        self.condition = condition
+        self.reasons = [reason] if reason else []
+        self.plan = None
+        self.used = None
+
+    @property
+    def key(self):
+        return self.model, self.fields, repr(self.condition)
+
+    def covers(self, other):
+        """ใช้ index นี้แทน other ได้ (other เป็น prefix และ condition เดียวกัน)"""
+        return (self.model is other.model and repr(self.condition) == repr(other.condition)
+                and self.fields[:len(other.fields)] == other.fields)
+
+    def index(self):
+        index = models.Index(fields=list(self.fields), name="core_advisor_tmp", condition=self.condition)
+        index.set_name_with_model(self.model)
+        if self.condition is not None:
+            # ชื่อมาจาก fields เท่านั้น ➜ ใส่ digest ของ condition ไม่ให้ชนกับ index ปกติ / partial เงื่อนไขอื่น
+            digest = names_digest(repr(self.condition), length=6)
+            index.name = f"{index.name[:-4][:19]}_{digest}_pdx"
+        return index
+
+    def __str__(self):
+        where = f" WHERE {self.condition}" if self.condition is not None else ""
+        return f"{self.model._meta.label}({', '.join(self.fields)}){where}"
+
+
+class IndexAdvisor:
+    """
+    แนะนำ index จาก config ของ list view (BaseListMixin / BaseListView) ทุกตัวใน URLconf
+      • filter_fields (ค่าเท่ากับ) ➜ (field, *ordering)    equality ก่อน แล้วตามด้วยคอลัมน์ที่ sort
+      • ordering / keyset pagination ➜ (*ordering)
+      • date_start_field / date_end_field ที่ไม่ใช่คอลัมน์ sort ➜ (date_field)
+      • queryset = Model.objects.filter(x=...) ของ view ➜ partial index (condition=Q(x=...))
+    search_fields ไม่อยู่ในนี้ (ใช้ build_search_index)
+    ตัด index ที่มีอยู่แล้วในฐานข้อมูล / Meta.indexes (prefix เดียวกัน) ออก
+    """
+
+    # ---------- หา list view ----------
+    @classmethod
+    def list_views(cls, urlconf=None):
+        """[(view class, route)] ของทุก BaseListMixin ใน URLconf (รวม include ซ้อนกัน)"""
+        found = {}
+
+        def walk(patterns, prefix):
+            for pattern in patterns:
+                route = prefix + str(pattern.pattern)
+                if isinstance(pattern, URLResolver):
+                    walk(pattern.url_patterns, route)
+                elif isinstance(pattern, URLPattern):
+                    view = getattr(pattern.callback, "view_class", None)
+                    if view is not None and issubclass(view, BaseListMixin) and cls.view_model(view):
+                        found.setdefault(view, "/" + route)
+
+        walk(get_resolver(urlconf).url_patterns, "")
+        return list(found.items())
+
+    @classmethod
+    def view_model(cls, view):
+        if getattr(view, "model", None) is not None:
+            return view.model
+        queryset = getattr(view, "queryset", None)
+        return queryset.model if queryset is not None else None
+
+    # ---------- config ➜ column ----------
+    @classmethod
+    def _local_field(cls, model, path):
+        """"fk" / "fk__id" / "field" ➜ ชื่อฟิลด์บนตารางนี้ (None = อยู่ตารางอื่น / ไม่ใช่ฟิลด์)"""
+        parts = path.split("__")
+        try:
+            field = model._meta.get_field(parts[0])
+        except FieldDoesNotExist:
+            return None
+        if not field.concrete or field.many_to_many:
+            return None
+        if len(parts) == 1:
+            return field.name
+        if field.is_relation and len(parts) == 2 and parts[1] in ("id", "pk", field.target_field.name):
+            return field.name
+        return None
+
+    @classmethod
+    def view_ordering(cls, view, model):
+        """คอลัมน์ sort ที่ list view ใช้จริง (keyset / BaseListView.get_queryset / ordering / Meta)"""
+        if getattr(view, "pagination", "offset") == "keyset":
+            ordering = (f"-{view.keyset_field}", "-pk")
+        elif issubclass(view, BaseListView) and not view.ordering:
+            ordering = ("-created_at",)
+        else:
+            ordering = view.ordering or model._meta.ordering or ()
+        columns = []
+        for item in ordering:
+            if not isinstance(item, str) or item == "?":
+                break
+            desc = item.startswith("-")
+            name = item.lstrip("-+")
+            name = model._meta.pk.name if name == "pk" else cls._local_field(model, name)
+            if name is None:
+                break
+            columns.append(f"-{name}" if desc else name)
+        return tuple(columns)
+
+    @classmethod
+    def view_condition(cls, view, model):
+        """view.queryset ที่ filter ค่าคงที่บนตารางนี้ (AND ล้วน) ➜ (Q, {field: value}) สำหรับ partial index"""
+        queryset = getattr(view, "queryset", None)
+        if queryset is None:
+            return None, {}
+        where = queryset.query.where
+        if not where.children or where.connector != "AND" or where.negated:
+            return None, {}
+        values = {}
+        for child in where.children:
+            lhs = getattr(child, "lhs", None)
+            if (not isinstance(child, Exact) or getattr(lhs, "alias", None) != model._meta.db_table
+                    or hasattr(child.rhs, "resolve_expression")):
+                return None, {}
+            values[lhs.target.name] = child.rhs
+        return models.Q(**values), values
+
+    @classmethod
+    def proposals_for_view(cls, view, route=""):
+        model = cls.view_model(view)
+        reason = f"{view.__module__}.{view.__qualname__} {route}".strip()
+        ordering = cls.view_ordering(view, model)
+        condition, fixed = cls.view_condition(view, model)
+        proposals = []
+
+        def propose(*fields):
+            fields = tuple(f for f in fields if f.lstrip("-") not in fixed)
+            if fields:
+                proposals.append(IndexProposal(model, fields, condition, reason))
+
+        propose(*ordering)
+        for path in view.filter_fields:
+            name = cls._local_field(model, path)
+            if name is not None:
+                propose(name, *ordering)
+        for path in {view.date_start_field, view.date_end_field}:
+            name = cls._local_field(model, path)
+            if name is not None and (not ordering or ordering[0].lstrip("-") != name):
+                propose(name)
+        return proposals
+
+    # ---------- index ที่มีอยู่แล้ว ----------
+    @classmethod
+    def existing(cls, model):
+        """IndexProposal ของ index ที่มีในฐานข้อมูล + Meta.indexes / index_together (รวมที่ยังไม่ migrate)"""
+        result = [IndexProposal(model, index.fields, index.condition) for index in model._meta.indexes]
+        result += [IndexProposal(model, fields) for fields in getattr(model._meta, "index_together", ())]
+        connection = connections[router.db_for_read(model)]
+        columns = {f.column: f.name for f in model._meta.local_concrete_fields}
+        with connection.cursor() as cursor:
+            if model._meta.db_table not in connection.introspection.table_names(cursor):
+                return result
+            constraints = connection.introspection.get_constraints(cursor, model._meta.db_table)
+        for name, info in constraints.items():
+            if not (info["index"] or info["unique"] or info["primary_key"]) or not info["columns"]:
+                continue
+            if any(column not in columns for column in info["columns"]):
+                continue
+            orders = info.get("orders") or ["ASC"] * len(info["columns"])
+            fields = [("-" if order == "DESC" else "") + columns[column]
+                      for column, order in zip(info["columns"], orders)]
+            result.append(IndexProposal(model, fields))
+            # B-tree อ่านย้อนหลังได้ ➜ ทิศทางกลับด้านทั้งหมดถือว่าเป็น index เดียวกัน
+            result.append(IndexProposal(model, [f[1:] if f.startswith("-") else f"-{f}" for f in fields]))
+        return result
+
+    @classmethod
+    def _covering(cls, proposal, others):
+        """index ใน others ที่ใช้แทน proposal ได้ (prefix เดียวกัน — index เต็มใช้แทน partial ได้ด้วย)"""
+        for other in others:
+            if other is proposal:
+                continue
+            if other.covers(proposal) or (other.condition is None and proposal.condition is not None
+                                          and other.fields[:len(proposal.fields)] == proposal.fields):
+                return other
+        return None
+
+    @classmethod
+    def _is_covered(cls, proposal, others):
+        return cls._covering(proposal, others) is not None
+
+    @classmethod
+    def advise(cls, models_only=None, urlconf=None):
+        """รวม proposal ทุก view ➜ ตัดซ้ำ / ตัดที่เป็น prefix ของตัวอื่น / ตัดที่มีอยู่แล้ว"""
+        merged = {}
+        for view, route in cls.list_views(urlconf):
+            for proposal in cls.proposals_for_view(view, route):
+                if models_only and proposal.model not in models_only:
+                    continue
+                if proposal.key in merged:
+                    merged[proposal.key].reasons += proposal.reasons
+                else:
+                    merged[proposal.key] = proposal
+        proposals = list(merged.values())
+        # (a) อยู่ใน (a, -created_at) แล้ว / partial ที่ index เต็มตัวอื่นครอบ ➜ เก็บตัวยาว รวมเหตุผล
+        kept = []
+        for proposal in proposals:
+            wider = cls._covering(proposal, proposals)
+            if wider is not None:
+                wider.reasons += [r for r in proposal.reasons if r not in wider.reasons]
+            else:
+                kept.append(proposal)
+        existing = {}
+        result = []
+        for proposal in kept:
+            model = proposal.model
+            if model not in existing:
+                existing[model] = cls.existing(model)
+            if not cls._is_covered(proposal, existing[model]):
+                result.append(proposal)
+        return sorted(result, key=lambda p: (p.model._meta.label, p.fields))
+
+    # ---------- EXPLAIN ----------
+    @classmethod
+    def sample_queryset(cls, proposal, limit=25):
+        """query แบบที่ list view ส่ง: ค่าเท่ากับด้วยค่าที่มีจริง + ORDER BY + LIMIT"""
+        model = proposal.model
+        qs = model._base_manager.all()
+        if proposal.condition is not None:
+            qs = qs.filter(proposal.condition)
+        order = []
+        for position, field in enumerate(proposal.fields):
+            name = field.lstrip("-")
+            if order or field.startswith("-") or position == len(proposal.fields) - 1:
+                order.append(field)
+                continue
+            value = (qs.exclude(**{f"{name}__isnull": True}).order_by()
+                       .values_list(name, flat=True).first())
+            qs = qs.filter(**{name: value})
+        return qs.order_by(*order)[:limit]
+
+    @classmethod
+    def explain(cls, proposal):
+        """
+        สร้าง index ชั่วคราวใน transaction ➜ EXPLAIN ➜ rollback
+        proposal.used = True ถ้า planner เลือก index ที่แนะนำ (None = backend สร้าง index ใน transaction ไม่ได้)
+        """
+        model = proposal.model
+        connection = connections[router.db_for_write(model)]
+        index = proposal.index()
+        if not connection.features.can_rollback_ddl:
+            proposal.plan = None
+            return proposal
+        with transaction.atomic(using=connection.alias):
+            editor = connection.schema_editor()
+            with connection.cursor() as cursor:
+                cursor.execute(str(index.create_sql(model, editor)))
+            proposal.plan = cls.sample_queryset(proposal).explain()
+            proposal.used = index.name in proposal.plan
+            transaction.set_rollback(True, using=connection.alias)
+        return proposal
+
+    # ---------- migration ----------
+    @classmethod
+    def write_migrations(cls, proposals, concurrently=False, name="list_indexes"):
+        """
+        migration ต่อ app: SeparateDatabaseAndState(AddIndex) — สร้าง index ในฐานข้อมูลโดยไม่แก้
+        model state (makemigrations ครั้งถัดไปจะไม่พยายามลบ index) คืน [path]
+        concurrently=True ➜ AddIndexConcurrently (PostgreSQL, migration แบบ atomic = False)
+        """
+        by_app = {}
+        for proposal in proposals:
+            by_app.setdefault(proposal.model._meta.app_label, []).append(proposal)
+        if not by_app:
+            return []
+
+        loader = MigrationLoader(None, ignore_no_migrations=True)
+        paths = []
+        for app_label, items in by_app.items():
+            if concurrently:
+                from django.contrib.postgres.operations import AddIndexConcurrently as add_index
+            else:
+                add_index = migrations.AddIndex
+            operation = migrations.SeparateDatabaseAndState(database_operations=[
+                add_index(p.model._meta.model_name, p.index()) for p in items
+            ])
+            leaves = loader.graph.leaf_nodes(app_label)
+            number = (MigrationAutodetector.parse_number(leaves[0][1]) or 0) + 1 if leaves else 1
+            migration = type("Migration", (migrations.Migration,), {
+                "dependencies": leaves,
+                "operations": [operation],
+            })(f"{number:04d}_{name}", app_label)
+            writer = MigrationWriter(migration)
+            source = writer.as_string()
+            if concurrently:
+                # MigrationWriter ไม่เขียน atomic ให้ — CREATE INDEX CONCURRENTLY ต้องอยู่นอก transaction
+                source = source.replace(
+                    "class Migration(migrations.Migration):\n",
+                    "class Migration(migrations.Migration):\n\n    atomic = False\n", 1,
+                )
+            with open(writer.path, "w", encoding="utf-8") as fh:
+                fh.write(source)
+            paths.append(writer.path)
+        return paths
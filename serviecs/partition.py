@@ -0,0 +1,361 @@
+import re
+from datetime import datetime, timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections, models, router, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from core.models import PartitionedBaseTime, TimePartitionManager, _as_datetime
+from core.serviecs.versioning import bump_model_version
+
+
+class PartitionService:
+    """
+    แบ่งเก็บ / ย้ายข้อมูลเก่าของโมเดลที่สืบทอด PartitionedBaseTime
+
+    PostgreSQL:
+        convert()           เปลี่ยนตารางเดิมเป็น PARTITION BY RANGE (created_at) (ครั้งเดียว)
+        ensure_partitions() สร้าง partition ล่วงหน้า (เรียกจาก cron ทุกวัน / สัปดาห์)
+        archive()           DETACH partition ที่เก่ากว่า cutoff แล้ว ATTACH เข้า <table>_archive
+                            (ย้ายแค่ metadata ไม่ต้อง DELETE / VACUUM)
+    backend อื่น (หรือ PostgreSQL ที่ยังไม่ convert):
+        archive()           ย้ายแถวที่เก่ากว่า cutoff ไป <table>_archive ทีละ batch_size แถว
+                            แถวที่ยังมี FK / ManyToMany ชี้มาอยู่จะถูกข้ามไว้ในตารางหลัก
+    """
+    _archive_models = {}
+
+    # ---------- config ----------
+    @classmethod
+    def models(cls):
+        return [m for m in apps.get_models() if issubclass(m, PartitionedBaseTime)]
+
+    @classmethod
+    def _check(cls, model):
+        if not issubclass(model, PartitionedBaseTime):
+            raise ImproperlyConfigured(f"{model._meta.label} ต้องสืบทอด PartitionedBaseTime")
+
+    @classmethod
+    def _connection(cls, model):
+        return connections[router.db_for_write(model)]
+
+    @classmethod
+    def is_postgres(cls, model):
+        return cls._connection(model).vendor == "postgresql"
+
+    @classmethod
+    def archive_table(cls, model):
+        return f"{model._meta.db_table}_archive"
+
+    # ---------- ช่วงเวลา ----------
+    @classmethod
+    def period_start(cls, model, moment):
+        """ต้นเดือน / ต้นปีของ moment (ตาม partition_interval) ใน timezone ปัจจุบัน"""
+        if settings.USE_TZ:
+            moment = timezone.localtime(moment) if timezone.is_aware(moment) else timezone.make_aware(moment)
+        month = 1 if model.partition_interval == "year" else moment.month
+        return datetime(moment.year, month, 1, tzinfo=moment.tzinfo)
+
+    @classmethod
+    def next_period(cls, model, start):
+        if model.partition_interval == "year":
+            return start.replace(year=start.year + 1)
+        if start.month == 12:
+            return start.replace(year=start.year + 1, month=1)
+        return start.replace(month=start.month + 1)
+
+    @classmethod
+    def partition_name(cls, model, start):
+        suffix = f"{start:%Y}" if model.partition_interval == "year" else f"{start:%Y%m}"
+        return f"{model._meta.db_table}_p{suffix}"
+
+    @classmethod
+    def archive_cutoff(cls, model, before=None):
+        """วันเวลาที่ข้อมูลก่อนหน้านั้นถือว่าเก่า (before: date / datetime หรือ now - archive_after_days)"""
+        if before is not None:
+            return _as_datetime(before)[0]
+        if model.archive_after_days is None:
+            return None
+        return timezone.now() - timedelta(days=model.archive_after_days)
+
+    # ---------- PostgreSQL partitions ----------
+    @classmethod
+    def is_partitioned(cls, model):
+        connection = cls._connection(model)
+        if connection.vendor != "postgresql":
+            return False
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid "
+                "WHERE c.relname = %s AND pg_table_is_visible(c.oid)",
+                [model._meta.db_table],
+            )
+            return cursor.fetchone() is not None
+
+    @classmethod
+    def partitions(cls, model, parent=None):
+        """[(ชื่อ, start, end)] ของ partition ที่ตั้งชื่อตาม partition_name() ใต้ตาราง parent"""
+        parent = parent or model._meta.db_table
+        pattern = re.compile(rf"^{re.escape(model._meta.db_table)}_p(\d{{4}})(\d{{2}})?$")
+        with cls._connection(model).cursor() as cursor:
+            cursor.execute(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+                "WHERE p.relname = %s AND pg_table_is_visible(p.oid)",
+                [parent],
+            )
+            names = [row[0] for row in cursor.fetchall()]
+        result = []
+        for name in names:
+            match = pattern.match(name)
+            if match:
+                start = cls.period_start(model, datetime(int(match[1]), int(match[2] or 1), 1))
+                result.append((name, start, cls.next_period(model, start)))
+        return sorted(result, key=lambda p: p[1])
+
+    @classmethod
+    def _create_partitions(cls, cursor, model, first, ahead):
+        """สร้าง partition ตั้งแต่ช่วงของ first ถึง ahead ช่วงถัดจากปัจจุบัน + DEFAULT partition"""
+        quote = cls._connection(model).ops.quote_name
+        table = model._meta.db_table
+        existing = {name for name, _, _ in cls.partitions(model)}
+        start = cls.period_start(model, first)
+        stop = cls.period_start(model, timezone.now())
+        for _ in range(ahead + 1):
+            stop = cls.next_period(model, stop)
+
+        created = 0
+        while start < stop:
+            end, name = cls.next_period(model, start), cls.partition_name(model, start)
+            if name not in existing:
+                cursor.execute(
+                    f"CREATE TABLE IF NOT EXISTS {quote(name)} PARTITION OF {quote(table)} "
+                    f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+                )
+                created += 1
+            start = end
+        cursor.execute(f"CREATE TABLE IF NOT EXISTS {quote(table + '_default')} PARTITION OF {quote(table)} DEFAULT")
+        return created
+
+    @classmethod
+    def ensure_partitions(cls, model, ahead=3):
+        """สร้าง partition ของช่วงปัจจุบัน + ahead ช่วงถัดไป คืนจำนวนที่สร้างใหม่ (ตารางยังไม่ convert ➜ 0)"""
+        cls._check(model)
+        if not cls.is_partitioned(model):
+            return 0
+        connection = cls._connection(model)
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            return cls._create_partitions(cursor, model, timezone.now(), ahead)
+
+    @classmethod
+    def convertible_errors(cls, model):
+        """
+        สิ่งที่ทำให้ convert ไม่ได้: unique บน partitioned table ต้องมี created_at
+        และ FK ที่ชี้มาที่ตารางนี้ต้องอ้าง (id, created_at) ซึ่ง Django ไม่รองรับ
+        """
+        errors = []
+        for field in model._meta.local_concrete_fields:
+            if field.unique and not field.primary_key:
+                errors.append(f"ฟิลด์ {field.name} เป็น unique")
+        for constraint in model._meta.constraints:
+            if isinstance(constraint, models.UniqueConstraint) and "created_at" not in constraint.fields:
+                errors.append(f"UniqueConstraint {constraint.name} ไม่มี created_at")
+        if model._meta.unique_together:
+            errors.append("มี unique_together")
+        for rel in model._meta.related_objects:
+            if rel.many_to_many or getattr(rel.field, "db_constraint", False):
+                errors.append(f"{rel.related_model._meta.label}.{rel.field.name} อ้างอิงมาที่ตารางนี้")
+        for field in model._meta.local_many_to_many:
+            errors.append(f"ManyToMany {field.name} อ้างอิงมาที่ตารางนี้")
+        return errors
+
+    @classmethod
+    def convert(cls, model, ahead=3):
+        """
+        PostgreSQL: สร้างตาราง partitioned ใหม่ ย้ายข้อมูล แล้วลบตารางเดิม (ใน transaction เดียว)
+        primary key กลายเป็น (id, created_at); index / FK ขาออกสร้างใหม่ตามเดิม
+        คืน False ถ้าเป็น partitioned อยู่แล้ว
+        """
+        cls._check(model)
+        connection = cls._connection(model)
+        if connection.vendor != "postgresql":
+            raise ImproperlyConfigured("convert ใช้ได้กับ PostgreSQL เท่านั้น (backend อื่นใช้ archive)")
+        if cls.is_partitioned(model):
+            return False
+        errors = cls.convertible_errors(model)
+        if errors:
+            raise ImproperlyConfigured(f"{model._meta.label}: " + ", ".join(errors))
+
+        quote = connection.ops.quote_name
+        table, old = model._meta.db_table, f"{model._meta.db_table}_unpartitioned"
+        pk = quote(model._meta.pk.column)
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            # index เดิม (ไม่รวม primary key / unique) — indexdef อ้างชื่อตารางเดิมอยู่แล้ว
+            cursor.execute(
+                "SELECT indexdef FROM pg_indexes WHERE schemaname = current_schema() "
+                "AND tablename = %s AND indexdef NOT LIKE 'CREATE UNIQUE%%'",
+                [table],
+            )
+            index_defs = [row[0] for row in cursor.fetchall()]
+            cursor.execute(f"SELECT MIN(created_at) FROM {quote(table)}")
+            first = cursor.fetchone()[0] or timezone.now()
+
+            cursor.execute(f"ALTER TABLE {quote(table)} RENAME TO {quote(old)}")
+            cursor.execute(
+                f"CREATE TABLE {quote(table)} (LIKE {quote(old)} INCLUDING DEFAULTS INCLUDING IDENTITY "
+                f"INCLUDING CONSTRAINTS INCLUDING STORAGE INCLUDING COMMENTS) PARTITION BY RANGE (created_at)"
+            )
+            cursor.execute(f"ALTER TABLE {quote(table)} ADD PRIMARY KEY ({pk}, created_at)")
+            cls._create_partitions(cursor, model, first, ahead)
+            cursor.execute(f"INSERT INTO {quote(table)} OVERRIDING SYSTEM VALUE SELECT * FROM {quote(old)}")
+
+            # sequence ของ id: identity ➜ ตั้งค่าต่อจาก MAX(id) / serial เดิม ➜ ย้ายเจ้าของมาตารางใหม่
+            cursor.execute("SELECT pg_get_serial_sequence(%s, %s)", [table, model._meta.pk.column])
+            sequence = cursor.fetchone()[0]
+            if sequence is None:
+                cursor.execute("SELECT pg_get_serial_sequence(%s, %s)", [old, model._meta.pk.column])
+                old_sequence = cursor.fetchone()[0]
+                if old_sequence:
+                    cursor.execute(f"ALTER SEQUENCE {old_sequence} OWNED BY {quote(table)}.{pk}")
+            else:
+                cursor.execute(
+                    f"SELECT setval(%s, COALESCE((SELECT MAX({pk}) FROM {quote(table)}), 0) + 1, false)",
+                    [sequence],
+                )
+
+            cursor.execute(f"DROP TABLE {quote(old)}")
+            for index_def in index_defs:
+                cursor.execute(index_def)
+            for field in model._meta.local_concrete_fields:
+                if field.is_relation and field.db_constraint:
+                    target = field.target_field
+                    cursor.execute(
+                        f"ALTER TABLE {quote(table)} ADD FOREIGN KEY ({quote(field.column)}) "
+                        f"REFERENCES {quote(target.model._meta.db_table)} ({quote(target.column)}) "
+                        f"DEFERRABLE INITIALLY DEFERRED"
+                    )
+        bump_model_version(model)
+        return True
+
+    # ---------- archive ----------
+    @classmethod
+    def archive_model(cls, model):
+        """
+        โมเดล (managed=False) ของตาราง <table>_archive มีฟิลด์เหมือน model
+        FK ไม่มี constraint และไม่มี reverse accessor (related_name="+")
+        """
+        cls._check(model)
+        label = model._meta.label_lower
+        if label not in cls._archive_models:
+            attrs = {"__module__": model.__module__, "objects": TimePartitionManager()}
+            for field in model._meta.local_concrete_fields:
+                clone = field.clone()
+                if clone.is_relation:
+                    clone.remote_field.related_name = "+"
+                    clone.db_constraint = False
+                attrs[field.name] = clone
+            attrs["Meta"] = type("Meta", (), {
+                "app_label": model._meta.app_label,
+                "db_table": cls.archive_table(model),
+                "managed": False,
+                "ordering": ["-created_at"],
+                "default_permissions": (),
+                "verbose_name": f"{model._meta.verbose_name} (archive)",
+            })
+            cls._archive_models[label] = type(f"{model.__name__}Archive", (models.Model,), attrs)
+        return cls._archive_models[label]
+
+    @classmethod
+    def archive(cls, model, before=None, batch_size=1000):
+        """
+        ย้ายข้อมูลที่สร้างก่อน cutoff ไป <table>_archive
+        คืน (จำนวน, หน่วย) — ("partition" บน PostgreSQL ที่ convert แล้ว, "row" กรณีอื่น)
+        """
+        cls._check(model)
+        cutoff = cls.archive_cutoff(model, before)
+        if cutoff is None:
+            raise ImproperlyConfigured(f"{model._meta.label}: กำหนด archive_after_days หรือส่ง before")
+        if cls.is_partitioned(model):
+            moved, unit = cls._archive_partitions(model, cutoff), "partition"
+        else:
+            moved, unit = cls._archive_rows(model, cutoff, batch_size), "row"
+        if moved:
+            bump_model_version(model)
+        return moved, unit
+
+    @classmethod
+    def _archive_partitions(cls, model, cutoff):
+        """DETACH partition ที่สิ้นสุดก่อน cutoff ทั้งช่วง แล้ว ATTACH เข้าตาราง archive (partitioned เช่นกัน)"""
+        connection = cls._connection(model)
+        quote = connection.ops.quote_name
+        table, archive = model._meta.db_table, cls.archive_table(model)
+        moved = 0
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {quote(archive)} (LIKE {quote(table)} INCLUDING DEFAULTS "
+                f"INCLUDING CONSTRAINTS) PARTITION BY RANGE (created_at)"
+            )
+            for name, start, end in cls.partitions(model):
+                if end > cutoff:
+                    break
+                cursor.execute(f"ALTER TABLE {quote(table)} DETACH PARTITION {quote(name)}")
+                cursor.execute(
+                    f"ALTER TABLE {quote(archive)} ATTACH PARTITION {quote(name)} "
+                    f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+                )
+                moved += 1
+        return moved
+
+    @classmethod
+    def unreferenced(cls, queryset):
+        """
+        ตัดแถวที่ยังมี FK / ManyToMany ชี้มาออก — DELETE แถวเหล่านั้นจะติด IntegrityError
+        (หรือทิ้ง reference ค้างถ้า db_constraint=False) จึงต้องอยู่ในตารางหลักต่อไป
+        """
+        model = queryset.model
+        refs = []
+        for rel in model._meta.related_objects:
+            if rel.many_to_many:
+                refs.append((rel.through, rel.field.m2m_reverse_field_name(), "pk"))
+            else:
+                refs.append((rel.related_model, rel.field.name, rel.field.target_field.attname))
+        for field in model._meta.local_many_to_many:
+            refs.append((field.remote_field.through, field.m2m_field_name(), "pk"))
+        for related, name, target in refs:
+            queryset = queryset.filter(~Exists(related._base_manager.filter(**{name: OuterRef(target)})))
+        return queryset
+
+    @classmethod
+    def _archive_rows(cls, model, cutoff, batch_size):
+        """INSERT … SELECT + DELETE ทีละชุด (ชุดละ transaction) ไม่เรียก signal / cascade"""
+        connection = cls._connection(model)
+        quote = connection.ops.quote_name
+        archive_model = cls.archive_model(model)
+        table, archive = model._meta.db_table, archive_model._meta.db_table
+        if archive not in connection.introspection.table_names():
+            with connection.schema_editor() as editor:
+                editor.create_model(archive_model)
+
+        columns = ", ".join(quote(f.column) for f in model._meta.local_concrete_fields)
+        pk = model._meta.pk
+        old_rows = (cls.unreferenced(model._base_manager.using(connection.alias)
+                                     .filter(created_at__lt=cutoff))
+                    .order_by("created_at", "pk")
+                    .values_list("pk", flat=True))
+        moved = 0
+        while True:
+            with transaction.atomic(using=connection.alias):
+                ids = [pk.get_db_prep_value(v, connection) for v in old_rows[:batch_size]]
+                if not ids:
+                    break
+                where = f"{quote(pk.column)} IN ({', '.join(['%s'] * len(ids))})"
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f"INSERT INTO {quote(archive)} ({columns}) SELECT {columns} FROM {quote(table)} WHERE {where}",
+                        ids,
+                    )
+                    cursor.execute(f"DELETE FROM {quote(table)} WHERE {where}", ids)
+            moved += len(ids)
+        return moved
@@ -0,0 +1,244 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import IntegrityError, router, transaction
+from django.db.models import Count, F, Sum, Value
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from core.models import BaseTime, DailyRollup
+
+
+class RollupService:
+    """
+    ยอดสรุปรายวัน (DailyRollup) ของโมเดลที่สืบทอด BaseTime
+
+    ตั้งค่าใน settings:
+        CORE_ROLLUPS = {
+            "sales.Invoice": {"status": "status", "amount": "total"},
+            "sales.Order": {},                      # นับอย่างเดียว ไม่แยก status
+        }
+    save / delete ปรับยอดเป็น +/- ทีละแถว: pre_save / pre_delete อ่าน (วัน, status, amount) เดิม
+    ของแถวนั้นจากฐานข้อมูล (ไม่จำค่าตอนโหลด instance ทุกตัว ➜ หน้า list / export ไม่เสียอะไร)
+    หลัง save จำค่าไว้บน instance ➜ save ซ้ำไม่ต้องอ่านอีก
+    queryset.update / bulk_create / bulk_update ต้องเรียก move_status() / record_created() /
+    prepare_many() + record_changed() เอง (AutoStatusMixin และ FormsetMixin เรียกให้แล้ว)
+    """
+    SNAPSHOT_ATTR = "_core_rollup_snapshot"
+
+    _config = None
+
+    # ---------- config ----------
+    @classmethod
+    def config(cls) -> dict:
+        """{model: {"status": field | None, "amount": field | None}}"""
+        if cls._config is None:
+            config = {}
+            for label, options in getattr(settings, "CORE_ROLLUPS", {}).items():
+                model = apps.get_model(label)
+                if not issubclass(model, BaseTime):
+                    raise ImproperlyConfigured(f"CORE_ROLLUPS: {label} ต้องสืบทอด BaseTime")
+                config[model] = {"status": options.get("status"), "amount": options.get("amount")}
+            cls._config = config
+        return cls._config
+
+    @classmethod
+    def options(cls, model):
+        return cls.config().get(model)
+
+    # ---------- instance hooks (ดู core.signals) ----------
+    @classmethod
+    def _key(cls, instance, options):
+        """(วัน, status, amount) ของ instance หรือ None ถ้ายังไม่มี created_at / ฟิลด์ถูก defer"""
+        deferred = instance.get_deferred_fields()
+        names = ["created_at", options["status"], options["amount"]]
+        if any(name and name in deferred for name in names):
+            return None
+        created = instance.created_at
+        if created is None:
+            return None
+        day = timezone.localdate(created) if timezone.is_aware(created) else created.date()
+        status = str(getattr(instance, options["status"]) or "") if options["status"] else ""
+        amount = (getattr(instance, options["amount"]) or 0) if options["amount"] else 0
+        return day, status, Decimal(amount)
+
+    @classmethod
+    def snapshot(cls, instance):
+        options = cls.options(type(instance))
+        if options and instance.pk is not None:
+            setattr(instance, cls.SNAPSHOT_ATTR, cls._key(instance, options))
+
+    @classmethod
+    def prepare(cls, instance):
+        """
+        pre_save / pre_delete: ใช้ค่าที่จำไว้หลัง save / cascade ครั้งก่อน (instance ที่โหลดจากฐานข้อมูล)
+        ยังไม่มี หรือสร้าง instance เองพร้อม pk ➜ อ่านค่าเดิมจากฐานข้อมูล (1 query ตาม pk)
+        """
+        if instance._state.db is None:
+            instance.__dict__.pop(cls.SNAPSHOT_ATTR, None)
+        cls.prepare_many(type(instance), [instance], using=instance._state.db)
+
+    @classmethod
+    def prepare_many(cls, model, objs, using=None):
+        """ก่อน bulk_update: อ่านค่าเดิมของแถวที่ยังไม่ได้จำไว้ด้วย query เดียว"""
+        options = cls.options(model)
+        if not options:
+            return
+        missing = {
+            obj.pk: obj for obj in objs
+            if obj.pk is not None and getattr(obj, cls.SNAPSHOT_ATTR, None) is None
+        }
+        if not missing:
+            return
+        for obj in missing.values():
+            setattr(obj, cls.SNAPSHOT_ATTR, None)
+        fields = [f for f in ("created_at", options["status"], options["amount"]) if f]
+        for old in model._base_manager.db_manager(using).filter(pk__in=missing).only(*fields):
+            setattr(missing[old.pk], cls.SNAPSHOT_ATTR, cls._key(old, options))
+
+    @classmethod
+    def record_save(cls, instance, created, using=None):
+        options = cls.options(type(instance))
+        if not options:
+            return
+        current = cls._key(instance, options)
+        previous = None if created else getattr(instance, cls.SNAPSHOT_ATTR, None)
+        if previous != current:
+            if previous is not None:
+                cls.apply(type(instance), *previous[:2], -1, -previous[2], using=using)
+            if current is not None:
+                cls.apply(type(instance), *current[:2], 1, current[2], using=using)
+        setattr(instance, cls.SNAPSHOT_ATTR, current)
+
+    @classmethod
+    def record_delete(cls, instance, using=None):
+        options = cls.options(type(instance))
+        if not options:
+            return
+        previous = getattr(instance, cls.SNAPSHOT_ATTR, None)
+        if previous is not None:
+            cls.apply(type(instance), *previous[:2], -1, -previous[2], using=using)
+
+    @classmethod
+    def record_created(cls, objs, using=None):
+        """หลัง bulk_create (ไม่มี post_save)"""
+        for obj in objs:
+            cls.record_save(obj, created=True, using=using)
+
+    @classmethod
+    def record_changed(cls, objs, using=None):
+        """หลัง bulk_update — เทียบกับค่าที่อ่านไว้ด้วย prepare_many() ก่อน update"""
+        for obj in objs:
+            cls.record_save(obj, created=False, using=using)
+
+    @classmethod
+    def move_status(cls, queryset, new_status, field=None):
+        """
+        เรียกก่อน queryset.update(<field>=new_status) — ย้ายยอดของแถวที่จะเปลี่ยนจาก status เดิม
+        ไป status ใหม่ ใช้ aggregate query เดียวต่อ queryset (field ไม่ใช่ฟิลด์ status ของ rollup ➜ ข้าม)
+        """
+        options = cls.options(queryset.model)
+        if not options or not options["status"] or (field and field != options["status"]):
+            return
+        status_field, amount_field = options["status"], options["amount"]
+        new_status = str(new_status or "")
+        rows = (queryset.exclude(**{status_field: new_status})
+                        .order_by()
+                        .annotate(_day=TruncDate("created_at"))
+                        .values("_day", status_field)
+                        .annotate(_n=Count("pk"), _s=Sum(amount_field) if amount_field else Value(0)))
+        for row in rows:
+            amount = Decimal(row["_s"] or 0)
+            old_status = str(row[status_field] or "")
+            cls.apply(queryset.model, row["_day"], old_status, -row["_n"], -amount, using=queryset.db)
+            cls.apply(queryset.model, row["_day"], new_status, row["_n"], amount, using=queryset.db)
+
+    # ---------- storage ----------
+    @classmethod
+    def apply(cls, model, day, status, count, amount, using=None):
+        """บวก/ลบยอดของ (model, day, status) — UPDATE ก่อน ไม่มีแถวค่อย INSERT"""
+        using = using or router.db_for_write(DailyRollup)
+        label = model._meta.label_lower
+        key = {"model_label": label, "day": day, "status": status}
+        qs = DailyRollup.objects.using(using).filter(**key)
+        if qs.update(count=F("count") + count, amount=F("amount") + amount):
+            return
+        try:
+            with transaction.atomic(using=using):
+                DailyRollup.objects.using(using).create(**key, count=count, amount=amount)
+        except IntegrityError:
+            # มี request อื่นสร้างแถวตัดหน้า
+            qs.update(count=F("count") + count, amount=F("amount") + amount)
+
+    @classmethod
+    def rebuild(cls, model, since=None):
+        """คำนวณใหม่ทั้งหมด (หรือตั้งแต่วันที่ since) จากตารางจริง คืนจำนวนแถว rollup"""
+        options = cls.options(model)
+        if options is None:
+            raise ImproperlyConfigured(f"{model._meta.label} ไม่ได้อยู่ใน CORE_ROLLUPS")
+        status_field, amount_field = options["status"], options["amount"]
+        using = router.db_for_write(DailyRollup)
+        label = model._meta.label_lower
+
+        qs = model._base_manager.order_by()
+        if since is not None:
+            qs = qs.filter(created_at__date__gte=since)
+        group = ["_day", status_field] if status_field else ["_day"]
+        rows = (qs.annotate(_day=TruncDate("created_at"))
+                  .values(*group)
+                  .annotate(_n=Count("pk"), _s=Sum(amount_field) if amount_field else Value(0)))
+        objs = [
+            DailyRollup(
+                model_label=label, day=row["_day"],
+                status=str(row[status_field] or "") if status_field else "",
+                count=row["_n"], amount=row["_s"] or 0,
+            )
+            for row in rows.iterator()
+        ]
+        with transaction.atomic(using=using):
+            existing = DailyRollup.objects.using(using).filter(model_label=label)
+            if since is not None:
+                existing = existing.filter(day__gte=since)
+            existing.delete()
+            DailyRollup.objects.using(using).bulk_create(objs, batch_size=1000)
+        return len(objs)
+
+    # ---------- read (dashboard) ----------
+    @classmethod
+    def summary(cls, model, days=30, today=None):
+        """
+        KPI + กราฟรายวันของ model จาก DailyRollup (อ่านไม่เกิน days × จำนวน status แถว)
+        คืน dict: today, last_7, last_n, amount_n, by_status, chart_id, series {labels, counts, amounts}
+        """
+        today = today or timezone.localdate()
+        start = today - timedelta(days=days - 1)
+        rows = (DailyRollup.objects
+                .filter(model_label=model._meta.label_lower, day__gte=start, day__lte=today)
+                .values_list("day", "status", "count", "amount"))
+
+        per_day = {start + timedelta(days=i): [0, Decimal(0)] for i in range(days)}
+        by_status = {}
+        for day, status, count, amount in rows:
+            per_day[day][0] += count
+            per_day[day][1] += amount
+            by_status[status] = by_status.get(status, 0) + count
+
+        week_start = today - timedelta(days=6)
+        return {
+            "model": model,
+            "label": str(model._meta.verbose_name_plural),
+            "chart_id": f"rollup-{model._meta.label_lower.replace('.', '-')}",
+            "today": per_day[today][0],
+            "last_7": sum(c for d, (c, _) in per_day.items() if d >= week_start),
+            "last_n": sum(c for c, _ in per_day.values()),
+            "amount_n": sum(a for _, a in per_day.values()),
+            "by_status": dict(sorted(by_status.items())),
+            "series": {
+                "labels": [d.isoformat() for d in per_day],
+                "counts": [c for c, _ in per_day.values()],
+                "amounts": [float(a) for _, a in per_day.values()],
+            },
+        }
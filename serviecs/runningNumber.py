@@ -1,42 +1,320 @@
-import re
-from django.db import transaction
+import hashlib
+import warnings
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import (
+    DatabaseError, IntegrityError, OperationalError, connections, router, transaction,
+)
+from django.db.backends.utils import truncate_name
+from django.db.models import F
+from django.db.models.functions import Length
 from django.utils import timezone
 
+from core.models import RunningNumberCounter
+from core.serviecs.runningPattern import RunningNumberPattern
+
+
 class RunningNumberService:
-    VARS = {
-        "YYYY": lambda n: f"{n.year:04}",
-        "YY":   lambda n: f"{n.year:04}"[-2:],
-        "THYY": lambda n: f"{n.year + 543}"[-2:],
-        "MM":   lambda n: f"{n:%m}",
-    }
+    # จำนวนแถวสูงสุดที่ไล่หาเลขล่าสุดเมื่อแถวบนสุดเป็นค่าที่ parse ไม่ได้ (เช่นเลขที่กรอกเอง)
+    parse_scan_limit = 100
+
+    # deprecated: คงไว้ให้โค้ดเดิม ใช้ RunningNumberPattern แทน
+    VARS = {name: fn for name, (_, fn) in RunningNumberPattern.TOKENS.items()}
+
+    @classmethod
+    def resolve_prefix(cls, pattern: str, now=None) -> str:
+        """deprecated: ใช้ RunningNumberPattern.prefix() / suffix()"""
+        warnings.warn(
+            "RunningNumberService.resolve_prefix() เลิกใช้แล้ว ใช้ RunningNumberPattern.prefix()",
+            DeprecationWarning, stacklevel=2,
+        )
+        compiled = cls.compile(pattern)
+        now = now or cls.now()
+        return compiled.prefix(now) + compiled.suffix(now)
+
+    @classmethod
+    def seq_pad(cls, pattern: str) -> int:
+        """deprecated: ใช้ RunningNumberPattern.seq_pad"""
+        warnings.warn(
+            "RunningNumberService.seq_pad() เลิกใช้แล้ว ใช้ RunningNumberPattern.seq_pad",
+            DeprecationWarning, stacklevel=2,
+        )
+        return cls.compile(pattern).seq_pad
 
     @classmethod
-    def next(cls, model, field, pattern: str) -> str:
+    def get_mode(cls, model, field) -> str:
+        """อ่าน mode จาก RunningNumberField ของโมเดล (ถ้าไม่ใช่ก็ถือเป็น "lock")"""
+        try:
+            return getattr(model._meta.get_field(field), "mode", "lock")
+        except FieldDoesNotExist:
+            return "lock"
+
+    @staticmethod
+    def compile(pattern) -> RunningNumberPattern:
+        if isinstance(pattern, RunningNumberPattern):
+            return pattern
+        return RunningNumberPattern.compile(pattern)
+
+    @staticmethod
+    def now():
+        """งวด (ปี / เดือน / วัน) ตามเวลาท้องถิ่นของ TIME_ZONE ไม่ใช่ UTC"""
+        return timezone.localtime() if settings.USE_TZ else timezone.now()
+
+    @classmethod
+    def next(cls, model, field, pattern, mode: str | None = None) -> str:
         """
         รับ pattern เช่น '{YYYY}{SEQ:04}'  แล้วคืนค่าหมายเลขถัดไป (safe-concurrency)
         """
-        now = timezone.now()
-        # แทน year / month ล่วงหน้าเพื่อสร้าง prefix ค้นหา
-        prefix = pattern
-        for k, fn in cls.VARS.items():
-            prefix = prefix.replace(f"{{{k}}}", fn(now))
-        # เปลี่ยน {SEQ:n} เป็น empty เพื่อใช้เป็น startswith
-        prefix = re.sub(r"\{SEQ:\d+\}", "", prefix)
-
-        with transaction.atomic():
-            latest = (model.objects.select_for_update()
-                      .filter(**{f"{field}__startswith": prefix})
-                      .order_by(f"-{field}")
-                      .values_list(field, flat=True)
-                      .first())
-
-            seq_pad = int(re.search(r"\{SEQ:(\d+)\}", pattern).group(1))
-            curr_seq = int(latest[-seq_pad:]) if latest else 0
-            next_seq = str(curr_seq + 1).zfill(seq_pad)
-
-        # ประกอบผลลัพธ์จริง
-        number = pattern
-        for k, fn in cls.VARS.items():
-            number = number.replace(f"{{{k}}}", fn(now))
-        number = re.sub(r"\{SEQ:\d+\}", next_seq, number)
-        return number
+        return cls.next_many(model, field, pattern, 1, mode=mode)[0]
+
+    @classmethod
+    def next_many(cls, model, field, pattern, n: int, mode: str | None = None) -> list[str]:
+        """
+        จองเลขต่อเนื่อง n ตัวในคำสั่งเดียว (ล็อก/อัปเดตครั้งเดียวต่อทั้งบล็อก)
+        """
+        if n <= 0:
+            return []
+        compiled = cls.compile(pattern)
+        now = cls.now()
+
+        mode = mode or cls.get_mode(model, field)
+        if mode == "sequence" and cls._supports_sequences(model):
+            seqs = cls._next_from_sequence(model, field, compiled, now, n)
+            return cls._check_length(model, field, [compiled.format(now, seq) for seq in seqs])
+
+        if mode == "counter":
+            curr_seq = cls._increment_counter(model, field, compiled, now, n) - n
+        else:
+            using = router.db_for_write(model)
+            with transaction.atomic(using=using):
+                cls._lock_for_write(using)
+                curr_seq = cls._latest_seq(model, field, compiled, now, lock=True, using=using)
+
+        return cls._check_length(
+            model, field, [compiled.format(now, seq) for seq in range(curr_seq + 1, curr_seq + n + 1)]
+        )
+
+    @staticmethod
+    def _check_length(model, field, numbers: list[str]) -> list[str]:
+        """
+        เลขลำดับเกินจำนวนหลักใน {SEQ:n} ได้ แต่ต้องไม่ยาวเกิน max_length ของคอลัมน์
+        (PostgreSQL จะ error ตอนบันทึก ส่วน SQLite จะเก็บเกินไปเงียบ ๆ) ➜ แจ้งให้ขยาย max_length / pad
+        """
+        try:
+            max_length = model._meta.get_field(field).max_length
+        except FieldDoesNotExist:
+            return numbers
+        if max_length and numbers and len(numbers[-1]) > max_length:
+            raise ValueError(
+                f"เลขรัน {numbers[-1]!r} ยาวเกิน max_length={max_length} ของ "
+                f"{model._meta.label}.{field} (เลขลำดับเกินจำนวนหลักใน {{SEQ:n}}) "
+                f"ให้เพิ่ม max_length หรือจำนวนหลักของ {{SEQ:n}}"
+            )
+        return numbers
+
+    # ---------- lock mode ----------
+    @classmethod
+    def _latest_seq(cls, model, field, compiled, now, *, lock: bool = False, using=None) -> int:
+        """
+        หาเลขลำดับล่าสุดของงวด ด้วย range query (>= prefix, < prefix_upper) + ORDER BY field
+        ที่ใช้ unique index ได้ (อ่านแถวเดียว)
+        เลขที่ได้เป็น 9 ทุกหลัก (เช่น 9999) ➜ เลขถัดไปยาวขึ้นและเรียงตามตัวอักษรไม่ได้
+        จึงเรียงตามความยาวแทน (ไม่ใช้ index แต่เกิดเฉพาะเมื่อเลขลำดับเกินจำนวนหลักที่ pad ไว้)
+        """
+        prefix, suffix = compiled.prefix(now), compiled.suffix(now)
+        lookups = {f"{field}__gte": prefix}
+        upper = compiled.upper_bound(prefix)
+        if upper is not None:
+            lookups[f"{field}__lt"] = upper
+        if suffix:
+            lookups[f"{field}__endswith"] = suffix
+
+        qs = model._default_manager.db_manager(using).all()
+        if lock:
+            qs = qs.select_for_update()
+        qs = qs.filter(**lookups)
+        seq = cls._first_seq(qs.order_by(f"-{field}"), field, compiled)
+        digits = str(seq or 0)
+        if len(digits) >= compiled.seq_pad and not digits.strip("9"):
+            seq = cls._first_seq(qs.order_by(Length(field).desc(), f"-{field}"), field, compiled)
+        return seq or 0
+
+    @classmethod
+    def _first_seq(cls, qs, field, compiled) -> int | None:
+        """
+        เลขลำดับของแถวแรกที่ตรง pattern — ข้ามค่าที่ parse ไม่ได้ (เช่นเลขที่กรอกเอง) ไม่ให้กลายเป็น 0
+        อ่านแถวเดียวก่อน ถ้าไม่ตรงจึงไล่ต่อไม่เกิน parse_scan_limit แถว (ไม่สแกนทั้งงวด)
+        """
+        values = qs.values_list(field, flat=True)
+        for value in values[:1]:
+            parsed = compiled.parse(value)
+            if parsed:
+                return parsed[1]
+            for value in values[1:cls.parse_scan_limit].iterator(chunk_size=100):
+                parsed = compiled.parse(value)
+                if parsed:
+                    return parsed[1]
+        return None
+
+    @staticmethod
+    def _lock_for_write(using):
+        """
+        SQLite: select_for_update() ไม่มีผล ➜ เขียน (no-op) ก่อนอ่าน เพื่อจับ write lock
+        ตั้งแต่ต้น transaction (เทียบเท่า BEGIN IMMEDIATE) writer อื่นจะรอตาม timeout แทนการอ่านเลขซ้ำ
+        """
+        connection = connections[using]
+        if connection.vendor != "sqlite":
+            return
+        table = connection.ops.quote_name(RunningNumberCounter._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(f"UPDATE {table} SET last_value = last_value WHERE 0")
+
+    @staticmethod
+    def is_retryable_error(exc) -> bool:
+        """เลขชน unique หรือ SQLite lock ชนกัน ➜ ออกเลขใหม่แล้วลองอีกครั้งได้"""
+        if isinstance(exc, IntegrityError):
+            return True
+        message = str(exc).lower()
+        return isinstance(exc, OperationalError) and ("locked" in message or "busy" in message)
+
+    # ---------- counter mode ----------
+    @classmethod
+    def counter_key(cls, model, field, period_key: str) -> dict:
+        return {"model_label": model._meta.label_lower, "field": field, "prefix": period_key}
+
+    @classmethod
+    def _increment_counter(cls, model, field, compiled, now, n: int = 1) -> int:
+        """
+        เพิ่มค่าแถวตัวนับทีละ n แบบ atomic แล้วคืนค่าล่าสุดหลังเพิ่ม
+        ถ้ายังไม่มีแถว จะ seed จากข้อมูลเดิมในตารางก่อน
+        """
+        key = cls.counter_key(model, field, compiled.period_key(now))
+        using = router.db_for_write(RunningNumberCounter)
+        with transaction.atomic(using=using):
+            value = cls._bump_counter(key, n, using)
+            if value is not None:
+                return value
+            start = cls._latest_seq(model, field, compiled, now, using=using)
+            try:
+                with transaction.atomic(using=using):
+                    RunningNumberCounter.objects.using(using).create(**key, last_value=start + n)
+                return start + n
+            except IntegrityError:
+                # มี request อื่นสร้างแถวตัดหน้า ➜ เพิ่มค่าจากแถวนั้นแทน
+                return cls._bump_counter(key, n, using)
+
+    @classmethod
+    def _bump_counter(cls, key: dict, n: int, using: str) -> int | None:
+        connection = connections[using]
+        if cls._supports_update_returning(connection):
+            table = connection.ops.quote_name(RunningNumberCounter._meta.db_table)
+            qn = connection.ops.quote_name
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"UPDATE {table} SET {qn('last_value')} = {qn('last_value')} + %s "
+                    f"WHERE {qn('model_label')} = %s AND {qn('field')} = %s AND {qn('prefix')} = %s "
+                    f"RETURNING {qn('last_value')}",
+                    [n, key["model_label"], key["field"], key["prefix"]],
+                )
+                row = cursor.fetchone()
+            return row[0] if row else None
+
+        qs = RunningNumberCounter.objects.using(using).filter(**key)
+        if not qs.update(last_value=F("last_value") + n):
+            return None
+        return qs.values_list("last_value", flat=True).get()
+
+    @staticmethod
+    def _supports_update_returning(connection) -> bool:
+        if connection.vendor == "postgresql":
+            return True
+        if connection.vendor == "sqlite":
+            return connection.Database.sqlite_version_info >= (3, 35)
+        return False
+
+    # ---------- sequence mode (PostgreSQL) ----------
+    _known_sequences = set()
+
+    @staticmethod
+    def _supports_sequences(model) -> bool:
+        return connections[router.db_for_write(model)].vendor == "postgresql"
+
+    @classmethod
+    def sequence_base_name(cls, model, field, connection) -> str:
+        column = model._meta.get_field(field).column
+        return truncate_name(f"{model._meta.db_table}_{column}", 40)
+
+    @classmethod
+    def sequence_name(cls, model, field, period_key: str, connection) -> str:
+        """ชื่อ sequence ต่อ (table, column, งวด) — ใช้ digest ของ period key ให้สั้นและคงที่"""
+        digest = hashlib.md5(
+            f"{model._meta.db_table}.{field}.{period_key}".encode(), usedforsecurity=False
+        ).hexdigest()[:8]
+        return f"{cls.sequence_base_name(model, field, connection)}_rn_{digest}"
+
+    @classmethod
+    def ensure_sequence(cls, model, field, compiled, now, *, sync: bool = False) -> str:
+        """
+        สร้าง sequence ของงวดปัจจุบันถ้ายังไม่มี (เริ่มต่อจากเลขล่าสุดในตาราง)
+        sync=True จะเลื่อน sequence ให้ไม่ต่ำกว่าข้อมูลที่มีอยู่ (ใช้ตอน migrate)
+        """
+        using = router.db_for_write(model)
+        connection = connections[using]
+        qn = connection.ops.quote_name
+        name = cls.sequence_name(model, field, compiled.period_key(now), connection)
+        if name in cls._known_sequences and not sync:
+            return name
+
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT to_regclass(%s)", [qn(name)])
+            exists = cursor.fetchone()[0] is not None
+            if not exists or sync:
+                latest = cls._latest_seq(model, field, compiled, now, using=using)
+            if not exists:
+                try:
+                    with transaction.atomic(using=using):
+                        cursor.execute(f"CREATE SEQUENCE IF NOT EXISTS {qn(name)} START WITH {latest + 1}")
+                except DatabaseError:
+                    # มีอีก transaction สร้างชื่อเดียวกันพร้อมกัน ➜ ใช้ของเขา
+                    pass
+            elif sync and latest:
+                cursor.execute(
+                    f"SELECT setval(%s, GREATEST(%s, (SELECT last_value FROM {qn(name)})))",
+                    [qn(name), latest],
+                )
+
+        # จำไว้หลัง commit เท่านั้น (ถ้า rollback sequence ที่สร้างจะหายไปด้วย)
+        transaction.on_commit(lambda: cls._known_sequences.add(name), using=using)
+        return name
+
+    @classmethod
+    def drop_sequences(cls, model, field) -> int:
+        """ลบ sequence ทุกงวดของ (model, field)"""
+        using = router.db_for_write(model)
+        connection = connections[using]
+        base = cls.sequence_base_name(model, field, connection)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT c.relname FROM pg_class c "
+                "WHERE c.relkind = 'S' AND c.relnamespace = current_schema()::regnamespace "
+                "AND c.relname LIKE %s",
+                [base.replace("_", r"\_") + r"\_rn\_%"],
+            )
+            names = [row[0] for row in cursor.fetchall()]
+            for name in names:
+                cursor.execute(f"DROP SEQUENCE IF EXISTS {connection.ops.quote_name(name)}")
+        cls._known_sequences.difference_update(names)
+        return len(names)
+
+    @classmethod
+    def _next_from_sequence(cls, model, field, compiled, now, n: int) -> list[int]:
+        """ดึงเลขจาก nextval() โดยไม่ล็อกแถวใด ๆ (อาจมีช่องว่างได้ถ้า rollback)"""
+        name = cls.ensure_sequence(model, field, compiled, now)
+        connection = connections[router.db_for_write(model)]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT nextval(%s) FROM generate_series(1, %s)",
+                [connection.ops.quote_name(name), n],
+            )
+            return sorted(row[0] for row in cursor.fetchall())
@@ -0,0 +1,135 @@
+import re
+from functools import lru_cache
+
+
+class RunningNumberPattern:
+    """
+    pattern ของ RunningNumberField ที่ compile แล้ว (formatter + parser)
+
+    token ที่รองรับ:
+      {YYYY} ปี ค.ศ. 4 หลัก     {YY} ปี ค.ศ. 2 หลัก
+      {THYYYY} ปี พ.ศ. 4 หลัก   {THYY} ปี พ.ศ. 2 หลัก
+      {MM} เดือน               {DD} วัน
+      {SEQ:n} เลขลำดับ (เติม 0 ให้ครบ n หลัก, เกินได้)
+    ข้อความอื่นเป็น literal, ใช้ {{ และ }} แทนวงเล็บปีกกา
+    """
+
+    TOKENS = {
+        "YYYY":   (4, lambda n: f"{n.year:04}"),
+        "YY":     (2, lambda n: f"{n.year:04}"[-2:]),
+        "THYYYY": (4, lambda n: f"{n.year + 543:04}"),
+        "THYY":   (2, lambda n: f"{n.year + 543}"[-2:]),
+        "MM":     (2, lambda n: f"{n:%m}"),
+        "DD":     (2, lambda n: f"{n:%d}"),
+    }
+    _TOKEN_RE = re.compile(r"\{\{|\}\}|\{(\w+)(?::(\d+))?\}")
+
+    def __init__(self, pattern: str):
+        self.pattern = pattern
+        self.head = []      # segment ก่อน {SEQ}: ("lit", text) / ("var", name)
+        self.tail = []      # segment หลัง {SEQ}
+        self.seq_pad = None
+
+        pos = 0
+        for m in self._TOKEN_RE.finditer(pattern):
+            self._add_literal(pattern[pos:m.start()])
+            pos = m.end()
+            if m.group(0) in ("{{", "}}"):
+                self._add_literal(m.group(0)[0])
+            elif m.group(1) == "SEQ":
+                if self.seq_pad is not None:
+                    raise ValueError(f"pattern {pattern!r} มี {{SEQ}} ได้เพียงตัวเดียว")
+                self.seq_pad = int(m.group(2) or 1)
+            elif m.group(1) in self.TOKENS and m.group(2) is None:
+                self._segments.append(("var", m.group(1)))
+            else:
+                raise ValueError(f"pattern {pattern!r} มี token ที่ไม่รู้จัก {m.group(0)!r}")
+        self._add_literal(pattern[pos:])
+        if self.seq_pad is None:
+            raise ValueError(f"pattern {pattern!r} ต้องมี {{SEQ:n}}")
+
+        self.regex = re.compile(
+            "^(?P<head>" + self._segments_regex(self.head) + ")"
+            + r"(?P<seq>\d{%d,})" % self.seq_pad
+            + "(?P<tail>" + self._segments_regex(self.tail) + ")$"
+        )
+
+    @classmethod
+    @lru_cache(maxsize=None)
+    def compile(cls, pattern: str) -> "RunningNumberPattern":
+        return cls(pattern)
+
+    # ---------- build ----------
+    @property
+    def _segments(self):
+        return self.head if self.seq_pad is None else self.tail
+
+    def _add_literal(self, text):
+        if not text:
+            return
+        segments = self._segments
+        if segments and segments[-1][0] == "lit":
+            segments[-1] = ("lit", segments[-1][1] + text)
+        else:
+            segments.append(("lit", text))
+
+    def _segments_regex(self, segments):
+        return "".join(
+            re.escape(value) if kind == "lit" else r"\d{%d}" % self.TOKENS[value][0]
+            for kind, value in segments
+        )
+
+    def _render(self, segments, now):
+        return "".join(
+            value if kind == "lit" else self.TOKENS[value][1](now)
+            for kind, value in segments
+        )
+
+    # ---------- format ----------
+    def prefix(self, now) -> str:
+        """ส่วนหน้าเลขลำดับของงวดนั้น ๆ เช่น 'INV2568'"""
+        return self._render(self.head, now)
+
+    def suffix(self, now) -> str:
+        return self._render(self.tail, now)
+
+    def period_key(self, now) -> str:
+        """key ของงวด (ใช้กับตารางตัวนับ) — เท่ากับ prefix ถ้าไม่มีส่วนท้าย"""
+        suffix = self.suffix(now)
+        return f"{self.prefix(now)}*{suffix}" if suffix else self.prefix(now)
+
+    @property
+    def length(self) -> int:
+        """ความยาวของเลขที่ออก เมื่อเลขลำดับไม่เกิน {SEQ:n} หลัก"""
+        return self.seq_pad + sum(
+            len(value) if kind == "lit" else self.TOKENS[value][0]
+            for kind, value in self.head + self.tail
+        )
+
+    def format(self, now, seq: int) -> str:
+        return f"{self.prefix(now)}{seq:0{self.seq_pad}d}{self.suffix(now)}"
+
+    # ---------- parse ----------
+    def parse(self, value: str):
+        """แยกเลขที่ออกแล้วกลับเป็น (prefix, seq, suffix) หรือ None ถ้าไม่ตรง pattern"""
+        m = self.regex.match(value or "")
+        if not m:
+            return None
+        return m.group("head"), int(m.group("seq")), m.group("tail")
+
+    def parse_period_key(self, value: str):
+        parsed = self.parse(value)
+        if parsed is None:
+            return None
+        head, seq, tail = parsed
+        return (f"{head}*{tail}" if tail else head), seq
+
+    @staticmethod
+    def upper_bound(prefix: str) -> str | None:
+        """สตริงที่น้อยที่สุดที่มากกว่าทุกค่าที่ขึ้นต้นด้วย prefix (สำหรับ range query)"""
+        while prefix:
+            last = ord(prefix[-1])
+            if last < 0x10FFFF:
+                return prefix[:-1] + chr(last + 1)
+            prefix = prefix[:-1]
+        return None
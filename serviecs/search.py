@@ -0,0 +1,396 @@
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections, router
+from django.db.models import Q, signals
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+BACKEND_ALIASES = {
+    "icontains": "core.serviecs.search.IContainsSearchBackend",
+    "postgres": "core.serviecs.search.PostgresFullTextSearchBackend",
+    "trigram": "core.serviecs.search.PostgresTrigramSearchBackend",
+    "sqlite_fts": "core.serviecs.search.SQLiteFTSSearchBackend",
+    "auto": "core.serviecs.search.AutoSearchBackend",
+}
+
+_backends = {}
+_lock = threading.Lock()
+
+
+def get_search_backend(name=None):
+    """
+    backend ตามชื่อ alias หรือ dotted path (ค่าเริ่มต้นจาก CORE_SEARCH_BACKEND = "icontains")
+    instance ถูก cache ไว้ต่อ path
+    """
+    name = name or getattr(settings, "CORE_SEARCH_BACKEND", "icontains")
+    path = BACKEND_ALIASES.get(name, name)
+    backend = _backends.get(path)
+    if backend is None:
+        with _lock:
+            backend = _backends.setdefault(path, import_string(path)())
+    return backend
+
+
+def register(model, fields, backend=None):
+    """ลงทะเบียน (model, search_fields) กับ backend — ใช้ทั้งตอนค้นหาและตอนสร้าง index"""
+    (backend or get_search_backend()).register(model, fields)
+
+
+def registered_models():
+    """คืน [(backend, model, fields)] ที่ลงทะเบียนไว้"""
+    return [
+        (backend, model, backend.fields_for(model))
+        for backend in list(_backends.values())
+        for model in list(backend.models)
+    ]
+
+
+def connect_signals():
+    """ต่อ signal sync ตาราง FTS5 — เรียกจาก CoreConfig.ready() ไม่ต้องรอให้ view ลงทะเบียนก่อน"""
+    signals.post_save.connect(SQLiteFTSSearchBackend.sync_save, dispatch_uid="core_search_fts_save", weak=False)
+    signals.post_delete.connect(SQLiteFTSSearchBackend.sync_delete, dispatch_uid="core_search_fts_delete", weak=False)
+
+
+def _digest(value, length=6):
+    return hashlib.md5(value.encode(), usedforsecurity=False).hexdigest()[:length]
+
+
+def local_text_fields(model, fields):
+    """แยกเฉพาะฟิลด์คอลัมน์ในตารางเดียวกัน (ไม่มี __) ที่ index ได้"""
+    local = []
+    for name in fields:
+        if "__" in name:
+            continue
+        try:
+            field = model._meta.get_field(name)
+        except Exception:
+            continue
+        if field.concrete and not field.is_relation:
+            local.append(field)
+    return local
+
+
+class IContainsSearchBackend:
+    """พฤติกรรมเดิม: OR ของ icontains ทุกฟิลด์ (full scan)"""
+
+    def __init__(self):
+        self.models = {}        # model ➜ set(search_fields) รวมทุก view
+        self.field_sets = {}    # model ➜ {tuple(search_fields) ของแต่ละ view (เรียงแล้ว)}
+
+    def register(self, model, fields):
+        fields = set(fields)
+        with _lock:
+            self.field_sets.setdefault(model, set()).add(tuple(sorted(fields)))
+            known = self.models.setdefault(model, set())
+            if fields <= known:
+                return
+            known |= fields
+        self.registered(model, self.fields_for(model))
+
+    def fields_for(self, model):
+        """search_fields รวมของโมเดล (เรียงแล้ว) — ใช้ชุดเดียวกันทั้งตอนค้นหาและตอนสร้าง index"""
+        return tuple(sorted(self.models.get(model, ())))
+
+    def filter(self, queryset, fields, q):
+        queries = Q()
+        for f in fields:
+            queries |= Q(**{f"{f}__icontains": q})
+        return queryset.filter(queries)
+
+    def registered(self, model, fields):
+        pass
+
+    def build_index(self, model, fields, *, rebuild=False):
+        return []
+
+
+class PostgresFullTextSearchBackend(IContainsSearchBackend):
+    """
+    PostgreSQL full-text: SearchVector ของฟิลด์ในตาราง + GIN expression index
+    ฟิลด์ข้ามตาราง (a__b) ยังใช้ icontains ร่วมด้วย
+    ค้นเฉพาะ search_fields ของ view นั้น ➜ index แยกต่อชุดฟิลด์ที่ลงทะเบียน (expression ต้องตรงกัน)
+    """
+    config = "simple"
+
+    def _vector(self, fields):
+        from django.contrib.postgres.search import SearchVector
+
+        return SearchVector(*[f.name for f in fields], config=self.config)
+
+    def filter(self, queryset, fields, q):
+        from django.contrib.postgres.search import SearchQuery
+
+        if connections[queryset.db].vendor != "postgresql":
+            return super().filter(queryset, fields, q)
+        # เรียงชื่อฟิลด์ ➜ expression ตรงกับ index ของชุดฟิลด์นี้ที่ build_index สร้าง
+        local = local_text_fields(queryset.model, sorted(fields))
+        if not local:
+            return super().filter(queryset, fields, q)
+        others = [f for f in fields if f not in {x.name for x in local}]
+        query = Q(_core_search=SearchQuery(q, config=self.config, search_type="websearch"))
+        for f in others:
+            query |= Q(**{f"{f}__icontains": q})
+        return queryset.annotate(_core_search=self._vector(local)).filter(query)
+
+    def index_name(self, model, suffix):
+        return f"core_{suffix}_{_digest(model._meta.db_table, 8)}"[:30]
+
+    def index_field_sets(self, model, fields):
+        """ชุดฟิลด์ในตาราง (เรียงแล้ว) ที่ต้องมี index: ทุกชุดที่ view ลงทะเบียนไว้ภายใน fields + fields เอง"""
+        allowed = set(fields)
+        sets = set()
+        for names in self.field_sets.get(model, set()) | {tuple(sorted(fields))}:
+            if set(names) <= allowed:
+                local = tuple(local_text_fields(model, sorted(names)))
+                if local:
+                    sets.add(local)
+        return sorted(sets, key=lambda local: [f.name for f in local])
+
+    def build_index(self, model, fields, *, rebuild=False):
+        from django.contrib.postgres.indexes import GinIndex
+
+        connection = connections[router.db_for_write(model)]
+        if connection.vendor != "postgresql":
+            return []
+        names = []
+        for local in self.index_field_sets(model, fields):
+            suffix = "fts" + _digest(",".join(f.column for f in local))
+            index = GinIndex(self._vector(local), name=self.index_name(model, suffix))
+            self._replace_index(connection, model, index, rebuild=rebuild)
+            names.append(index.name)
+        return names
+
+    def _replace_index(self, connection, model, index, *, rebuild=False):
+        with connection.schema_editor() as editor:
+            if rebuild:
+                editor.execute(f"DROP INDEX IF EXISTS {editor.quote_name(index.name)}")
+            sql = str(index.create_sql(model, editor))
+            editor.execute(sql.replace("CREATE INDEX", "CREATE INDEX IF NOT EXISTS", 1))
+
+
+class PostgresTrigramSearchBackend(PostgresFullTextSearchBackend):
+    """
+    PostgreSQL pg_trgm: คำค้นยังเป็น icontains เดิม (UPPER(col::text) LIKE ...)
+    แต่มี GIN trigram index บน expression เดียวกัน ทำให้ไม่ต้อง full scan
+    """
+
+    def filter(self, queryset, fields, q):
+        return IContainsSearchBackend.filter(self, queryset, fields, q)
+
+    def column_index_name(self, model, field):
+        # digest ของชื่อคอลัมน์ ➜ คอลัมน์ที่ขึ้นต้นเหมือนกันไม่ได้ชื่อ index ซ้ำกัน
+        return self.index_name(model, "tg" + _digest(field.column))
+
+    def build_index(self, model, fields, *, rebuild=False):
+        from django.contrib.postgres.indexes import GinIndex, OpClass
+        from django.db.models import TextField
+        from django.db.models.functions import Cast, Upper
+
+        connection = connections[router.db_for_write(model)]
+        if connection.vendor != "postgresql":
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        names = []
+        for field in local_text_fields(model, fields):
+            index = GinIndex(
+                OpClass(Upper(Cast(field.name, TextField())), name="gin_trgm_ops"),
+                name=self.column_index_name(model, field),
+            )
+            self._replace_index(connection, model, index, rebuild=rebuild)
+            names.append(index.name)
+        return names
+
+
+class SQLiteFTSSearchBackend(IContainsSearchBackend):
+    """
+    SQLite FTS5: ตารางเงา <db_table>_fts (rowid = pk) sync ด้วย post_save / post_delete
+    (connect_signals() ใน CoreConfig.ready() — sync ทุกโมเดลที่มีตาราง _fts อยู่จริง)
+    ใช้ tokenizer trigram (SQLite 3.34+) ให้ได้ผลแบบ substring เหมือน icontains
+    ถ้ายังไม่ได้สร้างตาราง (build_search_index) หรือคำค้นสั้นกว่า 3 ตัว จะกลับไปใช้ icontains
+    MATCH เฉพาะคอลัมน์ใน search_fields ของ view นั้น (column filter ของ FTS5)
+    bulk_create / bulk_update / queryset.update ไม่ยิง signal ➜ เรียก sync() เอง
+    รายชื่อตาราง _fts cache ไว้ต่อ process หาไม่เจอ ➜ อ่านใหม่ได้ทุก recheck_interval วินาที
+    """
+    min_query_length = 3
+    recheck_interval = 60
+    _tables = {}    # alias ➜ {ตาราง _fts: (column, ...)}
+    _checked = {}   # alias ➜ time.monotonic() ที่อ่านรายชื่อตารางล่าสุด
+
+    @staticmethod
+    def table_name(model):
+        return f"{model._meta.db_table}_fts"
+
+    def _trigram(self, connection):
+        return connection.Database.sqlite_version_info >= (3, 34)
+
+    @classmethod
+    def _fts_tables(cls, connection, refresh=False):
+        tables = cls._tables.get(connection.alias)
+        if tables is None or refresh:
+            tables = {}
+            qn = connection.ops.quote_name
+            with connection.cursor() as cursor:
+                for name in connection.introspection.table_names(cursor):
+                    if name.endswith("_fts"):
+                        cursor.execute(f"PRAGMA table_info({qn(name)})")
+                        tables[name] = tuple(row[1] for row in cursor.fetchall())
+            cls._tables[connection.alias] = tables
+            cls._checked[connection.alias] = time.monotonic()
+        return tables
+
+    @classmethod
+    def _usable(cls, model, connection):
+        if connection.vendor != "sqlite" or not model._meta.pk.get_internal_type().endswith("AutoField"):
+            return False
+        table = cls.table_name(model)
+        if table in cls._fts_tables(connection):
+            return True
+        # process อื่นอาจสร้างตารางไปแล้ว (build_search_index) ➜ อ่านใหม่ แต่ไม่บ่อยกว่า recheck_interval
+        if time.monotonic() - cls._checked.get(connection.alias, 0) < cls.recheck_interval:
+            return False
+        return table in cls._fts_tables(connection, refresh=True)
+
+    def _match_expression(self, q, connection, columns):
+        phrase = '"' + q.replace('"', '""') + '"'
+        if not self._trigram(connection):
+            phrase += " *"
+        return "{" + " ".join(f'"{c}"' for c in columns) + "} : " + phrase
+
+    def filter(self, queryset, fields, q):
+        connection = connections[queryset.db]
+        model = queryset.model
+        local = local_text_fields(model, fields)
+        if not local or len(q) < self.min_query_length or not self._usable(model, connection):
+            return super().filter(queryset, fields, q)
+        columns = [f.column for f in local]
+        if not set(columns) <= set(self._fts_tables(connection)[self.table_name(model)]):
+            # ตารางสร้างก่อนที่ view นี้จะเพิ่มฟิลด์ ➜ ต้อง build_search_index --rebuild
+            return super().filter(queryset, fields, q)
+
+        table = connection.ops.quote_name(self.table_name(model))
+        query = Q(pk__in=RawSQL(
+            f"SELECT rowid FROM {table} WHERE {table} MATCH %s",
+            [self._match_expression(q, connection, columns)],
+        ))
+        for f in fields:
+            if f not in {x.name for x in local}:
+                query |= Q(**{f"{f}__icontains": q})
+        return queryset.filter(query)
+
+    # ---------- sync ----------
+    @classmethod
+    def sync_save(cls, sender, instance, using, **kwargs):
+        connection = connections[using]
+        if not cls._usable(sender, connection):
+            return
+        columns = cls._fts_tables(connection)[cls.table_name(sender)]
+        fields = [f for f in sender._meta.local_concrete_fields if f.column in columns]
+        if fields:
+            cls._write_rows(connection, sender, fields, [instance], delete_first=True)
+
+    @classmethod
+    def sync_delete(cls, sender, instance, using, **kwargs):
+        connection = connections[using]
+        if not cls._usable(sender, connection):
+            return
+        table = connection.ops.quote_name(cls.table_name(sender))
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {table} WHERE rowid = %s", [instance.pk])
+
+    @classmethod
+    def sync(cls, model, objs=(), *, queryset=None, fields=None, using=None):
+        """
+        sync แถวที่ไม่ผ่าน post_save: objs = instance หลัง bulk_create / bulk_update (ใช้ค่าในหน่วยความจำ)
+        queryset = แถวหลัง queryset.update() (อ่านค่าใหม่จากฐานข้อมูล)
+        fields = ชื่อฟิลด์ที่เปลี่ยน ไม่มีคอลัมน์ไหนอยู่ในตาราง _fts ➜ ไม่ต้องทำอะไร
+        ไม่มีตาราง _fts / ไม่ใช่ SQLite ➜ ไม่ query เพิ่ม
+        """
+        if using is None:
+            using = queryset.db if queryset is not None else router.db_for_write(model)
+        connection = connections[using]
+        if not cls._usable(model, connection):
+            return
+        columns = cls._fts_tables(connection)[cls.table_name(model)]
+        indexed = [f for f in model._meta.local_concrete_fields if f.column in columns]
+        if not indexed or (fields is not None and not {f.name for f in indexed} & set(fields)):
+            return
+        objs = [obj for obj in objs if obj.pk is not None]
+        if queryset is not None:
+            objs += list(queryset.model._base_manager.using(using)
+                         .filter(pk__in=queryset.values("pk")).only("pk", *[f.name for f in indexed]))
+        if objs:
+            cls._write_rows(connection, model, indexed, objs, delete_first=True)
+
+    @classmethod
+    def _write_rows(cls, connection, model, fields, objs, *, delete_first=False):
+        qn = connection.ops.quote_name
+        table = qn(cls.table_name(model))
+        columns = ", ".join(qn(f.column) for f in fields)
+        placeholders = ", ".join(["%s"] * (len(fields) + 1))
+        rows = [
+            [obj.pk] + [str(v) if (v := getattr(obj, f.attname)) is not None else "" for f in fields]
+            for obj in objs
+        ]
+        with connection.cursor() as cursor:
+            if delete_first:
+                cursor.executemany(f"DELETE FROM {table} WHERE rowid = %s", [[r[0]] for r in rows])
+            cursor.executemany(f"INSERT INTO {table} (rowid, {columns}) VALUES ({placeholders})", rows)
+
+    # ---------- build ----------
+    def build_index(self, model, fields, *, rebuild=False):
+        connection = connections[router.db_for_write(model)]
+        local = local_text_fields(model, fields)
+        if connection.vendor != "sqlite" or not local:
+            return []
+        qn = connection.ops.quote_name
+        table = self.table_name(model)
+        tokenize = "trigram" if self._trigram(connection) else "unicode61"
+        with connection.cursor() as cursor:
+            if rebuild:
+                cursor.execute(f"DROP TABLE IF EXISTS {qn(table)}")
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {qn(table)} USING fts5("
+                + ", ".join(qn(f.column) for f in local)
+                + f", tokenize='{tokenize}')"
+            )
+            cursor.execute(f"DELETE FROM {qn(table)}")
+        self._fts_tables(connection)[table] = tuple(f.column for f in local)
+
+        qs = model._base_manager.using(connection.alias).only("pk", *[f.name for f in local])
+        batch = []
+        for obj in qs.iterator(chunk_size=2000):
+            batch.append(obj)
+            if len(batch) >= 2000:
+                self._write_rows(connection, model, local, batch)
+                batch = []
+        if batch:
+            self._write_rows(connection, model, local, batch)
+        return [table]
+
+
+class AutoSearchBackend(IContainsSearchBackend):
+    """เลือกตาม database vendor: PostgreSQL ➜ trigram, SQLite ➜ FTS5, อื่น ๆ ➜ icontains"""
+
+    def __init__(self):
+        super().__init__()
+        self.backends = {
+            "postgresql": PostgresTrigramSearchBackend(),
+            "sqlite": SQLiteFTSSearchBackend(),
+        }
+
+    def _for(self, alias):
+        return self.backends.get(connections[alias].vendor, IContainsSearchBackend())
+
+    def filter(self, queryset, fields, q):
+        return self._for(queryset.db).filter(queryset, fields, q)
+
+    def registered(self, model, fields):
+        for backend in self.backends.values():
+            backend.register(model, fields)
+
+    def build_index(self, model, fields, *, rebuild=False):
+        return self._for(router.db_for_write(model)).build_index(model, fields, rebuild=rebuild)
@@ -0,0 +1,137 @@
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+TASK_STATUS_TIMEOUT = 60 * 60 * 24
+
+
+def _status_key(task_id):
+    return f"core:task:{task_id}"
+
+
+def set_task_status(task_id, state, **extra):
+    cache.set(
+        _status_key(task_id),
+        {"id": task_id, "state": state, "updated": timezone.now().isoformat(), **extra},
+        TASK_STATUS_TIMEOUT,
+    )
+
+
+def task_status(task_id) -> dict | None:
+    """สถานะงาน: scheduled / pending / running / retrying / done / failed (None = ไม่พบหรือหมดอายุ)"""
+    return cache.get(_status_key(task_id))
+
+
+class BaseTaskBackend:
+    """
+    backend คิวงานแบบ local — subclass ต้อง implement enqueue()
+    งานที่ key เดียวกันต้องทำตามลำดับที่ส่งเข้ามา
+    """
+
+    def submit(self, func, *args, key=None, task_id=None, **kwargs) -> str:
+        task_id = task_id or uuid.uuid4().hex
+        set_task_status(task_id, "pending", key=key)
+        self.enqueue(task_id, key, func, args, kwargs)
+        return task_id
+
+    def enqueue(self, task_id, key, func, args, kwargs):
+        raise NotImplementedError
+
+    def run(self, task_id, key, func, args, kwargs, *, retries=0, backoff=0.0):
+        """รันงานพร้อม retry (backoff ทวีคูณ) และบันทึกสถานะ"""
+        for attempt in range(retries + 1):
+            set_task_status(task_id, "running", key=key, attempts=attempt + 1)
+            try:
+                func(*args, **kwargs)
+            except Exception as exc:
+                if attempt >= retries:
+                    logger.exception("task %s (%s) failed", task_id, key)
+                    set_task_status(task_id, "failed", key=key, attempts=attempt + 1, error=str(exc))
+                    return False
+                set_task_status(task_id, "retrying", key=key, attempts=attempt + 1, error=str(exc))
+                time.sleep(backoff * (2 ** attempt))
+            else:
+                set_task_status(task_id, "done", key=key, attempts=attempt + 1)
+                return True
+
+
+class ImmediateBackend(BaseTaskBackend):
+    """รันทันทีใน thread ปัจจุบัน (ใช้ตอนทดสอบ / debug)"""
+
+    def __init__(self, retries=0, backoff=0.0):
+        self.retries = retries
+        self.backoff = backoff
+
+    def enqueue(self, task_id, key, func, args, kwargs):
+        self.run(task_id, key, func, args, kwargs, retries=self.retries, backoff=self.backoff)
+
+
+class ThreadPoolBackend(BaseTaskBackend):
+    """
+    worker pool ภายใน process
+    งานที่ key เดียวกันเข้าคิว (lane) เดียวกันและทำทีละงานตามลำดับ ต่าง key ทำขนานกันได้
+    """
+
+    def __init__(self, max_workers=4, retries=3, backoff=0.5):
+        self.retries = retries
+        self.backoff = backoff
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="core-task")
+        self._lanes = {}
+        self._lock = threading.Lock()
+
+    def enqueue(self, task_id, key, func, args, kwargs):
+        lane_key = key or task_id
+        item = (task_id, key, func, args, kwargs)
+        with self._lock:
+            lane = self._lanes.get(lane_key)
+            if lane is not None:
+                lane.append(item)
+                return
+            self._lanes[lane_key] = deque([item])
+        self._executor.submit(self._drain, lane_key)
+
+    def _drain(self, lane_key):
+        while True:
+            with self._lock:
+                lane = self._lanes[lane_key]
+                if not lane:
+                    del self._lanes[lane_key]
+                    return
+                task_id, key, func, args, kwargs = lane[0]
+            try:
+                self.run(task_id, key, func, args, kwargs, retries=self.retries, backoff=self.backoff)
+            finally:
+                close_old_connections()
+                with self._lock:
+                    lane.popleft()
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_task_backend() -> BaseTaskBackend:
+    """
+    backend จาก settings:
+        CORE_TASK_BACKEND = "core.serviecs.taskQueue.ThreadPoolBackend"
+        CORE_TASK_BACKEND_OPTIONS = {"max_workers": 4, "retries": 3, "backoff": 0.5}
+    """
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                path = getattr(settings, "CORE_TASK_BACKEND", "core.serviecs.taskQueue.ThreadPoolBackend")
+                options = getattr(settings, "CORE_TASK_BACKEND_OPTIONS", {})
+                _backend = import_string(path)(**options)
+    return _backend
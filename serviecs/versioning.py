@@ -0,0 +1,64 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+MODEL_VERSION_TIMEOUT = None
+
+_tracked = set()
+
+
+def _version_key(model):
+    return f"core:ver:{model._meta.label_lower}"
+
+
+def model_version(model) -> int:
+    """
+    เลข version ของตาราง เพิ่มขึ้นทุกครั้งที่มีการ save / delete (ดู core.signals)
+    ใช้เป็นส่วนหนึ่งของ cache key ➜ ข้อมูลเปลี่ยนแล้ว key เดิมหมดอายุเองทันที
+    """
+    track_models(model)
+    key = _version_key(model)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, 1, MODEL_VERSION_TIMEOUT)
+        version = cache.get(key, 1)
+    return version
+
+
+def bump_model_version(*models):
+    """
+    เรียกหลังเขียนข้อมูลที่ไม่ผ่าน signal (queryset.update / bulk_create / raw SQL)
+    เพิ่มทันที และเพิ่มอีกครั้งหลัง commit — กันกรณี request อื่นอ่านข้อมูลเก่า
+    (ก่อน commit) แล้วเก็บลง cache ภายใต้ version ใหม่
+    """
+    _bump(models)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: _bump(models))
+
+
+def track_models(*models):
+    """
+    ต่อ post_save / post_delete ให้เพิ่ม version เฉพาะโมเดลที่มีผู้ใช้ version จริง
+    (view ที่ cache / cached count / API / อ่าน model_version) โมเดลอื่น save แล้วไม่เขียน cache
+    process ที่เขียนข้อมูลแต่ไม่ได้โหลด view (worker, cron) ➜ ระบุใน settings.CORE_VERSIONED_MODELS
+    """
+    for model in models:
+        if model in _tracked or model._meta.abstract:
+            continue
+        _tracked.add(model)
+        uid = f"core_model_version_{model._meta.label_lower}"
+        post_save.connect(_on_change, sender=model, dispatch_uid=uid)
+        post_delete.connect(_on_change, sender=model, dispatch_uid=uid)
+
+
+def _on_change(sender, **kwargs):
+    bump_model_version(sender)
+
+
+def _bump(models):
+    for model in models:
+        key = _version_key(model)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 2, MODEL_VERSION_TIMEOUT)
@@ -0,0 +1,86 @@
+from importlib import import_module
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from core.mixins.permissions import invalidate_permission_cache
+from core.serviecs.rollup import RollupService
+from core.serviecs.versioning import track_models
+
+
+# ---------- permission cache ----------
+@receiver(m2m_changed, sender=Group.permissions.through, dispatch_uid="core_perm_group_perms")
+def _permissions_m2m_changed(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        invalidate_permission_cache()
+
+
+def connect_user_permission_signals():
+    """
+    through ของ user_permissions / groups ของ AUTH_USER_MODEL ที่ใช้จริง (เรียกจาก CoreConfig.ready())
+    user model ที่ไม่มีฟิลด์เหล่านี้ (ไม่ได้ใช้ PermissionsMixin) ข้ามไป
+    """
+    user_model = get_user_model()
+    for name in ("user_permissions", "groups"):
+        try:
+            field = user_model._meta.get_field(name)
+        except FieldDoesNotExist:
+            continue
+        m2m_changed.connect(
+            _permissions_m2m_changed, sender=field.remote_field.through,
+            dispatch_uid=f"core_perm_user_{name}",
+        )
+
+
+@receiver(post_delete, sender=Group, dispatch_uid="core_perm_group_delete")
+@receiver(post_delete, sender=Permission, dispatch_uid="core_perm_permission_delete")
+@receiver(post_save, sender=Permission, dispatch_uid="core_perm_permission_save")
+def _permissions_changed(sender, **kwargs):
+    invalidate_permission_cache()
+
+
+# ---------- model version (cache key ของ count / fragment / ETag) ----------
+def connect_model_version_signals():
+    """
+    โมเดลที่ประกาศไว้ใน settings.CORE_VERSIONED_MODELS (เรียกจาก CoreConfig.ready())
+    โมเดลของ view ที่ cache / API / ตัวเลือกใน DynamicFormSetView ถูกต่อเองตอนประกาศคลาส
+    (ดู core.serviecs.versioning.track_models) ➜ import ROOT_URLCONF ที่นี่ ให้ทุก process
+    (รวม worker / cron / shell ที่ไม่ได้รับ request) ประกาศ view ครบและเพิ่ม version เหมือนกัน
+    ปิดได้ด้วย CORE_VERSIONED_URLCONF = False (ต้องระบุ CORE_VERSIONED_MODELS ให้ครบเอง)
+    """
+    track_models(*(apps.get_model(label) for label in getattr(settings, "CORE_VERSIONED_MODELS", ())))
+    urlconf = getattr(settings, "ROOT_URLCONF", None)
+    if urlconf and getattr(settings, "CORE_VERSIONED_URLCONF", True):
+        import_module(urlconf)
+
+
+# ---------- daily rollup (settings.CORE_ROLLUPS) ----------
+def _rollup_pre_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        RollupService.prepare(instance)
+
+
+def _rollup_pre_delete(sender, instance, **kwargs):
+    RollupService.prepare(instance)
+
+
+def _rollup_post_save(sender, instance, created, raw=False, using=None, **kwargs):
+    if not raw:
+        RollupService.record_save(instance, created, using=using)
+
+
+def _rollup_post_delete(sender, instance, using=None, **kwargs):
+    RollupService.record_delete(instance, using=using)
+
+
+for _model in RollupService.config():
+    _uid = f"core_rollup_{_model._meta.label_lower}"
+    pre_save.connect(_rollup_pre_save, sender=_model, dispatch_uid=_uid)
+    post_save.connect(_rollup_post_save, sender=_model, dispatch_uid=_uid)
+    pre_delete.connect(_rollup_pre_delete, sender=_model, dispatch_uid=_uid)
+    post_delete.connect(_rollup_post_delete, sender=_model, dispatch_uid=_uid)
@@ -4,8 +4,13 @@ register = template.Library()
 
 @register.filter(name="get_value")
 def get_value(obj, attr):
+    """รองรับ path แบบ "customer__name" (ต่อ relation ทีละขั้น)"""
     try:
-        return getattr(obj, attr, "")
+        for part in attr.split("__"):
+            if obj is None:
+                return ""
+            obj = getattr(obj, part, "")
+        return obj
     except Exception:
         return ""
     
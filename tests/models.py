@@ -0,0 +1,114 @@
+from django.db import models
+
+from core.fields import RunningNumberField
+from core.models import BaseTime, PartitionedBaseTime
+
+
+# โมเดลสำหรับทดสอบเท่านั้น — ไม่มี migration ตารางสร้างผ่าน ModelTablesMixin
+class Document(BaseTime):
+    number = RunningNumberField(pattern="DOC{YYYY}{SEQ:04}")
+
+    class Meta(BaseTime.Meta):
+        app_label = "core"
+
+
+class CounterDocument(BaseTime):
+    number = RunningNumberField(pattern="CD{YY}{MM}{SEQ:03}", mode="counter")
+
+    class Meta(BaseTime.Meta):
+        app_label = "core"
+
+
+class Invoice(BaseTime):
+    number = RunningNumberField(pattern="INV{YYYY}{SEQ:04}")
+    status = models.CharField(max_length=20, blank=True)
+
+    class Meta(BaseTime.Meta):
+        app_label = "core"
+
+
+class InvoiceLine(BaseTime):
+    invoice = models.ForeignKey(Invoice, on_delete=models.CASCADE, related_name="lines")
+    code = RunningNumberField(pattern="LN{YYYY}{SEQ:05}")
+    qty = models.PositiveIntegerField(default=1)
+
+    class Meta(BaseTime.Meta):
+        app_label = "core"
+
+
+class Customer(BaseTime):
+    name = models.CharField(max_length=50)
+    status = models.CharField(max_length=20, blank=True)
+
+    class Meta(BaseTime.Meta):
+        app_label = "core"
+
+
+class Tag(models.Model):
+    name = models.CharField(max_length=20)
+
+    class Meta:
+        app_label = "core"
+
+
+class Order(BaseTime):
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE, null=True, related_name="orders")
+    status = models.CharField(max_length=20, blank=True)
+    total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    tags = models.ManyToManyField(Tag, through="OrderTag", related_name="orders")
+
+    class Meta(BaseTime.Meta):
+        app_label = "core"
+
+
+class OrderItem(BaseTime):
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="items")
+    status = models.CharField(max_length=20, blank=True)
+
+    class Meta(BaseTime.Meta):
+        app_label = "core"
+
+
+class OrderTag(models.Model):
+    order = models.ForeignKey(Order, on_delete=models.CASCADE)
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE)
+    status = models.CharField(max_length=20, blank=True)
+
+    class Meta:
+        app_label = "core"
+
+
+class Article(BaseTime):
+    title = models.CharField(max_length=100)
+    body = models.TextField(blank=True)
+    customer = models.ForeignKey(Customer, on_delete=models.SET_NULL, null=True, blank=True)
+
+    class Meta(BaseTime.Meta):
+        app_label = "core"
+
+
+class Product(BaseTime):
+    KIND_CHOICES = [("goods", "สินค้า"), ("service", "บริการ")]
+
+    name = models.CharField(max_length=50)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, default="goods")
+    price = models.DecimalField(max_digits=12, decimal_places=2, null=True)
+    released = models.DateTimeField(null=True)
+
+    class Meta(BaseTime.Meta):
+        app_label = "core"
+
+
+class ArchivedEvent(PartitionedBaseTime):
+    name = models.CharField(max_length=50)
+    archive_after_days = 30
+
+    class Meta(PartitionedBaseTime.Meta):
+        app_label = "core"
+
+
+class EventNote(BaseTime):
+    event = models.ForeignKey(ArchivedEvent, on_delete=models.CASCADE)
+
+    class Meta(BaseTime.Meta):
+        app_label = "core"
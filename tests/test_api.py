@@ -0,0 +1,82 @@
+import base64
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+from uuid import UUID
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from core.api.encoders import dumps
+from core.tests.models import Document
+from core.tests.utils import ModelTablesMixin
+
+
+@override_settings(ROOT_URLCONF="core.tests.urls")
+class ApiTests(ModelTablesMixin, TestCase):
+    table_models = (Document,)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser("api", "api@example.com", "x")
+        cls.documents = [Document.objects.create(number=f"DOC{i:04}") for i in range(5)]
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.list_url = reverse("core-document-list")
+
+    def detail_url(self, pk):
+        return reverse("core-document-detail", args=[pk])
+
+    def cursor(self, *values):
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+    def test_cursor_walk_returns_every_row_once(self):
+        numbers, url = [], self.list_url
+        while url:
+            data = self.client.get(url).json()
+            numbers += [row["number"] for row in data["results"]]
+            url = data["next"]
+        self.assertEqual(numbers, [d.number for d in reversed(self.documents)])
+
+    def test_malformed_cursor_is_400(self):
+        created = self.documents[0].created_at.isoformat()
+        for cursor in ("%%%", self.cursor(created), self.cursor("abc", "x"),
+                       self.cursor(created, "abc"), self.cursor(None, 1), self.cursor([1], {})):
+            with self.subTest(cursor=cursor):
+                response = self.client.get(self.list_url, {"cursor": cursor})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("detail", response.json())
+
+    def test_unknown_field_is_400(self):
+        self.assertEqual(self.client.get(self.list_url, {"fields": "pk,secret"}).status_code, 400)
+
+    def test_detail(self):
+        document = self.documents[0]
+        response = self.client.get(self.detail_url(document.pk), {"fields": "pk,number"})
+        self.assertEqual(response.json(), {"pk": document.pk, "number": document.number})
+
+    def test_detail_bad_or_missing_pk_is_404(self):
+        for pk in ("abc", "1.5", 999999):
+            with self.subTest(pk=pk):
+                self.assertEqual(self.client.get(self.detail_url(pk)).status_code, 404)
+
+    def test_not_modified(self):
+        etag = self.client.get(self.list_url)["ETag"]
+        self.assertEqual(self.client.get(self.list_url, headers={"If-None-Match": etag}).status_code, 304)
+        Document.objects.create(number="DOC9999")
+        self.assertEqual(self.client.get(self.list_url, headers={"If-None-Match": etag}).status_code, 200)
+
+    def test_anonymous_is_403(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(self.list_url).status_code, 403)
+
+
+class EncoderTests(SimpleTestCase):
+    def test_full_isoformat_and_text_values(self):
+        moment = datetime(2024, 1, 2, 3, 4, 5, 123456, tzinfo=timezone.utc)
+        uid = UUID(int=1)
+        self.assertEqual(json.loads(dumps({"at": moment, "price": Decimal("1.50"), "id": uid})), {
+            "at": "2024-01-02T03:04:05.123456+00:00", "price": "1.50", "id": str(uid),
+        })
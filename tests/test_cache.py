@@ -0,0 +1,89 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.serviecs.versioning import bump_model_version, model_version
+from core.tests.models import Product
+from core.tests.utils import TEST_TEMPLATES, ModelTablesMixin
+
+
+@override_settings(ROOT_URLCONF="core.tests.urls", TEMPLATES=TEST_TEMPLATES)
+class ViewCacheTests(ModelTablesMixin, TestCase):
+    table_models = (Product,)
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_superuser("admin")
+        self.client.force_login(self.user)
+        self.desk = Product.objects.create(name="Desk")
+
+    def get(self, url, **params):
+        table = Product._meta.db_table
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        product_queries = [q for q in queries if f'FROM "{table}"' in q["sql"]]
+        return response, len(product_queries)
+
+    def test_list_fragment_is_served_from_cache(self):
+        url = reverse("product-list")
+        response, queries = self.get(url)
+        self.assertContains(response, "Desk")
+        self.assertGreater(queries, 0)
+
+        response, queries = self.get(url)
+        self.assertContains(response, "Desk")
+        self.assertEqual(queries, 0)
+
+    def test_list_fragment_follows_model_version_and_querystring(self):
+        url = reverse("product-list")
+        self.get(url)
+        Product.objects.create(name="Chair")
+        response, queries = self.get(url)
+        self.assertContains(response, "Chair")
+        self.assertGreater(queries, 0)
+
+        response, queries = self.get(url, q="x")
+        self.assertGreater(queries, 0)
+
+    def test_detail_response_cache(self):
+        url = reverse("product-detail", args=[self.desk.pk])
+        first, _ = self.get(url)
+        self.assertNotIn("X-View-Cache", first)
+        second, queries = self.get(url)
+        self.assertEqual(second["X-View-Cache"], "hit")
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(queries, 0)
+
+        self.desk.name = "Standing desk"
+        self.desk.save()
+        third, _ = self.get(url)
+        self.assertContains(third, "Standing desk")
+        self.assertNotIn("X-View-Cache", third)
+
+    def test_detail_response_cache_is_per_user(self):
+        url = reverse("product-detail", args=[self.desk.pk])
+        self.get(url)
+        self.client.force_login(User.objects.create_superuser("other"))
+        response, _ = self.get(url)
+        self.assertNotIn("X-View-Cache", response)
+
+    def test_pages_with_csrf_token_are_not_stored(self):
+        url = reverse("product-detail", args=[self.desk.pk])
+        self.get(url, form="1")
+        response, _ = self.get(url, form="1")
+        self.assertNotIn("X-View-Cache", response)
+
+
+class ModelVersionCommitTests(ModelTablesMixin, TestCase):
+    table_models = (Product,)
+
+    def test_bump_repeats_after_commit(self):
+        cache.clear()
+        before = model_version(Product)
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_model_version(Product)
+            self.assertEqual(model_version(Product), before + 1)
+        self.assertEqual(model_version(Product), before + 2)
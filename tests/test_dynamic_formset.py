@@ -0,0 +1,105 @@
+from unittest import mock
+
+from django import forms
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.test import RequestFactory, TestCase, override_settings
+
+from core.mixins import formset as formset_module
+from core.mixins.formset import DynamicFormSetView
+from core.serviecs import versioning
+from core.tests.models import Customer, Order, OrderTag, Tag
+from core.tests.utils import TEST_TEMPLATES, ModelTablesMixin
+
+OrderFormSet = forms.modelformset_factory(Order, fields=("status", "customer"), extra=0)
+
+
+class OrderRowView(DynamicFormSetView):
+    formset_class = OrderFormSet
+    partial_template = "tests/order_row.html"
+    formset_prefix = "orders"
+
+
+class StampedOrderForm(forms.ModelForm):
+    status = forms.CharField(initial=lambda: f"s{next(STAMPS)}")
+
+    class Meta:
+        model = Order
+        fields = ("status", "customer")
+
+
+STAMPS = iter(range(1000))
+
+
+class StampedOrderRowView(OrderRowView):
+    formset_class = forms.modelformset_factory(Order, form=StampedOrderForm, extra=0)
+
+
+class UncachedOrderRowView(OrderRowView):
+    cache_empty_form = False
+
+
+@override_settings(TEMPLATES=TEST_TEMPLATES)
+class EmptyFormCacheTests(ModelTablesMixin, TestCase):
+    table_models = (Customer, Order)
+
+    def setUp(self):
+        cache.clear()
+        Customer.objects.create(name="Acme")
+
+    def get(self, view_class=OrderRowView, **params):
+        request = RequestFactory().get("/", {"add-form": "1", **params})
+        request.htmx = True  # django-htmx middleware
+        return view_class.as_view()(request)
+
+    def test_row_index_replaces_prefix(self):
+        html = self.get(form_count="3").content.decode()
+        self.assertIn('name="orders-3-status"', html)
+        self.assertNotIn("__prefix__", html)
+
+    def test_bad_form_count_is_row_zero(self):
+        html = self.get(form_count="1\"><script>").content.decode()
+        self.assertIn('name="orders-0-status"', html)
+        self.assertNotIn("<script>", html)
+
+    def test_empty_form_is_rendered_once(self):
+        with mock.patch.object(formset_module, "render_to_string", wraps=formset_module.render_to_string) as render:
+            for count in range(3):
+                self.assertIn(f"orders-{count}-customer", self.get(form_count=str(count)).content.decode())
+        self.assertEqual(render.call_count, 1)
+
+    def test_callable_initial_is_not_cached(self):
+        first = self.get(StampedOrderRowView, form_count="0").content.decode()
+        second = self.get(StampedOrderRowView, form_count="0").content.decode()
+        self.assertNotEqual(first, second)
+        response = self.get(StampedOrderRowView, template="1")
+        self.assertEqual(response["Cache-Control"], "no-cache")
+
+    def test_cache_can_be_turned_off(self):
+        with mock.patch.object(formset_module, "render_to_string", wraps=formset_module.render_to_string) as render:
+            for count in range(2):
+                self.get(UncachedOrderRowView, form_count=str(count))
+        self.assertEqual(render.call_count, 2)
+
+    def test_new_choice_rows_render_again(self):
+        self.assertEqual(self.get(form_count="0").content.decode().count("<option"), 2)
+        Customer.objects.create(name="Globex")
+        self.assertEqual(self.get(form_count="0").content.decode().count("<option"), 3)
+
+    def test_choice_models_are_tracked_when_the_view_is_declared(self):
+        uid = f"core_model_version_{Tag._meta.label_lower}"
+        post_save.disconnect(sender=Tag, dispatch_uid=uid)
+        post_delete.disconnect(sender=Tag, dispatch_uid=uid)
+        versioning._tracked.discard(Tag)
+
+        class TagRowView(DynamicFormSetView):
+            formset_class = forms.modelformset_factory(OrderTag, fields=("tag",), extra=0)
+            partial_template = "tests/order_row.html"
+
+        self.assertEqual(TagRowView.get_choice_models(), [Tag])
+        self.assertIn(Tag, versioning._tracked)
+
+    def test_template_for_client_cloning(self):
+        response = self.get(template="1")
+        self.assertIn("orders-__prefix__-status", response.content.decode())
+        self.assertEqual(response["Cache-Control"], "private, max-age=300")
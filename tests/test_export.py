@@ -0,0 +1,131 @@
+import csv
+import io
+import unittest
+from unittest import mock
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from django.test import RequestFactory, TestCase
+from django.views.generic import ListView
+
+from core.mixins.baseTemplates import BaseListMixin
+from core.tests.models import Customer, Order, OrderItem, OrderTag, Product, Tag
+from core.tests.utils import ModelTablesMixin
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+
+class ProductExportList(BaseListMixin, ListView):
+    model = Product
+    list_display = ("name", "kind", "price", "released")
+    search_fields = ("name",)
+    ordering = ("name",)
+
+
+class OrderExportList(BaseListMixin, ListView):
+    model = Order
+    list_display = ("status", "customer", "tags")
+    ordering = ("pk",)
+
+
+class ExportTests(ModelTablesMixin, TestCase):
+    table_models = (Customer, Tag, Order, OrderItem, OrderTag, Product)
+
+    def export(self, view_class, query):
+        return view_class.as_view()(RequestFactory().get(f"/{query}"))
+
+    def csv_rows(self, response):
+        self.assertTrue(response.streaming)
+        body = b"".join(response.streaming_content).decode("utf-8")
+        self.assertTrue(body.startswith("\ufeff"))
+        return list(csv.reader(io.StringIO(body[1:])))
+
+    def test_csv_uses_labels_choices_and_local_time(self):
+        Product.objects.create(
+            name="Desk", kind="service", price=Decimal("10.50"),
+            released=datetime(2025, 1, 1, 17, 30, tzinfo=timezone.utc),
+        )
+        response = self.export(ProductExportList, "?export=csv")
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        self.assertIn('attachment; filename="product-', response["Content-Disposition"])
+        self.assertEqual(self.csv_rows(response), [
+            ["Name", "Kind", "Price", "Released"],
+            ["Desk", "บริการ", "10.50", "2025-01-02 00:30:00"],
+        ])
+
+    def test_csv_follows_the_search(self):
+        for name in ("Desk", "Chair", "Desk lamp"):
+            Product.objects.create(name=name)
+        rows = self.csv_rows(self.export(ProductExportList, "?export=csv&q=desk"))
+        self.assertEqual([row[0] for row in rows[1:]], ["Desk", "Desk lamp"])
+
+    def test_formula_cells_are_escaped(self):
+        for name in ("=1+1", "+cmd", "-2", "@SUM(A1)", "ok"):
+            Product.objects.create(name=name)
+        rows = self.csv_rows(self.export(ProductExportList, "?export=csv"))
+        self.assertEqual(sorted(row[0] for row in rows[1:]), ["'+cmd", "'-2", "'=1+1", "'@SUM(A1)", "ok"])
+
+    def test_relation_columns_iterate_instances(self):
+        self.assertFalse(OrderExportList.get_list_query_plan()["flat"])
+        self.assertTrue(ProductExportList.get_list_query_plan()["flat"])
+        order = Order.objects.create(status="new", customer=Customer.objects.create(name="Acme"))
+        tags = [Tag.objects.create(name=name) for name in ("a", "b")]
+        for tag in tags:
+            OrderTag.objects.create(order=order, tag=tag)
+        rows = self.csv_rows(self.export(OrderExportList, "?export=csv"))
+        self.assertEqual(rows[1], ["new", str(order.customer), ", ".join(str(tag) for tag in tags)])
+
+    def test_unknown_format_renders_the_list(self):
+        view = ProductExportList()
+        view.setup(RequestFactory().get("/?export=pdf"))
+        with mock.patch.object(ListView, "get", return_value="page") as get:
+            self.assertEqual(view.get(view.request), "page")
+        get.assert_called_once()
+
+    @unittest.skipIf(openpyxl, "openpyxl ติดตั้งอยู่")
+    def test_xlsx_without_openpyxl(self):
+        self.assertEqual(self.export(ProductExportList, "?export=xlsx").status_code, 400)
+
+    def test_xlsx_is_built_lazily_and_streamed_in_blocks(self):
+        Product.objects.create(name="Desk", price=Decimal("1"))
+        built = []
+
+        class Sheet(list):
+            pass
+
+        class Workbook:
+            def __init__(self, write_only):
+                built.append(self)
+                self.sheet = Sheet()
+
+            def create_sheet(self, title):
+                return self.sheet
+
+            def save(self, fp):
+                fp.write(repr(self.sheet).encode() * 50)
+
+        fake = mock.Mock(Workbook=Workbook)
+        with mock.patch.dict("sys.modules", {"openpyxl": fake}), \
+                mock.patch.object(ProductExportList, "export_xlsx_block_size", 100):
+            response = self.export(ProductExportList, "?export=xlsx")
+            # ยังไม่อ่านข้อมูล / ไม่สร้าง workbook จนกว่า response จะถูก stream
+            self.assertEqual(built, [])
+            chunks = list(response.streaming_content)
+        self.assertIn("attachment;", response["Content-Disposition"])
+        self.assertEqual(built[0].sheet[1][0], "Desk")
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(len(chunk) <= 100 for chunk in chunks))
+        self.assertEqual(b"".join(chunks), repr(built[0].sheet).encode() * 50)
+
+    @unittest.skipUnless(openpyxl, "ต้องติดตั้ง openpyxl")
+    def test_xlsx(self):
+        Product.objects.create(name="=Desk", price=Decimal("1"))
+        response = self.export(ProductExportList, "?export=xlsx")
+        body = b"".join(response.streaming_content)
+        sheet = openpyxl.load_workbook(io.BytesIO(body)).active
+        rows = list(sheet.iter_rows(values_only=True))
+        self.assertEqual(rows[0], ("Name", "Kind", "Price", "Released"))
+        self.assertEqual(rows[1][:2], ("'=Desk", "สินค้า"))
@@ -0,0 +1,215 @@
+from unittest import mock
+
+from django.db.models.signals import post_save
+from django.db import IntegrityError, OperationalError, connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.serviecs import search
+from core.serviecs.runningNumber import RunningNumberService
+from core.serviecs.versioning import model_version
+from core.tests.models import Invoice, InvoiceLine
+from core.mixins.form import FormsetMixin
+from core.tests import views
+from core.tests.utils import TEST_TEMPLATES, ModelTablesMixin
+
+
+def formset_data(prefix, rows, initial=0, **extra):
+    data = {
+        f"{prefix}-TOTAL_FORMS": str(len(rows)),
+        f"{prefix}-INITIAL_FORMS": str(initial),
+        f"{prefix}-MIN_NUM_FORMS": "0",
+        f"{prefix}-MAX_NUM_FORMS": "1000",
+        **extra,
+    }
+    for index, row in enumerate(rows):
+        data.update({f"{prefix}-{index}-{name}": value for name, value in row.items()})
+    return data
+
+
+@override_settings(ROOT_URLCONF="core.tests.urls", TEMPLATES=TEST_TEMPLATES)
+class FormsetSaveTests(ModelTablesMixin, TestCase):
+    table_models = (Invoice, InvoiceLine)
+
+    def post_invoice(self, rows, **extra):
+        return self.client.post(reverse("invoice-add"), formset_data("lines", rows, status="open", **extra))
+
+    def test_numbers_for_all_rows_are_reserved_in_one_block(self):
+        with mock.patch.object(RunningNumberService, "next_many", wraps=RunningNumberService.next_many) as next_many:
+            response = self.post_invoice([{"qty": "2"}, {"qty": "3"}, {"qty": "4"}])
+        self.assertRedirects(response, "/done/", fetch_redirect_response=False)
+        calls = {call.kwargs["model"]: call.kwargs["n"] for call in next_many.call_args_list}
+        self.assertEqual(calls, {Invoice: 1, InvoiceLine: 3})
+
+        invoice = Invoice.objects.get()
+        codes = list(invoice.lines.order_by("pk").values_list("code", flat=True))
+        year = invoice.number[3:7]
+        self.assertEqual(codes, [f"LN{year}{seq:05}" for seq in (1, 2, 3)])
+        self.assertEqual(list(invoice.lines.order_by("pk").values_list("qty", flat=True)), [2, 3, 4])
+
+    def test_unchanged_extra_rows_get_no_number(self):
+        self.post_invoice([{"qty": "5"}, {"qty": "1"}])
+        self.assertEqual(InvoiceLine.objects.count(), 1)
+        self.assertTrue(InvoiceLine.objects.get().code.endswith("00001"))
+
+    def test_number_collision_is_retried_with_a_fresh_number(self):
+        taken = Invoice.objects.create(number=RunningNumberService.next(Invoice, "number", "INV{YYYY}{SEQ:04}"))
+        real_next_many = RunningNumberService.next_many
+        calls = []
+
+        def next_many(**kwargs):
+            calls.append(kwargs["model"])
+            if len(calls) == 1:
+                # จำลอง worker อื่นได้เลขเดียวกันไปก่อน
+                return [taken.number]
+            return real_next_many(**kwargs)
+
+        with mock.patch.object(RunningNumberService, "next_many", side_effect=next_many), \
+                mock.patch("core.mixins.form.time.sleep") as sleep:
+            response = self.post_invoice([{"qty": "2"}])
+        self.assertRedirects(response, "/done/", fetch_redirect_response=False)
+        sleep.assert_called_once()
+        invoice = Invoice.objects.exclude(pk=taken.pk).get()
+        self.assertNotEqual(invoice.number, taken.number)
+        self.assertEqual(invoice.lines.count(), 1)
+
+    def test_retries_are_bounded(self):
+        taken = Invoice.objects.create(number=RunningNumberService.next(Invoice, "number", "INV{YYYY}{SEQ:04}"))
+        with mock.patch.object(RunningNumberService, "next_many", return_value=[taken.number]), \
+                mock.patch("core.mixins.form.time.sleep") as sleep, \
+                self.assertRaises(IntegrityError):
+            self.post_invoice([])
+        self.assertEqual(sleep.call_count, 3)
+
+    def test_formsets_are_built_once_per_request(self):
+        build = mock.patch.object(
+            views.InvoiceCreateView, "build_formset", autospec=True, side_effect=FormsetMixin.build_formset,
+        )
+        with build as built:
+            self.post_invoice([{"qty": "2"}])
+        self.assertEqual(built.call_count, 1)
+
+        with build as built, mock.patch.object(
+            views.InvoiceLineFormSet, "full_clean", autospec=True, side_effect=views.InvoiceLineFormSet.full_clean,
+        ) as full_clean, mock.patch("builtins.print"):
+            response = self.post_invoice([{"qty": "-1"}])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(built.call_count, 1)
+        self.assertEqual(full_clean.call_count, 1)
+        self.assertIs(response.context["lines"], response.context["view"].get_formsets()["lines"])
+        self.assertEqual(Invoice.objects.count(), 1)
+
+    def test_get_renders_the_same_formset(self):
+        response = self.client.get(reverse("invoice-add"))
+        self.assertIn("lines-TOTAL_FORMS", response.content.decode())
+
+
+@override_settings(ROOT_URLCONF="core.tests.urls", TEMPLATES=TEST_TEMPLATES)
+class FormsetBulkSaveTests(ModelTablesMixin, TestCase):
+    table_models = (Invoice, InvoiceLine)
+
+    def setUp(self):
+        self.saved = []
+        post_save.connect(self.on_save, sender=InvoiceLine)
+        self.addCleanup(post_save.disconnect, self.on_save, sender=InvoiceLine)
+
+    def on_save(self, sender, instance, **kwargs):
+        self.saved.append(instance.pk)
+
+    def line_inserts(self, queries):
+        table = InvoiceLine._meta.db_table
+        return [q["sql"] for q in queries if q["sql"].startswith(f'INSERT INTO "{table}"')]
+
+    def test_new_rows_are_inserted_in_one_statement(self):
+        version = model_version(InvoiceLine)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                reverse("invoice-bulk-add"),
+                formset_data("lines", [{"qty": "4"}, {"qty": "5"}, {"qty": "6"}], status="open"),
+            )
+        self.assertRedirects(response, "/done/", fetch_redirect_response=False)
+        self.assertEqual(len(self.line_inserts(queries)), 1)
+        self.assertEqual(self.saved, [])
+        self.assertGreater(model_version(InvoiceLine), version)
+        invoice = Invoice.objects.get()
+        self.assertEqual(sorted(invoice.lines.values_list("qty", flat=True)), [4, 5, 6])
+        self.assertEqual(len(set(invoice.lines.values_list("code", flat=True))), 3)
+
+    def test_changed_and_deleted_rows(self):
+        invoice = Invoice.objects.create(number="INV-1")
+        keep, drop, same = (
+            InvoiceLine.objects.create(invoice=invoice, code=f"L{i}", qty=i) for i in (1, 2, 3)
+        )
+        rows = [
+            {"id": str(keep.pk), "qty": "10"},
+            {"id": str(drop.pk), "qty": "2", "DELETE": "on"},
+            {"id": str(same.pk), "qty": "3"},
+            {"qty": "7"},
+        ]
+        self.saved.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                reverse("invoice-bulk-edit", args=[invoice.pk]),
+                formset_data("lines", rows, initial=3, status="paid"),
+            )
+        self.assertRedirects(response, "/done/", fetch_redirect_response=False)
+        self.assertEqual(self.saved, [])
+        self.assertEqual(len(self.line_inserts(queries)), 1)
+        self.assertEqual(
+            dict(invoice.lines.values_list("code", "qty")),
+            {"L1": 10, "L3": 3, invoice.lines.get(qty=7).code: 7},
+        )
+        keep_before = keep.updated_at
+        keep.refresh_from_db()
+        self.assertGreater(keep.updated_at, keep_before)
+        same_before = same.updated_at
+        same.refresh_from_db()
+        self.assertEqual(same.updated_at, same_before)
+
+
+    def test_sqlite_fts_table_is_synced(self):
+        search.SQLiteFTSSearchBackend._tables.clear()
+        # ตาราง _fts หายไปตอน rollback ➜ ล้างรายชื่อที่ cache ไว้
+        self.addCleanup(search.SQLiteFTSSearchBackend._tables.clear)
+        backend = search.get_search_backend("sqlite_fts")
+        invoice = Invoice.objects.create(number="INV-1")
+        line = InvoiceLine.objects.create(invoice=invoice, code="L1", qty=1)
+        backend.build_index(InvoiceLine, ("code", "qty"))
+        rows = [{"id": str(line.pk), "qty": "123"}, {"qty": "7"}]
+        self.client.post(reverse("invoice-bulk-edit", args=[invoice.pk]), formset_data("lines", rows, initial=1))
+
+        lines = InvoiceLine.objects.all()
+        self.assertEqual(list(backend.filter(lines, ("qty",), "123")), [line])
+        created = invoice.lines.get(qty=7)
+        self.assertEqual(list(backend.filter(lines, ("code",), created.code)), [created])
+
+
+class FormsetHookTests(SimpleTestCase):
+    def test_get_name_formset_hook_is_used(self):
+        formset = object()
+
+        class View(views.InvoiceCreateView):
+            formset_classes = {}
+            formset_names = ("lines",)
+
+            def get_lines_formset(self):
+                return formset
+
+        view = View()
+        self.assertEqual(view.get_formsets(), {"lines": formset})
+        self.assertIs(view.get_formsets(), view.get_formsets())
+
+
+class RunningNumberSQLiteLockTests(SimpleTestCase):
+    databases = {"default"}
+
+    def test_lock_path_takes_the_write_lock_first(self):
+        with CaptureQueriesContext(connection) as queries:
+            RunningNumberService._lock_for_write("default")
+        self.assertTrue(queries[0]["sql"].startswith("UPDATE"))
+
+    def test_retryable_errors(self):
+        self.assertTrue(RunningNumberService.is_retryable_error(IntegrityError("UNIQUE constraint failed")))
+        self.assertTrue(RunningNumberService.is_retryable_error(OperationalError("database is locked")))
+        self.assertFalse(RunningNumberService.is_retryable_error(OperationalError("no such table: x")))
@@ -0,0 +1,38 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.tests.models import Product
+from core.tests.utils import TEST_TEMPLATES, ModelTablesMixin
+
+
+@override_settings(ROOT_URLCONF="core.tests.urls", TEMPLATES=TEST_TEMPLATES)
+class HtmxListPartialTests(ModelTablesMixin, TestCase):
+    table_models = (Product,)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(User.objects.create_superuser("admin"))
+        Product.objects.create(name="Desk")
+        self.url = reverse("product-list")
+
+    def test_full_page(self):
+        response = self.client.get(self.url)
+        self.assertContains(response, 'name="q"')
+        self.assertContains(response, "Desk")
+        self.assertIn("HX-Request", response["Vary"])
+
+    def test_htmx_request_gets_the_table_only(self):
+        for _ in range(2):  # รอบสองมาจาก fragment cache
+            response = self.client.get(self.url, {"q": "desk"}, headers={"HX-Request": "true"})
+            self.assertContains(response, "Desk")
+            self.assertContains(response, "<table")
+            self.assertNotContains(response, 'name="q"')
+            self.assertIn("HX-Request", response["Vary"])
+
+    def test_boosted_and_history_restore_get_the_full_page(self):
+        for header in ("HX-Boosted", "HX-History-Restore-Request"):
+            with self.subTest(header=header):
+                response = self.client.get(self.url, headers={"HX-Request": "true", header: "true"})
+                self.assertContains(response, 'name="q"')
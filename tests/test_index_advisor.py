@@ -0,0 +1,157 @@
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import models
+from django.db.migrations.writer import MigrationWriter
+from django.test import TestCase
+from django.urls import path
+from django.views.generic import ListView
+
+from core.mixins.baseTemplates import BaseListMixin
+from core.mixins.viewMixins import BaseListView
+from core.serviecs.indexAdvisor import IndexAdvisor, IndexProposal
+from core.tests.models import Customer, Order
+from core.tests.utils import ModelTablesMixin
+
+URLCONF = "core.tests.test_index_advisor"
+
+
+class OrderList(BaseListMixin, BaseListView):
+    model = Order
+    filter_fields = ("status", "customer__id", "customer__name", "tags")
+    date_start_field = date_end_field = "updated_at"
+
+
+class PaidOrderList(BaseListMixin, ListView):
+    queryset = Order.objects.filter(status="paid")
+    pagination = "keyset"
+    filter_fields = ("status", "customer")
+
+
+class PaidRecentOrderList(BaseListMixin, ListView):
+    queryset = Order.objects.filter(status="paid")
+    filter_fields = ("customer",)
+
+
+urlpatterns = [
+    path("orders/", OrderList.as_view()),
+    path("orders/paid/", PaidOrderList.as_view()),
+]
+
+
+def fields_of(proposals, condition=False):
+    return {p.fields for p in proposals if (p.condition is not None) == condition}
+
+
+class IndexAdvisorTests(ModelTablesMixin, TestCase):
+    table_models = (Customer, Order)
+
+    def test_list_views_found_from_urlconf(self):
+        self.assertEqual(
+            IndexAdvisor.list_views(URLCONF),
+            [(OrderList, "/orders/"), (PaidOrderList, "/orders/paid/")],
+        )
+
+    def test_proposals_from_filters_dates_and_default_ordering(self):
+        proposals = IndexAdvisor.proposals_for_view(OrderList)
+        # ฟิลด์ข้ามตาราง (customer__name) และ M2M (tags) ไม่ได้ index บนตารางนี้
+        self.assertEqual(fields_of(proposals), {
+            ("-created_at",),
+            ("status", "-created_at"),
+            ("customer", "-created_at"),
+            ("updated_at",),
+        })
+
+    def test_keyset_view_with_constant_filter_gives_partial_index(self):
+        condition, fixed = IndexAdvisor.view_condition(PaidOrderList, Order)
+        self.assertEqual(fixed, {"status": "paid"})
+        self.assertEqual(condition, models.Q(status="paid"))
+        proposals = IndexAdvisor.proposals_for_view(PaidOrderList)
+        # status ถูก filter ค่าคงที่อยู่แล้ว ➜ ไม่อยู่ใน index
+        self.assertEqual(fields_of(proposals, condition=True), {
+            ("-created_at", "-id"),
+            ("customer", "-created_at", "-id"),
+        })
+
+    def test_advise_drops_existing_and_prefix_proposals(self):
+        proposals = IndexAdvisor.advise(urlconf=URLCONF)
+        # (-created_at) มีใน Meta.indexes แล้ว
+        self.assertEqual(fields_of(proposals), {
+            ("status", "-created_at"),
+            ("customer", "-created_at"),
+            ("updated_at",),
+        })
+        self.assertEqual(fields_of(proposals, condition=True), {
+            ("-created_at", "-id"),
+            ("customer", "-created_at", "-id"),
+        })
+
+    def test_advise_filters_models(self):
+        self.assertEqual(IndexAdvisor.advise({Customer}, urlconf=URLCONF), [])
+
+    def test_existing_index_in_database_covers_proposal(self):
+        existing = IndexAdvisor.existing(Order)
+        # FK มี index (customer) ในฐานข้อมูล ➜ ครอบ proposal (customer) ได้ แต่ไม่ครอบ (customer, -created_at)
+        self.assertTrue(IndexAdvisor._is_covered(IndexProposal(Order, ["customer"]), existing))
+        self.assertFalse(IndexAdvisor._is_covered(IndexProposal(Order, ["customer", "-created_at"]), existing))
+        # อ่านย้อนทิศได้
+        self.assertTrue(IndexAdvisor._is_covered(IndexProposal(Order, ["created_at"]), existing))
+
+    def test_partial_index_name_differs_from_plain_index(self):
+        plain = IndexProposal(Order, ["customer"]).index()
+        partial = IndexProposal(Order, ["customer"], models.Q(status="paid")).index()
+        other = IndexProposal(Order, ["customer"], models.Q(status="void")).index()
+        self.assertEqual(len({plain.name, partial.name, other.name}), 3)
+        self.assertTrue(partial.name.endswith("_pdx"))
+        self.assertLessEqual(len(partial.name), models.Index.max_name_length)
+        self.assertEqual(partial.condition, models.Q(status="paid"))
+
+    def test_partial_covered_by_full_proposal_is_pruned(self):
+        views = [(OrderList, "/orders/"), (PaidRecentOrderList, "/orders/recent/")]
+        with mock.patch.object(IndexAdvisor, "list_views", return_value=views):
+            proposals = IndexAdvisor.advise()
+        # (customer, -created_at) แบบเต็มจาก OrderList ใช้แทน partial ของ PaidRecentOrderList ได้
+        self.assertEqual(fields_of(proposals, condition=True), set())
+        full = next(p for p in proposals if p.fields == ("customer", "-created_at"))
+        self.assertEqual(len(full.reasons), 2)
+
+    def test_explain_uses_temporary_index_and_rolls_back(self):
+        customer = Customer.objects.create(name="A")
+        Order.objects.bulk_create([Order(customer=customer, status="paid") for _ in range(5)])
+        proposal = IndexProposal(Order, ["customer", "-created_at"])
+        IndexAdvisor.explain(proposal)
+        self.assertIsNotNone(proposal.plan)
+        self.assertIsInstance(proposal.used, bool)
+        # index ชั่วคราวถูก rollback แล้ว
+        names = {p.index().name for p in IndexAdvisor.existing(Order)}
+        self.assertNotIn(proposal.index().name, names)
+
+    def test_write_migrations_adds_index_without_model_state(self):
+        proposals = [IndexProposal(Order, ["status", "-created_at"])]
+        with tempfile.TemporaryDirectory() as tmp:
+            target = os.path.join(tmp, "0099_list_indexes.py")
+            with mock.patch.object(MigrationWriter, "path", new_callable=mock.PropertyMock, return_value=target):
+                paths = IndexAdvisor.write_migrations(proposals)
+            self.assertEqual(paths, [target])
+            with open(target, encoding="utf-8") as fh:
+                source = fh.read()
+        self.assertIn("SeparateDatabaseAndState", source)
+        self.assertIn("AddIndex", source)
+        self.assertIn(proposals[0].index().name, source)
+        self.assertNotIn("atomic = False", source)
+
+    def test_command_lists_proposals_with_reasons(self):
+        out = StringIO()
+        call_command("advise_indexes", "core.Order", "--urlconf", URLCONF, stdout=out)
+        output = out.getvalue()
+        self.assertIn("core.Order(status, -created_at)", output)
+        self.assertIn("WHERE", output)
+        self.assertIn("OrderList /orders/", output)
+
+    def test_command_reports_nothing_to_add(self):
+        out = StringIO()
+        call_command("advise_indexes", "core.Customer", "--urlconf", URLCONF, stdout=out)
+        self.assertIn("ไม่มี index ที่ต้องเพิ่ม", out.getvalue())
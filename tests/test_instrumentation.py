@@ -0,0 +1,93 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from core.mixins.instrumentation import QueryRecorder, ViewStats
+from core.tests.models import Product
+from core.tests.utils import TEST_TEMPLATES, ModelTablesMixin
+from core.tests.views import ProductList
+
+VIEW = f"{ProductList.__module__}.{ProductList.__qualname__}"
+
+
+class QueryRecorderTests(SimpleTestCase):
+    def run_sql(self, recorder, *statements):
+        for sql in statements:
+            recorder(lambda *args: None, sql, (), False, {})
+
+    def test_literals_are_grouped_into_one_signature(self):
+        recorder = QueryRecorder()
+        self.run_sql(recorder, *[f"SELECT * FROM t WHERE id = {n}" for n in range(4)],
+                     "SELECT * FROM t WHERE name = 'x'")
+        self.assertEqual(recorder.count, 5)
+        self.assertEqual(recorder.duplicates(3), [(4, "SELECT * FROM t WHERE id = ?")])
+        self.assertEqual(recorder.duplicates(5), [])
+
+
+class InstrumentationSettingTests(SimpleTestCase):
+    def test_off_by_default(self):
+        self.assertFalse(ProductList().instrumentation_enabled())
+        self.assertTrue(ProductList(instrument=True).instrumentation_enabled())
+
+
+@override_settings(ROOT_URLCONF="core.tests.urls", TEMPLATES=TEST_TEMPLATES, CORE_INSTRUMENTATION=True)
+class InstrumentationMixinTests(ModelTablesMixin, TestCase):
+    table_models = (Product,)
+
+    def setUp(self):
+        cache.clear()
+        ViewStats.reset()
+        self.user = User.objects.create_superuser("admin")
+        self.client.force_login(self.user)
+        Product.objects.create(name="Desk")
+
+    def test_server_timing_header_and_stats(self):
+        response = self.client.get(reverse("product-list"))
+        timing = response.headers["Server-Timing"]
+        self.assertIn("db;dur=", timing)
+        self.assertIn("tpl;dur=", timing)
+        self.assertIn("view;dur=", timing)
+
+        stats = {row["view"]: row for row in ViewStats.snapshot()}
+        self.assertEqual(stats[VIEW]["requests"], 1)
+        self.assertGreater(stats[VIEW]["queries"], 0)
+
+    def test_log_line_and_budget_warning(self):
+        with self.assertLogs("core.instrumentation", "INFO") as logs:
+            self.client.get(reverse("product-list"))
+        self.assertEqual(logs.records[0].levelname, "INFO")
+        self.assertEqual(logs.records[0].instrumentation["view"], VIEW)
+
+        with override_settings(CORE_QUERY_BUDGET=0), self.assertLogs("core.instrumentation", "WARNING") as logs:
+            self.client.get(reverse("product-list"), {"q": "x"})
+        self.assertTrue(logs.records[0].instrumentation["over_budget"])
+        self.assertEqual(ViewStats.snapshot()[0]["over_budget"], 1)
+
+    def test_response_is_rendered_by_the_handler(self):
+        request = RequestFactory().get("/")
+        request.user = self.user
+        response = ProductList.as_view()(request)
+        # middleware process_template_response ยังแก้ response ได้ ➜ สรุปผลหลัง render
+        self.assertFalse(response.is_rendered)
+        self.assertEqual(ViewStats.snapshot(), [])
+        response.render()
+        self.assertIn("Server-Timing", response.headers)
+        self.assertEqual(ViewStats.snapshot()[0]["requests"], 1)
+
+    @override_settings(CORE_INSTRUMENTATION=False)
+    def test_disabled_by_setting(self):
+        response = self.client.get(reverse("product-list"))
+        self.assertNotIn("Server-Timing", response.headers)
+        self.assertEqual(ViewStats.snapshot(), [])
+
+    def test_stats_page_is_staff_only_and_post_resets(self):
+        self.client.get(reverse("product-list"))
+        response = self.client.get(reverse("instrumentation"))
+        self.assertContains(response, VIEW)
+
+        self.client.post(reverse("instrumentation"))
+        self.assertEqual(ViewStats.snapshot(), [])
+
+        self.client.force_login(User.objects.create_user("clerk"))
+        self.assertEqual(self.client.get(reverse("instrumentation")).status_code, 403)
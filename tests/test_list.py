@@ -0,0 +1,155 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.utils.formats import date_format
+from django.utils.timezone import localtime
+from django.views.generic import ListView
+
+from core.mixins.baseTemplates import BaseListMixin
+from core.mixins.viewMixins import BaseListView
+from core.templatetags.base_tags import get_value
+from core.tests.models import Article, Customer, Order, OrderItem, OrderTag, Product, Tag
+from core.tests.utils import ModelTablesMixin
+
+
+class ArticleList(BaseListMixin, ListView):
+    model = Article
+    list_display = ("title", "customer__name")
+
+
+class OrderList(BaseListMixin, ListView):
+    model = Order
+    list_display = ("status", "customer", "tags")
+
+
+class ListQueryPlanTests(ModelTablesMixin, TestCase):
+    table_models = (Customer, Tag, Order, OrderItem, OrderTag, Article)
+
+    def queryset(self, view_class, query=""):
+        view = view_class()
+        view.setup(RequestFactory().get(f"/{query}"))
+        return view, view.get_queryset()
+
+    def test_plan_from_list_display(self):
+        plan = ArticleList.get_list_query_plan()
+        self.assertEqual(plan["select_related"], ("customer",))
+        self.assertEqual(plan["prefetch_related"], ())
+        self.assertEqual(plan["only"], ("customer__name", "pk", "title"))
+        self.assertIs(ArticleList.get_list_query_plan(), plan)
+
+    def test_many_relations_are_prefetched(self):
+        plan = OrderList.get_list_query_plan()
+        self.assertEqual(plan["select_related"], ("customer",))
+        self.assertEqual(plan["prefetch_related"], ("tags",))
+
+    def test_rows_render_without_per_row_queries(self):
+        for i in range(5):
+            Article.objects.create(title=f"a{i}", customer=Customer.objects.create(name=f"c{i}"))
+        _, queryset = self.queryset(ArticleList)
+        with self.assertNumQueries(1):
+            values = [get_value(row, column) for row in queryset for column in ArticleList.list_display]
+        self.assertEqual(sorted(values[1::2]), [f"c{i}" for i in range(5)])
+
+    def test_properties_disable_only(self):
+        class View(ArticleList):
+            list_display = ("title", "pk_label")
+
+        self.assertEqual(View.get_list_query_plan()["only"], ())
+
+    def test_overrides(self):
+        class View(ArticleList):
+            list_select_related = ()
+            list_only = ("title",)
+
+        _, queryset = self.queryset(View)
+        self.assertFalse(queryset.query.select_related)
+        self.assertEqual(queryset.query.deferred_loading, ({"title"}, False))
+
+    def test_field_labels_follow_relations(self):
+        view, _ = self.queryset(ArticleList)
+        self.assertEqual(view.get_field_labels(), {"title": "Title", "customer__name": "Name"})
+
+
+class ProductList(BaseListMixin, ListView):
+    model = Product
+    list_display = ("name", "kind", "price", "released")
+
+
+class ListRowTests(ModelTablesMixin, TestCase):
+    table_models = (Customer, Tag, Order, OrderItem, OrderTag, Product)
+
+    def rows(self, view_class, objs):
+        return [row.cells for row in view_class().build_rows(objs)]
+
+    def test_cells_are_formatted_per_column(self):
+        product = Product(
+            pk=1, name="Desk", kind="service", price=Decimal("1234.5"),
+            released=datetime(2025, 1, 1, 17, 30, tzinfo=timezone.utc),
+        )
+        [cells] = self.rows(ProductList, [product])
+        self.assertEqual(cells[:3], ["Desk", "บริการ", "1,234.50"])
+        # แสดงตามเวลาท้องถิ่นของโปรเจกต์ เหมือน {{ value }} ใน template
+        self.assertEqual(cells[3], date_format(localtime(product.released), "DATETIME_FORMAT"))
+
+    def test_empty_values(self):
+        [cells] = self.rows(ProductList, [Product(pk=1, name="Desk", kind="other")])
+        self.assertEqual(cells[1:], ["other", "", ""])
+
+    def test_many_to_many_is_joined(self):
+        order = Order.objects.create(status="new")
+        tags = [Tag.objects.create(name=name) for name in ("a", "b")]
+        for tag in tags:
+            OrderTag.objects.create(order=order, tag=tag)
+        view = OrderList()
+        view.setup(RequestFactory().get("/"))
+        with self.assertNumQueries(2):
+            [row] = view.build_rows(view.get_queryset())
+        self.assertEqual(row.pk, order.pk)
+        self.assertEqual(row.cells[2], ", ".join(str(tag) for tag in tags))
+
+    def test_context_has_columns_and_rows(self):
+        Product.objects.create(name="Desk")
+        view = ProductList()
+        view.setup(RequestFactory().get("/"))
+        view.object_list = view.get_queryset()
+        context = view.get_context_data()
+        self.assertEqual([label for _, label in context["columns"]], ["Name", "Kind", "Price", "Released"])
+        self.assertEqual([row.cells[0] for row in context["rows"]], ["Desk"])
+
+
+class ArticleBaseList(BaseListMixin, BaseListView):
+    model = Article
+    list_display = ("title",)
+
+
+class SortedArticleList(ArticleBaseList):
+    ordering = ("title",)
+
+
+class BaseListViewOrderingTests(ModelTablesMixin, TestCase):
+    table_models = (Customer, Article)
+
+    def titles(self, view_class):
+        view = view_class()
+        view.setup(RequestFactory().get("/"))
+        return list(view.get_queryset().values_list("title", flat=True))
+
+    def test_default_ordering_is_newest_first(self):
+        for year, title in ((2002, "b"), (2003, "a"), (2001, "c")):
+            article = Article.objects.create(title=title)
+            Article.objects.filter(pk=article.pk).update(created_at=datetime(year, 1, 1, tzinfo=timezone.utc))
+        self.assertEqual(self.titles(ArticleBaseList), ["a", "b", "c"])
+
+    def test_view_ordering_is_kept(self):
+        for title in ("b", "a", "c"):
+            Article.objects.create(title=title)
+        self.assertEqual(self.titles(SortedArticleList), ["a", "b", "c"])
+
+
+class GetValueTests(SimpleTestCase):
+    def test_paths(self):
+        article = Article(title="t", customer=Customer(name="Acme"))
+        self.assertEqual(get_value(article, "customer__name"), "Acme")
+        self.assertEqual(get_value(Article(title="t"), "customer__name"), "")
+        self.assertEqual(get_value(article, "missing"), "")
@@ -0,0 +1,184 @@
+import base64
+import json
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models.signals import post_delete, post_save
+from django.http import Http404
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.views.generic import ListView
+
+from core.mixins.pagination import CountStrategyPaginator, KeysetPaginationMixin, estimated_count
+from core import signals
+from core.serviecs import versioning
+from core.serviecs.versioning import bump_model_version, model_version
+from core.tests.models import ArchivedEvent, Document, EventNote, Product
+from core.tests.utils import ModelTablesMixin
+
+
+class DocumentKeysetList(KeysetPaginationMixin, ListView):
+    model = Document
+    pagination = "keyset"
+
+
+class KeysetCursorTests(ModelTablesMixin, TestCase):
+    table_models = (Document,)
+
+    @classmethod
+    def setUpTestData(cls):
+        Document.objects.bulk_create(Document(number=f"DOC{i:04}") for i in range(7))
+        # เวลาเท่ากันทุกแถว ➜ ลำดับต้องตัดสินด้วย pk
+        Document.objects.update(created_at=timezone.now())
+
+    def page(self, query="", **attrs):
+        view = type("View", (DocumentKeysetList,), attrs)()
+        view.setup(RequestFactory().get(f"/{query}"))
+        _, page, rows, _ = view.paginate_queryset(Document.objects.all(), 3)
+        return page, [row.number for row in rows]
+
+    def walk(self, **attrs):
+        pages, query = [], ""
+        while True:
+            page, numbers = self.page(query, **attrs)
+            pages.append(numbers)
+            if not page.has_next():
+                return pages
+            query = page.next_url
+
+    def cursor(self, *values):
+        raw = base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+        return f"?cursor={raw}"
+
+    def test_walk_visits_every_row_once(self):
+        pages = self.walk()
+        numbers = [n for page in pages for n in page]
+        self.assertEqual(numbers, [f"DOC{i:04}" for i in reversed(range(7))])
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+
+    def test_previous_returns_same_page(self):
+        first, first_numbers = self.page()
+        self.assertFalse(first.has_previous())
+        second, _ = self.page(first.next_url)
+        self.assertTrue(second.has_previous())
+        self.assertEqual(self.page(second.previous_url)[1], first_numbers)
+
+    def test_non_datetime_keyset_field(self):
+        pages = self.walk(keyset_field="number")
+        self.assertEqual([n for page in pages for n in page], [f"DOC{i:04}" for i in reversed(range(7))])
+
+    def test_no_count_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.page()
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("COUNT(", queries[0]["sql"].upper())
+
+    def test_offset_mode_is_unchanged(self):
+        view = DocumentKeysetList(pagination="offset")
+        view.setup(RequestFactory().get("/?page=2"))
+        paginator, page, rows, _ = view.paginate_queryset(Document.objects.order_by("pk"), 3)
+        self.assertEqual(paginator.count, 7)
+        self.assertEqual(page.number, 2)
+
+    def test_invalid_cursor_is_404(self):
+        created = Document.objects.first().created_at.isoformat()
+        for query in ("?cursor=%%%", "?cursor=bm9wZQ", self.cursor("n", created, "abc"),
+                      self.cursor("n", "yesterday", "1"), self.cursor("x", created, "1"), self.cursor("n", "", "1")):
+            with self.subTest(query=query), self.assertRaises(Http404):
+                self.page(query)
+
+
+class CountStrategyTests(ModelTablesMixin, TestCase):
+    table_models = (Document,)
+
+    def setUp(self):
+        cache.clear()
+        Document.objects.bulk_create(Document(number=f"DOC{i:04}") for i in range(5))
+
+    def count(self, queryset=None, **attrs):
+        view = DocumentKeysetList(pagination="offset", **attrs)
+        view.setup(RequestFactory().get("/"))
+        paginator = view.get_paginator(queryset if queryset is not None else Document.objects.all(), 2)
+        with CaptureQueriesContext(connection) as queries:
+            count = paginator.count
+        counts = [q for q in queries if "COUNT(" in q["sql"].upper()]
+        return paginator, count, len(counts)
+
+    def test_exact_uses_django_paginator(self):
+        paginator, count, queries = self.count(count_strategy="exact")
+        self.assertIs(type(paginator), Paginator)
+        self.assertEqual((count, queries), (5, 1))
+
+    def test_cached_count_is_reused_until_the_table_changes(self):
+        self.assertEqual(self.count(count_strategy="cached")[1:], (5, 1))
+        self.assertEqual(self.count(count_strategy="cached")[1:], (5, 0))
+        Document.objects.create(number="DOC9999")
+        self.assertEqual(self.count(count_strategy="cached")[1:], (6, 1))
+
+    def test_cached_count_is_per_query(self):
+        self.count(count_strategy="cached")
+        filtered = Document.objects.filter(number__lte="DOC0001")
+        self.assertEqual(self.count(filtered, count_strategy="cached")[1:], (2, 1))
+
+    def test_estimate_falls_back_to_cached_count_off_postgres(self):
+        self.assertIsNone(estimated_count(Document.objects.all()))
+        paginator, count, _ = self.count(count_strategy="estimate", count_estimate_threshold=1)
+        self.assertIsInstance(paginator, CountStrategyPaginator)
+        self.assertEqual(count, 5)
+        self.assertFalse(paginator.count_is_estimate)
+
+
+class ModelVersionTests(ModelTablesMixin, TestCase):
+    table_models = (Document, ArchivedEvent, EventNote)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_save_delete_and_bump_change_the_version(self):
+        versions = [model_version(Document)]
+        document = Document.objects.create(number="D1")
+        versions.append(model_version(Document))
+        document.delete()
+        versions.append(model_version(Document))
+        bump_model_version(Document)
+        versions.append(model_version(Document))
+        self.assertEqual(len(set(versions)), 4)
+        self.assertEqual(versions, sorted(versions))
+
+    def untrack(self, model):
+        uid = f"core_model_version_{model._meta.label_lower}"
+        post_save.disconnect(sender=model, dispatch_uid=uid)
+        post_delete.disconnect(sender=model, dispatch_uid=uid)
+        versioning._tracked.discard(model)
+
+    def test_untracked_models_do_not_write_versions(self):
+        event = ArchivedEvent.objects.create(name="e")
+        EventNote.objects.create(event=event)
+        self.assertIsNone(cache.get(versioning._version_key(EventNote)))
+
+    @override_settings(CORE_VERSIONED_MODELS=["core.EventNote"])
+    def test_versioned_models_setting(self):
+        self.addCleanup(self.untrack, EventNote)
+        signals.connect_model_version_signals()
+        EventNote.objects.create(event=ArchivedEvent.objects.create(name="e"))
+        self.assertIsNotNone(cache.get(versioning._version_key(EventNote)))
+
+    @override_settings(ROOT_URLCONF="core.tests.urls")
+    def test_ready_loads_urlconf_so_every_process_tracks_view_models(self):
+        with mock.patch.object(signals, "import_module") as load:
+            signals.connect_model_version_signals()
+        load.assert_called_once_with("core.tests.urls")
+
+    @override_settings(CORE_VERSIONED_URLCONF=False)
+    def test_urlconf_loading_can_be_disabled(self):
+        with mock.patch.object(signals, "import_module") as load:
+            signals.connect_model_version_signals()
+        load.assert_not_called()
+
+    def test_cached_views_track_their_models(self):
+        # ProductList (cache_mode = "fragment") ประกาศใน core.tests.views
+        from core.tests import views  # noqa: F401
+        self.assertIn(Product, versioning._tracked)
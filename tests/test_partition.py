@@ -0,0 +1,120 @@
+from datetime import datetime, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase
+from django.utils import timezone
+from django.views.generic import ListView
+
+from core.mixins.baseTemplates import BaseListMixin
+from core.serviecs.partition import PartitionService
+from core.tests.models import ArchivedEvent, EventNote
+from core.tests.utils import ModelTablesMixin
+
+
+def age(event, days):
+    ArchivedEvent.objects.filter(pk=event.pk).update(created_at=timezone.now() - timedelta(days=days))
+    return event
+
+
+class EventList(BaseListMixin, ListView):
+    model = ArchivedEvent
+    date_start_field = date_end_field = "created_at"
+    date_default_days = 7
+
+
+class TimePartitionQuerySetTests(ModelTablesMixin, TestCase):
+    table_models = (ArchivedEvent,)
+
+    def setUp(self):
+        self.today = age(ArchivedEvent.objects.create(name="today"), 0)
+        self.week = age(ArchivedEvent.objects.create(name="week"), 5)
+        self.old = age(ArchivedEvent.objects.create(name="old"), 40)
+
+    def names(self, qs):
+        return set(qs.values_list("name", flat=True))
+
+    def test_created_between_uses_plain_range_bounds(self):
+        qs = ArchivedEvent.objects.created_between(timezone.localdate() - timedelta(days=6), timezone.localdate())
+        self.assertEqual(self.names(qs), {"today", "week"})
+        sql = str(qs.query).upper()
+        self.assertIn('"CREATED_AT" >=', sql)
+        self.assertIn('"CREATED_AT" <', sql)
+        self.assertNotIn("DJANGO_DATETIME_CAST_DATE", sql)
+
+    def test_end_date_includes_the_whole_day(self):
+        qs = ArchivedEvent.objects.created_between(end=timezone.localdate())
+        self.assertEqual(self.names(qs), {"today", "week", "old"})
+
+    def test_unparsable_bounds_are_ignored(self):
+        self.assertEqual(self.names(ArchivedEvent.objects.created_between("yesterday", "2025-13-40")), {"today", "week", "old"})
+
+    def test_recent(self):
+        self.assertEqual(self.names(ArchivedEvent.objects.recent(7)), {"today", "week"})
+
+    def test_list_view_defaults_to_recent_rows(self):
+        for query, expected in (("", {"today", "week"}), ("?start_date=2000-01-01", {"today", "week", "old"})):
+            view = EventList()
+            view.setup(RequestFactory().get(f"/{query}"))
+            with self.subTest(query=query):
+                self.assertEqual(self.names(view.get_queryset()), expected)
+
+
+class PartitionNamingTests(SimpleTestCase):
+    def test_periods(self):
+        self.assertEqual(PartitionService.archive_table(ArchivedEvent), f"{ArchivedEvent._meta.db_table}_archive")
+        start = PartitionService.period_start(ArchivedEvent, timezone.make_aware(datetime(2025, 8, 15, 12)))
+        self.assertEqual(start, timezone.make_aware(datetime(2025, 8, 1)))
+        self.assertEqual(PartitionService.partition_name(ArchivedEvent, start), f"{ArchivedEvent._meta.db_table}_p202508")
+        december = timezone.make_aware(datetime(2025, 12, 1))
+        self.assertEqual(PartitionService.next_period(ArchivedEvent, december), timezone.make_aware(datetime(2026, 1, 1)))
+
+
+class ArchiveRowsTests(ModelTablesMixin, TransactionTestCase):
+    # SQLite: archive() สร้างตาราง _archive ด้วย schema editor ➜ ต้องอยู่นอก atomic
+    table_models = (ArchivedEvent, EventNote)
+
+    def setUp(self):
+        self.archive_model = PartitionService.archive_model(ArchivedEvent)
+
+    def tearDown(self):
+        if self.archive_model._meta.db_table in connection.introspection.table_names():
+            with connection.schema_editor() as editor:
+                editor.delete_model(self.archive_model)
+
+    def create(self, name, days_ago):
+        return age(ArchivedEvent.objects.create(name=name), days_ago)
+
+    def test_moves_rows_older_than_archive_after_days(self):
+        old, recent = self.create("old", 90), self.create("recent", 1)
+        self.assertEqual(PartitionService.archive(ArchivedEvent), (1, "row"))
+        self.assertEqual(list(ArchivedEvent.objects.values_list("pk", flat=True)), [recent.pk])
+        self.assertEqual(list(self.archive_model.objects.values_list("name", flat=True)), [old.name])
+
+    def test_small_batches(self):
+        for i in range(5):
+            self.create(f"old{i}", 60)
+        self.assertEqual(PartitionService.archive(ArchivedEvent, batch_size=2), (5, "row"))
+        self.assertFalse(ArchivedEvent.objects.exists())
+        self.assertEqual(self.archive_model.objects.count(), 5)
+
+    def test_referenced_rows_stay(self):
+        referenced, free = self.create("referenced", 90), self.create("free", 90)
+        EventNote.objects.create(event=referenced)
+        self.assertEqual(PartitionService.archive(ArchivedEvent), (1, "row"))
+        self.assertEqual(list(ArchivedEvent.objects.values_list("pk", flat=True)), [referenced.pk])
+        self.assertEqual(list(self.archive_model.objects.values_list("pk", flat=True)), [free.pk])
+        # รอบถัดไปไม่ติดค้างที่แถวเดิม
+        self.assertEqual(PartitionService.archive(ArchivedEvent), (0, "row"))
+
+    def test_explicit_cutoff(self):
+        self.create("a", 10)
+        self.assertEqual(PartitionService.archive(ArchivedEvent, before=timezone.now() - timedelta(days=5)), (1, "row"))
+
+    def test_archive_rows_command(self):
+        self.create("old", 90)
+        out = StringIO()
+        call_command("archive_rows", "core.ArchivedEvent", stdout=out)
+        self.assertIn("1", out.getvalue())
+        self.assertEqual(self.archive_model.objects.count(), 1)
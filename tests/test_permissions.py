@@ -0,0 +1,150 @@
+from unittest import mock
+
+from django.contrib.auth.mixins import PermissionRequiredMixin
+from django.contrib.auth.models import AnonymousUser, Group, Permission, User
+from django.core.cache import cache
+from django.db.models.signals import m2m_changed
+from django.http import Http404
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.views.generic import DetailView
+
+from core import signals
+from core.mixins.permissions import PermissionCacheMixin, get_user_permissions
+from core.mixins.viewMixins import ObjectCacheMixin
+from core.tests.models import Document, Tag
+from core.tests.utils import ModelTablesMixin
+
+
+class DocumentDetail(ObjectCacheMixin, DetailView):
+    model = Document
+
+
+@override_settings(CORE_CACHE_PERMISSIONS=True)
+class PermissionCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("somchai")
+        self.perm = Permission.objects.get(codename="view_user")
+
+    def fresh_user(self):
+        # instance ใหม่ต่อ request เหมือน AuthenticationMiddleware
+        return User.objects.get(pk=self.user.pk)
+
+    def test_permission_set_is_cached_across_requests(self):
+        self.user.user_permissions.add(self.perm)
+        self.assertIn("auth.view_user", get_user_permissions(self.fresh_user()))
+        user = self.fresh_user()
+        with self.assertNumQueries(0):
+            self.assertIn("auth.view_user", get_user_permissions(user))
+
+    def test_user_permission_change_invalidates(self):
+        self.assertEqual(get_user_permissions(self.fresh_user()), frozenset())
+        self.user.user_permissions.add(self.perm)
+        self.assertIn("auth.view_user", get_user_permissions(self.fresh_user()))
+        self.user.user_permissions.remove(self.perm)
+        self.assertNotIn("auth.view_user", get_user_permissions(self.fresh_user()))
+
+    def test_group_changes_invalidate(self):
+        group = Group.objects.create(name="staff")
+        self.user.groups.add(group)
+        self.assertEqual(get_user_permissions(self.fresh_user()), frozenset())
+        group.permissions.add(self.perm)
+        self.assertIn("auth.view_user", get_user_permissions(self.fresh_user()))
+        group.delete()
+        self.assertEqual(get_user_permissions(self.fresh_user()), frozenset())
+
+    def test_anonymous_has_no_permissions(self):
+        self.assertEqual(get_user_permissions(AnonymousUser()), frozenset())
+
+    def test_has_permission(self):
+        class View(PermissionCacheMixin):
+            def get_permission_required(self):
+                return ["auth.view_user"]
+
+        view = View()
+        view.request = RequestFactory().get("/")
+        view.request.user = self.fresh_user()
+        self.assertFalse(view.has_permission())
+
+        self.user.user_permissions.add(self.perm)
+        view.request.user = self.fresh_user()
+        self.assertTrue(view.has_permission())
+
+        view.request.user.is_active = False
+        self.assertFalse(view.has_permission())
+        view.request.user = User(is_active=True, is_superuser=True)
+        self.assertTrue(view.has_permission())
+
+
+class PermissionCacheDisabledTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("somchai")
+        self.perm = Permission.objects.get(codename="view_user")
+
+    def test_off_by_default(self):
+        # ไม่อ่าน / เขียน cache ที่ใช้ร่วมกัน ➜ ไม่มีชุดสิทธิ์เก่าค้างใน process อื่น
+        with mock.patch("core.mixins.permissions.cache") as shared:
+            self.assertEqual(get_user_permissions(User.objects.get(pk=self.user.pk)), frozenset())
+            self.user.user_permissions.add(self.perm)
+            self.assertIn("auth.view_user", get_user_permissions(User.objects.get(pk=self.user.pk)))
+        shared.get.assert_not_called()
+        shared.set.assert_not_called()
+
+    def test_has_permission_uses_django_check(self):
+        class View(PermissionCacheMixin, PermissionRequiredMixin):
+            permission_required = "auth.view_user"
+
+        view = View()
+        view.request = RequestFactory().get("/")
+        view.request.user = User.objects.get(pk=self.user.pk)
+        with mock.patch("core.mixins.permissions.get_user_permissions") as cached:
+            self.assertFalse(view.has_permission())
+        cached.assert_not_called()
+
+        view.cache_permissions = True
+        self.user.user_permissions.add(self.perm)
+        view.request.user = User.objects.get(pk=self.user.pk)
+        self.assertTrue(view.has_permission())
+        self.assertIsNotNone(cache.get(f"core:perms:{cache.get('core:perms:version')}:{self.user.pk}"))
+
+
+class UserPermissionSignalTests(SimpleTestCase):
+    def test_connected_to_active_user_model(self):
+        self.assertTrue(m2m_changed.has_listeners(User.user_permissions.through))
+        self.assertTrue(m2m_changed.has_listeners(User.groups.through))
+
+    def test_user_model_without_permissions_mixin_is_skipped(self):
+        # Tag ไม่มี user_permissions / groups ➜ ไม่ error
+        with mock.patch("core.signals.get_user_model", return_value=Tag):
+            signals.connect_user_permission_signals()
+
+
+class ObjectCacheTests(ModelTablesMixin, TestCase):
+    table_models = (Document,)
+
+    def view(self, pk):
+        view = DocumentDetail()
+        view.setup(RequestFactory().get("/"), pk=pk)
+        return view
+
+    def test_object_is_loaded_once(self):
+        document = Document.objects.create(number="D1")
+        view = self.view(document.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(view.get_object(), document)
+            self.assertIs(view.get_object(), view.get_object())
+
+    def test_missing_object_is_looked_up_once(self):
+        view = self.view(404)
+        with self.assertNumQueries(1):
+            for _ in range(2):
+                with self.assertRaises(Http404):
+                    view.get_object()
+
+    def test_explicit_queryset_bypasses_the_cache(self):
+        document = Document.objects.create(number="D1")
+        view = self.view(document.pk)
+        view.get_object()
+        with self.assertNumQueries(1), self.assertRaises(Http404):
+            view.get_object(Document.objects.exclude(pk=document.pk))
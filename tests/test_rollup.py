@@ -0,0 +1,138 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core import signals
+from core.models import DailyRollup
+from core.serviecs.rollup import RollupService
+from core.tests.models import Customer, Order, OrderItem, OrderTag, Tag
+from core.tests.test_status_auto import CascadeView
+from core.tests.utils import ModelTablesMixin
+from core.views.home import DashboardView
+
+ROLLUP_SIGNALS = (
+    (pre_save, signals._rollup_pre_save),
+    (post_save, signals._rollup_post_save),
+    (pre_delete, signals._rollup_pre_delete),
+    (post_delete, signals._rollup_post_delete),
+)
+
+
+class RollupTestMixin(ModelTablesMixin):
+    table_models = (Customer, Tag, Order, OrderItem, OrderTag)
+
+    def setUp(self):
+        # เทียบเท่า CORE_ROLLUPS = {"core.Order": {"status": "status", "amount": "total"}}
+        RollupService._config = {Order: {"status": "status", "amount": "total"}}
+        self.addCleanup(setattr, RollupService, "_config", None)
+        for signal, handler in ROLLUP_SIGNALS:
+            signal.connect(handler, sender=Order, dispatch_uid="test_rollup")
+            self.addCleanup(signal.disconnect, sender=Order, dispatch_uid="test_rollup")
+        self.today = timezone.localdate()
+
+    def totals(self):
+        return {
+            (row.status, row.count, row.amount)
+            for row in DailyRollup.objects.filter(model_label="core.order", day=self.today)
+            if row.count
+        }
+
+
+class RollupSignalTests(RollupTestMixin, TestCase):
+    def test_create_change_and_delete(self):
+        order = Order.objects.create(status="new", total=Decimal("10"))
+        Order.objects.create(status="new", total=Decimal("5"))
+        self.assertEqual(self.totals(), {("new", 2, Decimal("15"))})
+
+        order = Order.objects.get(pk=order.pk)
+        order.status, order.total = "paid", Decimal("12")
+        order.save()
+        self.assertEqual(self.totals(), {("new", 1, Decimal("5")), ("paid", 1, Decimal("12"))})
+
+        order.delete()
+        self.assertEqual(self.totals(), {("new", 1, Decimal("5"))})
+
+    def test_instance_built_with_pk_reads_the_old_row(self):
+        order = Order.objects.create(status="new", total=Decimal("10"))
+        Order(pk=order.pk, created_at=order.created_at, status="paid", total=Decimal("10")).save()
+        self.assertEqual(self.totals(), {("paid", 1, Decimal("10"))})
+
+    def test_cascade_moves_status_in_bulk(self):
+        order = Order.objects.create(status="new", total=Decimal("10"))
+        view = CascadeView()
+        view.status_fields = ["done"]
+        view.object = order
+        view._cascade_status()
+        self.assertEqual(self.totals(), {("done", 1, Decimal("10"))})
+        # snapshot ถูกปรับตาม ➜ save ต่อไม่นับซ้ำ
+        order.save()
+        self.assertEqual(self.totals(), {("done", 1, Decimal("10"))})
+
+    def test_loading_rows_takes_no_snapshot(self):
+        Order.objects.create(status="new", total=Decimal("10"))
+        order = Order.objects.get()
+        self.assertFalse(hasattr(order, RollupService.SNAPSHOT_ATTR))
+        # save ถัดไปอ่านค่าเดิมตาม pk ครั้งเดียว แล้วจำไว้ ➜ save ซ้ำไม่อ่านอีก
+        order.status = "paid"
+        self.assertEqual(self.order_selects(order.save), 1)
+        self.assertEqual(self.totals(), {("paid", 1, Decimal("10"))})
+        order.total = Decimal("11")
+        self.assertEqual(self.order_selects(order.save), 0)
+        self.assertEqual(self.totals(), {("paid", 1, Decimal("11"))})
+
+    def order_selects(self, func):
+        with CaptureQueriesContext(connection) as queries:
+            func()
+        table = Order._meta.db_table
+        return sum(1 for q in queries if q["sql"].startswith("SELECT") and f'FROM "{table}"' in q["sql"])
+
+    def test_bulk_updated_rows_read_old_values_in_one_query(self):
+        orders = Order.objects.bulk_create([Order(status="new", total=Decimal("2")) for _ in range(3)])
+        RollupService.record_created(orders)
+        orders = list(Order.objects.all())
+        for order in orders:
+            order.status = "paid"
+        with self.assertNumQueries(1):
+            RollupService.prepare_many(Order, orders)
+        Order.objects.bulk_update(orders, ["status"])
+        RollupService.record_changed(orders)
+        self.assertEqual(self.totals(), {("paid", 3, Decimal("6"))})
+
+    def test_bulk_created_rows(self):
+        objs = Order.objects.bulk_create([Order(status="new", total=Decimal("2")) for _ in range(3)])
+        RollupService.record_created(objs)
+        self.assertEqual(self.totals(), {("new", 3, Decimal("6"))})
+
+
+class RollupRebuildTests(RollupTestMixin, TestCase):
+    def test_rebuild_matches_incremental_totals(self):
+        for status, total in (("new", "1"), ("new", "2"), ("paid", "4")):
+            Order.objects.create(status=status, total=Decimal(total))
+        incremental = self.totals()
+        DailyRollup.objects.all().delete()
+        out = StringIO()
+        call_command("rebuild_rollups", "core.Order", stdout=out)
+        self.assertIn("2", out.getvalue())
+        self.assertEqual(self.totals(), incremental)
+
+    def test_summary_and_dashboard(self):
+        Order.objects.create(status="new", total=Decimal("3"))
+        RollupService.apply(Order, self.today - timedelta(days=10), "paid", 2, Decimal("7"))
+        summary = RollupService.summary(Order, days=30)
+        self.assertEqual((summary["today"], summary["last_7"], summary["last_n"]), (1, 1, 3))
+        self.assertEqual(summary["amount_n"], Decimal("10"))
+        self.assertEqual(summary["by_status"], {"new": 1, "paid": 2})
+        self.assertEqual(len(summary["series"]["labels"]), 30)
+
+        view = DashboardView()
+        view.setup(RequestFactory().get("/"))
+        with self.assertNumQueries(1):
+            context = view.get_context_data()
+        self.assertEqual([rollup["model"] for rollup in context["rollups"]], [Order])
@@ -0,0 +1,219 @@
+from datetime import datetime, timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from core.fields import RunningNumberField
+from core.models import RunningNumberCounter
+from core.operations import RunningNumberSequence
+from core.serviecs.runningNumber import RunningNumberService
+from core.serviecs.runningPattern import RunningNumberPattern
+from core.tests.models import CounterDocument, Document
+from core.tests.utils import ModelTablesMixin
+
+
+class RunningNumberPatternTests(SimpleTestCase):
+    moment = datetime(2025, 8, 15, 9, 30)
+
+    def test_format(self):
+        pattern = RunningNumberPattern.compile("MEMO-{THYYYY}/{MM}{DD}-{SEQ:03}")
+        self.assertEqual(pattern.format(self.moment, 1), "MEMO-2568/0815-001")
+        self.assertEqual(RunningNumberPattern.compile("{THYY}{YY}{SEQ:02}").format(self.moment, 7), "682507")
+
+    def test_parse_round_trip(self):
+        pattern = RunningNumberPattern.compile("R{SEQ:03}-{YYYY}")
+        self.assertEqual(pattern.parse(pattern.format(self.moment, 42)), ("R", 42, "-2025"))
+        self.assertEqual(pattern.parse("R1234-2025"), ("R", 1234, "-2025"))
+        for value in ("R42-2025", "X042-2025", "R042-25", "", None):
+            with self.subTest(value=value):
+                self.assertIsNone(pattern.parse(value))
+
+    def test_period_key(self):
+        self.assertEqual(RunningNumberPattern.compile("INV{YYYY}{SEQ:04}").period_key(self.moment), "INV2025")
+        self.assertEqual(RunningNumberPattern.compile("R{SEQ:03}-{YYYY}").period_key(self.moment), "R*-2025")
+
+    def test_braces_are_escaped(self):
+        self.assertEqual(RunningNumberPattern.compile("{{A}}{SEQ:02}").format(self.moment, 3), "{A}03")
+
+    def test_invalid_patterns(self):
+        for pattern in ("{YYYY}", "{SEQ:02}{SEQ:02}", "{QQ}{SEQ:02}", "{YYYY:2}{SEQ:02}"):
+            with self.subTest(pattern=pattern), self.assertRaises(ValueError):
+                RunningNumberPattern.compile(pattern)
+
+    def test_length(self):
+        self.assertEqual(RunningNumberPattern.compile("MEMO-{THYYYY}/{MM}{DD}-{SEQ:03}").length, 18)
+        self.assertEqual(RunningNumberPattern.compile("R{SEQ:03}-{YYYY}").length, 9)
+
+    def test_max_length_fits_pattern(self):
+        self.assertEqual(RunningNumberField(pattern="{YYYY}{SEQ:06}").max_length, 12)
+        self.assertEqual(RunningNumberField(pattern="INV{SEQ:10}").max_length, 13)
+
+    def test_upper_bound(self):
+        self.assertEqual(RunningNumberPattern.upper_bound("INV2025"), "INV2026")
+        self.assertIsNone(RunningNumberPattern.upper_bound(""))
+
+
+class RunningNumberAllocationTests(ModelTablesMixin, TestCase):
+    table_models = (Document, CounterDocument)
+
+    def setUp(self):
+        self.now = RunningNumberService.now()
+
+    def pattern(self, model):
+        return model._meta.get_field("number").compiled
+
+    def number(self, model, seq, now=None):
+        return self.pattern(model).format(now or self.now, seq)
+
+    def next(self, model=Document):
+        return RunningNumberService.next(model, "number", model._meta.get_field("number").pattern)
+
+    def test_first_number_of_period(self):
+        self.assertEqual(self.next(), self.number(Document, 1))
+
+    def test_continues_from_latest(self):
+        Document.objects.create(number=self.number(Document, 41))
+        self.assertEqual(self.next(), self.number(Document, 42))
+
+    def test_previous_period_is_ignored(self):
+        Document.objects.create(number=self.number(Document, 99, self.now - timedelta(days=400)))
+        self.assertEqual(self.next(), self.number(Document, 1))
+
+    def test_sequence_longer_than_padding(self):
+        # เลขเกิน {SEQ:n} ได้ถ้ายังไม่เกิน max_length ของคอลัมน์
+        pattern = RunningNumberService.compile("D{SEQ:04}")
+        for seq in (9998, 9999, 10000):
+            Document.objects.create(number=pattern.format(self.now, seq))
+        self.assertEqual(RunningNumberService.next(Document, "number", pattern), "D10001")
+
+    def test_number_longer_than_max_length_is_rejected(self):
+        Document.objects.create(number=self.number(Document, 9999))
+        field = Document._meta.get_field("number")
+        with mock.patch.object(field, "max_length", len(self.number(Document, 9999))), \
+                self.assertRaisesMessage(ValueError, "max_length=11"):
+            self.next()
+
+    def test_unparsable_latest_value_is_skipped(self):
+        Document.objects.create(number=self.number(Document, 7))
+        Document.objects.create(number=self.pattern(Document).prefix(self.now) + "MANUAL")
+        self.assertEqual(self.next(), self.number(Document, 8))
+
+    def test_unparsable_scan_is_bounded(self):
+        Document.objects.create(number=self.number(Document, 7))
+        prefix = self.pattern(Document).prefix(self.now)
+        Document.objects.bulk_create([Document(number=f"{prefix}X{i:02}") for i in range(5)])
+        with mock.patch.object(RunningNumberService, "parse_scan_limit", 3), \
+                CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.next(), self.number(Document, 1))
+        self.assertTrue(any("LIMIT 2 OFFSET 1" in q["sql"] for q in queries))
+        self.assertEqual(self.next(), self.number(Document, 8))
+
+    def test_get_mode(self):
+        self.assertEqual(RunningNumberService.get_mode(CounterDocument, "number"), "counter")
+        self.assertEqual(RunningNumberService.get_mode(Document, "created_at"), "lock")
+        self.assertEqual(RunningNumberService.get_mode(Document, "missing"), "lock")
+
+    def test_deprecated_helpers(self):
+        now = datetime(2025, 8, 15)
+        self.assertEqual(RunningNumberService.VARS["THYY"](now), "68")
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(RunningNumberService.resolve_prefix("INV{YYYY}{SEQ:04}", now), "INV2025")
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(RunningNumberService.seq_pad("INV{YYYY}{SEQ:04}"), 4)
+
+    def test_latest_lookup_orders_by_column(self):
+        Document.objects.create(number=self.number(Document, 12))
+        with CaptureQueriesContext(connection) as queries:
+            RunningNumberService._latest_seq(Document, "number", self.pattern(Document), self.now)
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("LENGTH", queries[0]["sql"].upper())
+
+    def test_pattern_with_suffix(self):
+        pattern = RunningNumberService.compile("R{SEQ:03}-{YYYY}")
+        Document.objects.create(number=pattern.format(self.now, 7))
+        Document.objects.create(number=pattern.format(self.now - timedelta(days=400), 30))
+        self.assertEqual(RunningNumberService.next(Document, "number", pattern), pattern.format(self.now, 8))
+
+    def test_latest_lookup_is_a_range_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.next()
+        sql = " ".join(q["sql"] for q in queries).upper()
+        self.assertIn(">=", sql)
+        self.assertNotIn(" LIKE ", sql)
+
+    def test_next_many_is_contiguous(self):
+        Document.objects.create(number=self.number(Document, 3))
+        numbers = RunningNumberService.next_many(Document, "number", self.pattern(Document), 3)
+        self.assertEqual(numbers, [self.number(Document, seq) for seq in (4, 5, 6)])
+
+    def test_next_many_counter_mode_bumps_once(self):
+        self.next(CounterDocument)
+        with CaptureQueriesContext(connection) as queries:
+            numbers = RunningNumberService.next_many(CounterDocument, "number", self.pattern(CounterDocument), 4)
+        self.assertEqual(numbers, [self.number(CounterDocument, seq) for seq in (2, 3, 4, 5)])
+        updates = [q["sql"] for q in queries if q["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(RunningNumberCounter.objects.get().last_value, 5)
+
+    def test_next_many_nothing(self):
+        self.assertEqual(RunningNumberService.next_many(Document, "number", self.pattern(Document), 0), [])
+
+    def test_counter_mode_uses_one_counter_row(self):
+        self.assertEqual(self.next(CounterDocument), self.number(CounterDocument, 1))
+        self.assertEqual(self.next(CounterDocument), self.number(CounterDocument, 2))
+        counter = RunningNumberCounter.objects.get()
+        self.assertEqual(counter.model_label, "core.counterdocument")
+        self.assertEqual(counter.prefix, self.pattern(CounterDocument).period_key(self.now))
+        self.assertEqual(counter.last_value, 2)
+
+    def test_counter_mode_seeds_from_existing_rows(self):
+        CounterDocument.objects.create(number=self.number(CounterDocument, 5))
+        self.assertEqual(self.next(CounterDocument), self.number(CounterDocument, 6))
+        self.assertEqual(self.next(CounterDocument), self.number(CounterDocument, 7))
+
+    def test_counter_rows_are_per_prefix(self):
+        RunningNumberCounter.objects.create(
+            **RunningNumberService.counter_key(CounterDocument, "number", "CD0001"), last_value=50,
+        )
+        self.assertEqual(self.next(CounterDocument), self.number(CounterDocument, 1))
+        self.assertEqual(RunningNumberCounter.objects.get(prefix="CD0001").last_value, 50)
+
+    def test_seed_command(self):
+        for seq in (3, 9):
+            CounterDocument.objects.create(number=self.number(CounterDocument, seq))
+        call_command("seed_running_numbers", "core.CounterDocument", stdout=StringIO())
+        self.assertEqual(RunningNumberCounter.objects.get().last_value, 9)
+        self.assertEqual(self.next(CounterDocument), self.number(CounterDocument, 10))
+
+    def test_sequence_mode_falls_back_to_lock_off_postgres(self):
+        Document.objects.create(number=self.number(Document, 4))
+        number = RunningNumberService.next(Document, "number", self.pattern(Document), mode="sequence")
+        self.assertEqual(number, self.number(Document, 5))
+        self.assertFalse(RunningNumberCounter.objects.exists())
+
+    def test_seed_command_only_seeds_the_given_models(self):
+        Document.objects.create(number=self.number(Document, 4))
+        CounterDocument.objects.create(number=self.number(CounterDocument, 8))
+        call_command("seed_running_numbers", "core.Document", "--all", stdout=StringIO())
+        self.assertEqual(
+            list(RunningNumberCounter.objects.values_list("model_label", "last_value")),
+            [("core.document", 4)],
+        )
+
+
+class RunningNumberSequenceNameTests(SimpleTestCase):
+    def test_name_is_stable_and_per_period(self):
+        name = RunningNumberService.sequence_name(Document, "number", "DOC2025", connection)
+        self.assertEqual(name, RunningNumberService.sequence_name(Document, "number", "DOC2025", connection))
+        self.assertNotEqual(name, RunningNumberService.sequence_name(Document, "number", "DOC2026", connection))
+        self.assertTrue(name.startswith(RunningNumberService.sequence_base_name(Document, "number", connection)))
+        self.assertLessEqual(len(name), 63)
+
+    def test_operation_deconstructs(self):
+        operation = RunningNumberSequence("invoice", "number")
+        self.assertEqual(operation.deconstruct(), ("RunningNumberSequence", ["invoice", "number"], {}))
+        self.assertEqual(operation.migration_name_fragment, "invoice_number_sequence")
@@ -0,0 +1,163 @@
+from io import StringIO
+from types import SimpleNamespace
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from core.serviecs import search
+from core.tests.models import Article, Customer, Product
+from core.tests.utils import ModelTablesMixin
+
+FIELDS = ("title", "body", "customer__name")
+
+
+class SearchBackendTestMixin(ModelTablesMixin):
+    table_models = (Customer, Article)
+
+    def setUp(self):
+        self.acme = Customer.objects.create(name="Acme Trading")
+        self.a1 = Article.objects.create(title="Quarterly invoice report", body="totals")
+        self.a2 = Article.objects.create(title="Delivery note", body="invoice attached")
+        self.a3 = Article.objects.create(title="Meeting", body="agenda", customer=self.acme)
+
+    def search(self, backend, q, fields=FIELDS):
+        return set(backend.filter(Article.objects.all(), fields, q))
+
+
+class IContainsSearchTests(SearchBackendTestMixin, TestCase):
+    def test_or_across_fields(self):
+        backend = search.get_search_backend("icontains")
+        self.assertEqual(self.search(backend, "INVOICE"), {self.a1, self.a2})
+        self.assertEqual(self.search(backend, "acme"), {self.a3})
+
+    def test_default_backend(self):
+        self.assertIsInstance(search.get_search_backend(), search.IContainsSearchBackend)
+        self.assertIs(search.get_search_backend("icontains"), search.get_search_backend())
+
+    def test_fields_for_is_the_sorted_union_per_model(self):
+        backend = search.get_search_backend("postgres")
+        search.register(Article, ("title", "body"), backend)
+        search.register(Article, ("body", "customer__name"), backend)
+        self.assertEqual(backend.fields_for(Article), ("body", "customer__name", "title"))
+        self.assertIn((backend, Article, backend.fields_for(Article)), search.registered_models())
+
+    def test_postgres_index_per_registered_field_set(self):
+        backend = search.PostgresFullTextSearchBackend()
+        search.register(Article, ("title",), backend)
+        search.register(Article, ("body", "title", "customer__name"), backend)
+        sets = backend.index_field_sets(Article, backend.fields_for(Article))
+        self.assertEqual([[f.name for f in local] for local in sets], [["body", "title"], ["title"]])
+
+    def test_trigram_index_names_do_not_collide(self):
+        backend = search.PostgresTrigramSearchBackend()
+        names = {backend.column_index_name(Article, SimpleNamespace(column=column))
+                 for column in ("description_th", "description_en")}
+        self.assertEqual(len(names), 2)
+
+    def test_postgres_backends_fall_back_off_postgres(self):
+        for name in ("postgres", "trigram"):
+            backend = search.get_search_backend(name)
+            with self.subTest(backend=name):
+                self.assertEqual(self.search(backend, "invoice"), {self.a1, self.a2})
+                self.assertEqual(backend.build_index(Article, FIELDS), [])
+
+
+class SQLiteFTSSearchTests(SearchBackendTestMixin, TestCase):
+    def setUp(self):
+        self.backend = search.get_search_backend("sqlite_fts")
+        search.SQLiteFTSSearchBackend._tables.clear()
+        # ตาราง _fts หายไปตอน rollback ➜ ล้างรายชื่อที่ cache ไว้
+        self.addCleanup(search.SQLiteFTSSearchBackend._tables.clear)
+        search.register(Article, FIELDS, self.backend)
+        super().setUp()
+
+    def capture_search(self, q):
+        with CaptureQueriesContext(connection) as queries:
+            self.search(self.backend, q)
+        return queries
+
+    def match_queries(self, queries):
+        return [q["sql"] for q in queries if " MATCH " in q["sql"]]
+
+    def test_falls_back_to_icontains_without_index(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.search(self.backend, "invoice"), {self.a1, self.a2})
+        self.assertEqual(self.match_queries(queries), [])
+
+    def test_index_is_built_and_matched(self):
+        self.assertEqual(self.backend.build_index(Article, FIELDS), [f"{Article._meta.db_table}_fts"])
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.search(self.backend, "nvoic"), {self.a1, self.a2})
+            self.assertEqual(self.search(self.backend, "acme"), {self.a3})
+        self.assertEqual(len(self.match_queries(queries)), 2)
+
+    def test_short_query_uses_icontains(self):
+        self.backend.build_index(Article, FIELDS)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.search(self.backend, "ag"), {self.a3})
+        self.assertEqual(self.match_queries(queries), [])
+
+    def test_saves_and_deletes_are_synced(self):
+        self.backend.build_index(Article, FIELDS)
+        self.a1.title = "Annual summary"
+        self.a1.save()
+        created = Article.objects.create(title="Invoice reminder")
+        self.a2.delete()
+        self.assertEqual(self.search(self.backend, "invoice"), {created})
+        self.assertEqual(self.search(self.backend, "annual"), {self.a1})
+
+    def test_match_is_limited_to_the_view_fields(self):
+        self.backend.build_index(Article, FIELDS)
+        # "attached" อยู่ใน body ของ a2 เท่านั้น ➜ view ที่ค้นแค่ title ต้องไม่เจอ
+        self.assertEqual(self.search(self.backend, "attached", ("title",)), set())
+        self.assertEqual(self.search(self.backend, "attached"), {self.a2})
+
+    def test_bulk_writes_are_synced_explicitly(self):
+        self.backend.build_index(Article, FIELDS)
+        created = Article.objects.bulk_create([Article(title="Bulk invoice")])
+        search.SQLiteFTSSearchBackend.sync(Article, created)
+        self.assertEqual(self.search(self.backend, "bulk"), set(created))
+
+        Article.objects.filter(pk=self.a3.pk).update(title="Renamed")
+        search.SQLiteFTSSearchBackend.sync(Article, queryset=Article.objects.filter(pk=self.a3.pk), fields=["title"])
+        self.assertEqual(self.search(self.backend, "renamed"), {self.a3})
+
+    def test_sync_skips_unindexed_fields_without_queries(self):
+        self.backend.build_index(Article, ("title",))
+        with self.assertNumQueries(0):
+            search.SQLiteFTSSearchBackend.sync(Article, queryset=Article.objects.all(), fields=["customer"])
+
+    def test_table_created_elsewhere_is_found_after_recheck_interval(self):
+        self.assertEqual(self.match_queries(self.capture_search("invoice")), [])
+        # สร้างตารางจาก "process อื่น" (cache ของ process นี้ไม่รู้)
+        self.backend.build_index(Article, FIELDS)
+        search.SQLiteFTSSearchBackend._tables[connection.alias].pop(f"{Article._meta.db_table}_fts")
+        self.assertEqual(self.match_queries(self.capture_search("invoice")), [])
+        search.SQLiteFTSSearchBackend._checked[connection.alias] -= search.SQLiteFTSSearchBackend.recheck_interval
+        self.assertEqual(len(self.match_queries(self.capture_search("invoice"))), 1)
+
+    def test_sync_does_not_need_view_registration(self):
+        self.backend.build_index(Article, FIELDS)
+        # process ที่ไม่เคย import URLconf (เช่น worker) ไม่มีการลงทะเบียนจาก view
+        registered = self.backend.models.pop(Article)
+        created = Article.objects.create(title="Invoice reminder")
+        self.backend.models[Article] = registered
+        self.assertEqual(self.search(self.backend, "reminder"), {created})
+
+    def test_auto_backend_picks_fts_on_sqlite(self):
+        auto = search.get_search_backend("auto")
+        self.assertIsInstance(auto._for("default"), search.SQLiteFTSSearchBackend)
+
+    def test_build_search_index_command(self):
+        out = StringIO()
+        call_command("build_search_index", "core.Article", "--backend", "sqlite_fts", stdout=out)
+        self.assertIn(f"{Article._meta.db_table}_fts", out.getvalue())
+        self.assertEqual(self.search(self.backend, "delivery"), {self.a2})
+
+    def test_build_search_index_command_only_builds_the_given_models(self):
+        search.register(Product, ("name",), self.backend)
+        out = StringIO()
+        call_command("build_search_index", "core.Article", "--backend", "sqlite_fts", stdout=out)
+        self.assertNotIn(Product._meta.label, out.getvalue())
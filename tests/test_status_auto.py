@@ -0,0 +1,162 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models.signals import post_save
+from django.http import HttpResponse
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from core.mixins.status_auto import AutoStatusMixin
+from core.serviecs import search
+from core.serviecs.taskQueue import ImmediateBackend, task_status
+from core.serviecs.versioning import model_version
+from core.tests.models import Customer, Order, OrderItem, OrderTag, Tag
+from core.tests.utils import ModelTablesMixin
+
+
+class SavedFormView:
+    def form_valid(self, form):
+        return HttpResponse("saved")
+
+
+class CascadeView(AutoStatusMixin, SavedFormView):
+    pass
+
+
+class CascadePlanTests(ModelTablesMixin, TestCase):
+    table_models = (Customer, Tag, Order, OrderItem, OrderTag)
+
+    def setUp(self):
+        AutoStatusMixin._cascade_plans.clear()
+        self.customer = Customer.objects.create(name="c", status="new")
+        self.order = Order.objects.create(customer=self.customer, status="new")
+        self.items = [OrderItem.objects.create(order=self.order, status="new") for _ in range(3)]
+        self.tag = Tag.objects.create(name="t")
+        OrderTag.objects.create(order=self.order, tag=self.tag, status="new")
+
+    def view(self, cascade_bulk_update=False, **statuses):
+        """status ต่อชื่อ relation ➜ status_fields ตามลำดับ index เดียวกับ mixin"""
+        view = CascadeView()
+        view.cascade_bulk_update = cascade_bulk_update
+        names = [
+            "order" if field is None else (field.get_accessor_name() if field.auto_created else field.name)
+            for _, field in view._cascade_relations(Order)
+        ]
+        view.status_fields = [statuses.get(name) for name in names]
+        view.object = Order.objects.get(pk=self.order.pk)
+        return view
+
+    def test_one_update_per_step_and_no_selects(self):
+        view = self.view(cascade_bulk_update=True, order="done", customer="active", items="shipped", tags="closed")
+        with CaptureQueriesContext(connection) as queries:
+            view._cascade_status()
+        # sqlite_master = รายชื่อตาราง _fts ของ search backend (อ่านเป็นครั้งคราวต่อ process)
+        sql = [q["sql"] for q in queries
+               if not q["sql"].startswith(("SAVEPOINT", "RELEASE")) and "sqlite_master" not in q["sql"]]
+        self.assertEqual(len(sql), 4)
+        self.assertTrue(all(statement.startswith("UPDATE") for statement in sql))
+
+        self.assertEqual(view.object.status, "done")
+        self.assertEqual(Order.objects.get().status, "done")
+        self.assertEqual(Customer.objects.get().status, "active")
+        self.assertEqual(set(OrderItem.objects.values_list("status", flat=True)), {"shipped"})
+        self.assertEqual(OrderTag.objects.get().status, "closed")
+
+    def saved_models(self, **kwargs):
+        """รัน cascade แล้วคืน model ที่ได้ post_save"""
+        saved = []
+
+        def receiver(sender, **_):
+            saved.append(sender)
+
+        post_save.connect(receiver, weak=False, dispatch_uid="test_status_auto")
+        self.addCleanup(post_save.disconnect, dispatch_uid="test_status_auto")
+        self.view(order="done", customer="active", items="shipped", tags="closed", **kwargs)._cascade_status()
+        return saved
+
+    def test_self_and_forward_are_saved_with_hooks_by_default(self):
+        # order / customer ผ่าน save() ➜ post_save ทำงาน; relation แบบหลายแถวใช้ queryset.update() ➜ ไม่มี signal
+        self.assertEqual(sorted(m.__name__ for m in self.saved_models()), ["Customer", "Order"])
+        self.assertEqual(Customer.objects.get().status, "active")
+        self.assertEqual(set(OrderItem.objects.values_list("status", flat=True)), {"shipped"})
+
+    def test_cascade_bulk_update_skips_hooks(self):
+        self.assertEqual(self.saved_models(cascade_bulk_update=True), [])
+        self.assertEqual(Order.objects.get().status, "done")
+        self.assertEqual(Customer.objects.get().status, "active")
+
+    def test_updated_models_get_a_new_version(self):
+        cache.clear()
+        before = {model: model_version(model) for model in (Order, Customer, OrderItem, OrderTag)}
+        self.view(order="done", items="shipped")._cascade_status()
+        changed = {model for model, version in before.items() if model_version(model) != version}
+        self.assertEqual(changed, {Order, OrderItem})
+
+    def test_sqlite_fts_table_follows_status_updates(self):
+        search.SQLiteFTSSearchBackend._tables.clear()
+        # ตาราง _fts หายไปตอน rollback ➜ ล้างรายชื่อที่ cache ไว้
+        self.addCleanup(search.SQLiteFTSSearchBackend._tables.clear)
+        backend = search.get_search_backend("sqlite_fts")
+        backend.build_index(Order, ("status",))
+        self.view(order="shipped")._cascade_status()
+        self.assertEqual(list(backend.filter(Order.objects.all(), ("status",), "shipped")), [self.order])
+
+    def test_auto_now_fields_are_filled(self):
+        before = Customer.objects.get().updated_at
+        self.view(customer="active")._cascade_status()
+        self.assertGreater(Customer.objects.get().updated_at, before)
+
+    def test_none_entries_are_skipped(self):
+        self.view(items="shipped")._cascade_status()
+        self.assertEqual(Order.objects.get().status, "new")
+        self.assertEqual(Customer.objects.get().status, "new")
+        self.assertEqual(set(OrderItem.objects.values_list("status", flat=True)), {"shipped"})
+
+    def test_plan_is_built_once(self):
+        with mock.patch.object(CascadeView, "_build_cascade_plan", autospec=True,
+                               side_effect=AutoStatusMixin._build_cascade_plan) as build:
+            for _ in range(3):
+                self.view(order="done")._cascade_status()
+        self.assertEqual(build.call_count, 1)
+
+    def test_relations_without_status_are_left_out_of_the_plan(self):
+        view = self.view(order="done", tags="closed")
+        kinds = [step[0] for step in view.get_cascade_plan(Order)]
+        self.assertEqual(kinds, ["self", "through"])
+
+
+class DeferredCascadeTests(ModelTablesMixin, TestCase):
+    table_models = (Customer, Tag, Order, OrderItem, OrderTag)
+
+    def setUp(self):
+        cache.clear()
+        self.order = Order.objects.create(status="new")
+        OrderItem.objects.create(order=self.order, status="new")
+
+    def test_cascade_runs_after_commit(self):
+        view = CascadeView()
+        view.status_fields = ["done"]
+        view.cascade_mode = "deferred"
+        view.object = self.order
+        backend = mock.patch("core.mixins.status_auto.get_task_backend", return_value=ImmediateBackend())
+        with backend, self.captureOnCommitCallbacks() as callbacks:
+            response = view.form_valid(form=None)
+            task_id = response["X-Cascade-Task"]
+            self.assertEqual(task_status(task_id)["state"], "scheduled")
+            self.assertEqual(Order.objects.get().status, "new")
+        self.assertEqual(len(callbacks), 1)
+        with backend:
+            callbacks[0]()
+        self.assertEqual(task_status(task_id)["state"], "done")
+        self.assertEqual(Order.objects.get().status, "done")
+
+    def test_nothing_to_do_sends_no_task(self):
+        view = CascadeView()
+        view.status_fields = [None]
+        view.cascade_mode = "deferred"
+        view.object = self.order
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = view.form_valid(form=None)
+        self.assertNotIn("X-Cascade-Task", response)
+        self.assertEqual(callbacks, [])
@@ -0,0 +1,73 @@
+import threading
+import time
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from core.serviecs.taskQueue import ImmediateBackend, ThreadPoolBackend, task_status
+
+
+class Flaky:
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RuntimeError(f"boom {self.calls}")
+
+
+class ImmediateBackendTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_retries_until_done(self):
+        func = Flaky(failures=1)
+        task_id = ImmediateBackend(retries=2).submit(func, key="k")
+        self.assertEqual(func.calls, 2)
+        self.assertEqual(task_status(task_id)["state"], "done")
+        self.assertEqual(task_status(task_id)["attempts"], 2)
+
+    def test_failure_is_recorded(self):
+        func = Flaky(failures=5)
+        with self.assertLogs("core.serviecs.taskQueue", "ERROR"):
+            task_id = ImmediateBackend(retries=1).submit(func)
+        self.assertEqual(func.calls, 2)
+        status = task_status(task_id)
+        self.assertEqual(status["state"], "failed")
+        self.assertEqual(status["error"], "boom 2")
+
+    def test_unknown_task(self):
+        self.assertIsNone(task_status("missing"))
+
+
+class ThreadPoolBackendTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.backend = ThreadPoolBackend(max_workers=4, retries=0)
+        self.addCleanup(self.backend._executor.shutdown, wait=True)
+
+    def test_same_key_runs_in_submission_order(self):
+        seen = []
+        finished = threading.Event()
+
+        def work(n):
+            time.sleep(0.005 * (5 - n))
+            seen.append(n)
+            if n == 4:
+                finished.set()
+
+        ids = [self.backend.submit(work, n, key="order:1") for n in range(5)]
+        self.assertTrue(finished.wait(5))
+        self.backend._executor.shutdown(wait=True)
+        self.assertEqual(seen, [0, 1, 2, 3, 4])
+        self.assertEqual({task_status(task_id)["state"] for task_id in ids}, {"done"})
+        self.assertEqual(self.backend._lanes, {})
+
+    def test_different_keys_run_in_parallel(self):
+        barrier = threading.Barrier(2, timeout=5)
+        self.backend.submit(barrier.wait, key="a")
+        task_id = self.backend.submit(barrier.wait, key="b")
+        self.backend._executor.shutdown(wait=True)
+        self.assertEqual(task_status(task_id)["state"], "done")
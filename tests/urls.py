@@ -0,0 +1,15 @@
+from django.urls import include, path
+
+from core.api.views import api_urlpatterns
+from core.tests import views
+from core.views.instrumentation import InstrumentationView
+
+urlpatterns = [
+    path("invoices/add/", views.InvoiceCreateView.as_view(), name="invoice-add"),
+    path("invoices/bulk/add/", views.InvoiceBulkCreateView.as_view(), name="invoice-bulk-add"),
+    path("invoices/bulk/<int:pk>/", views.InvoiceBulkUpdateView.as_view(), name="invoice-bulk-edit"),
+    path("products/", views.ProductList.as_view(), name="product-list"),
+    path("products/<int:pk>/", views.ProductDetail.as_view(), name="product-detail"),
+    path("instrumentation/", InstrumentationView.as_view(), name="instrumentation"),
+    path("api/", include(api_urlpatterns(views.DocumentList, page_size=2))),
+]
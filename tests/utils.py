@@ -0,0 +1,38 @@
+from pathlib import Path
+
+from django.db import connection
+
+
+class ModelTablesMixin:
+    """
+    สร้างตารางของโมเดลทดสอบ (core.tests.models) ก่อนเปิด transaction ของ TestCase
+    (SQLite ใช้ schema editor ใน atomic ไม่ได้) แล้วลบทิ้งเมื่อจบคลาส
+    """
+    table_models = ()
+
+    @classmethod
+    def setUpClass(cls):
+        with connection.schema_editor() as editor:
+            for model in cls.table_models:
+                editor.create_model(model)
+        cls.addClassCleanup(cls._drop_tables)
+        super().setUpClass()
+
+    @classmethod
+    def _drop_tables(cls):
+        with connection.schema_editor() as editor:
+            for model in reversed(cls.table_models):
+                editor.delete_model(model)
+
+
+# template ของชุดทดสอบ (tests/templates) — ใช้กับ override_settings(TEMPLATES=TEST_TEMPLATES)
+TEST_TEMPLATES = [{
+    "BACKEND": "django.template.backends.django.DjangoTemplates",
+    "DIRS": [Path(__file__).resolve().parent / "templates"],
+    "APP_DIRS": True,
+    "OPTIONS": {"context_processors": [
+        "django.template.context_processors.request",
+        "django.contrib.auth.context_processors.auth",
+        "django.contrib.messages.context_processors.messages",
+    ]},
+}]
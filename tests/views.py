@@ -0,0 +1,54 @@
+from django import forms
+from django.views.generic import CreateView, UpdateView
+
+from core.mixins.baseTemplates import BaseListMixin
+from core.mixins.form import FormsetMixin
+from core.mixins.viewMixins import BaseDetailView, BaseListView
+from core.tests.models import Document, Invoice, InvoiceLine, Product
+
+InvoiceLineFormSet = forms.inlineformset_factory(Invoice, InvoiceLine, fields=("qty",), extra=0)
+
+
+class InvoiceCreateView(FormsetMixin, CreateView):
+    model = Invoice
+    fields = ("status",)
+    formset_classes = {"lines": InvoiceLineFormSet}
+    success_url = "/done/"
+    template_name = "tests/invoice_form.html"
+
+
+class InvoiceBulkCreateView(InvoiceCreateView):
+    bulk_save = True
+
+
+class InvoiceBulkUpdateView(FormsetMixin, UpdateView):
+    model = Invoice
+    fields = ("status",)
+    formset_classes = {"lines": InvoiceLineFormSet}
+    success_url = "/done/"
+    template_name = "tests/invoice_form.html"
+    bulk_save = True
+
+
+class ProductList(BaseListMixin, BaseListView):
+    model = Product
+    list_display = ("name", "price")
+    ordering = ("name",)
+    detail_url_name = "product-detail"
+    update_url_name = "product-detail"
+    delete_url_name = "product-detail"
+    cache_mode = "fragment"
+
+
+class ProductDetail(BaseDetailView):
+    model = Product
+    template_name = "tests/product_detail.html"
+    cache_mode = "response"
+
+    def get_context_data(self, **kwargs):
+        return super().get_context_data(with_form="form" in self.request.GET, **kwargs)
+
+
+class DocumentList(BaseListMixin, BaseListView):
+    model = Document
+    list_display = ("number", "created_at")
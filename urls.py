@@ -0,0 +1,13 @@
+from django.urls import path
+from core.views.home import (
+    DashboardView
+)
+from core.views.instrumentation import (
+    InstrumentationView
+)
+app_name = "core"
+
+urlpatterns = [
+    path('', DashboardView.as_view(), name="dashboard"),
+    path('instrumentation/', InstrumentationView.as_view(), name="instrumentation"),
+]
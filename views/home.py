@@ -2,10 +2,29 @@ from django.shortcuts import render
 from django.views.generic import TemplateView
 from django.contrib.auth.mixins import LoginRequiredMixin
 
+from core.serviecs.rollup import RollupService
+
+
 class DashboardView(TemplateView):
+    """
+    KPI / กราฟรายวันอ่านจาก DailyRollup (ไม่ COUNT / SUM ตารางจริง)
+    context["rollups"] = [RollupService.summary(model) ...] ตามลำดับใน CORE_ROLLUPS
+    (dashboard_models กำหนดเองได้, dashboard_days = จำนวนวันของกราฟ)
+    """
     template_name = "dashboard.html"
+    dashboard_models = None
+    dashboard_days = 30
+
+    def get_dashboard_models(self):
+        if self.dashboard_models is not None:
+            return self.dashboard_models
+        return list(RollupService.config())
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['page_title'] = "ภาพรวมระบบ"
+        context['rollups'] = [
+            RollupService.summary(model, days=self.dashboard_days)
+            for model in self.get_dashboard_models()
+        ]
         return context
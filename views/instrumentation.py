@@ -0,0 +1,26 @@
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.shortcuts import redirect
+from django.views.generic import TemplateView
+
+from core.mixins.instrumentation import ViewStats
+
+
+class InstrumentationView(LoginRequiredMixin, UserPassesTestMixin, TemplateView):
+    """
+    สถิติสะสมต่อ view (ViewStats) ของ process นี้ — เฉพาะ staff
+    POST = ล้างสถิติ
+    """
+    template_name = "instrumentation.html"
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['page_title'] = "สถิติการทำงานของ view"
+        context['stats'] = ViewStats.snapshot()
+        return context
+
+    def post(self, request, *args, **kwargs):
+        ViewStats.reset()
+        return redirect(request.path)